@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+异步新闻爬虫
+
+基于 asyncio + aiohttp 的 NewsCrawler 异步版本：网络请求在事件循环上并发执行，
+HTML 解析放到线程池里运行，避免解析阻塞事件循环。
+解析和数据格式与同步版完全一致，save_data / analyze_data 可以直接复用。
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+
+from rate_limit import RETRY_STATUSES, RetryableError, parse_retry_after
+from web_crawler import NewsCrawler
+
+
+class AsyncNewsCrawler(NewsCrawler):
+    def __init__(self, base_url, max_pages=5, retry_times=3, concurrency=100,
+                 per_host_limit=0, timeout=10, parse_workers=None, max_depth=2, seen=None,
+                 incremental=False, data_file='news_data.json', parser='auto', rate_limit=None,
+                 dedup=None):
+        super().__init__(base_url, max_pages=max_pages, retry_times=retry_times, max_depth=max_depth, seen=seen,
+                         incremental=incremental, data_file=data_file, parser=parser, rate_limit=rate_limit,
+                         dedup=dedup)
+        # 同时在途的请求数上限
+        self.concurrency = concurrency
+        # 同一主机的连接数上限，0 表示不单独限制
+        self.per_host_limit = per_host_limit
+        # 单个请求的超时时间（秒）
+        self.timeout = timeout
+        self.parse_workers = parse_workers
+        self._session = None
+        self._semaphore = None
+        self._executor = None
+
+    async def __aenter__(self):
+        await self.open()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def open(self):
+        """创建 HTTP 会话和解析线程池"""
+        if self._session is not None:
+            return
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host_limit)
+        self._session = aiohttp.ClientSession(
+            headers=self.headers,
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.parse_workers)
+
+    async def close(self):
+        """关闭 HTTP 会话和解析线程池"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def fetch_page(self, url):
+        """异步获取页面内容，失败时按退避时间重试，遵循 Retry-After"""
+        for attempt in range(self.retry_times + 1):
+            if self.rate_limiter:
+                while True:
+                    wait = self.rate_limiter.try_acquire(url)
+                    if not wait:
+                        break
+                    await asyncio.sleep(wait)
+            try:
+                async with self._semaphore:
+                    async with self._session.get(url) as response:
+                        if response.status in RETRY_STATUSES:
+                            raise RetryableError(f"HTTP {response.status}",
+                                                 retry_after=parse_retry_after(response.headers.get('Retry-After')))
+                        response.raise_for_status()
+                        return await response.text()
+            except (RetryableError, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt < self.retry_times:
+                    delay = self.retry_policy.delay(attempt, getattr(e, 'retry_after', None))
+                    print(f"获取页面失败（{e!r}），{delay:.1f}秒后进行第{attempt + 1}次重试...")
+                    # 等待期间不占用并发名额，其他请求照常进行
+                    await asyncio.sleep(delay)
+                    continue
+                print(f"获取页面失败: {e!r}")
+            except aiohttp.ClientError as e:
+                print(f"获取页面失败: {e!r}")
+                break
+        return None
+
+    async def _run_parser(self, func, *args):
+        """在线程池中运行解析函数"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def fetch_news_detail(self, url):
+        """异步获取新闻详细内容"""
+        html = await self.fetch_page(url)
+        if not html:
+            return None
+        return await self._run_parser(self.parse_news_detail, html)
+
+    async def fetch_news_details(self, urls):
+        """并发获取新闻详情，结果顺序与 urls 一致"""
+        # gather 被取消时会一并取消所有未完成的子任务
+        return await asyncio.gather(*(self.fetch_news_detail(url) for url in urls))
+
+    async def parse_news(self, html):
+        """解析新闻列表并并发抓取详情"""
+        news_list = await self._run_parser(self.extract_news_list, html)
+        news_list = self._pending_news(news_list)
+        if not news_list:
+            return
+
+        details = await self.fetch_news_details([news['url'] for news in news_list])
+        self._collect_news(news_list, details)
+
+    async def crawl_multiple_pages(self):
+        """异步爬取新闻"""
+        async with self:
+            print("\n正在爬取新浪新闻...")
+            if self.incremental and self.known_news is None:
+                print(f"增量模式：已保存 {self.load_index()} 条新闻")
+            self.frontier.push(self.base_url, depth=0)
+            pages = 0
+            while self.frontier and pages < self.max_pages:
+                url, depth = self.frontier.pop()
+                pages += 1
+                print(f"正在爬取第{pages}个列表页: {url}")
+                html = await self.fetch_page(url)
+                if not html:
+                    print("新闻页面爬取失败")
+                    continue
+                await self.parse_news(html)
+                links = await self._run_parser(self.extract_page_links, html, url)
+                for link in links:
+                    self.frontier.push(link, depth + 1)
+
+    def run(self, deadline=None):
+        """在新的事件循环中执行爬取；deadline 为整体超时时间（秒），超时后取消全部请求"""
+        async def _crawl():
+            try:
+                await asyncio.wait_for(self.crawl_multiple_pages(), timeout=deadline)
+            except asyncio.TimeoutError:
+                print(f"爬取超过 {deadline} 秒，已取消剩余请求")
+
+        asyncio.run(_crawl())
+
+
+def main():
+    crawler = AsyncNewsCrawler('https://news.sina.com.cn/', max_pages=1, concurrency=50, per_host_limit=10)
+    crawler.run()
+    crawler.save_data()
+    crawler.analyze_data()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTML解析基准测试
+
+比较 html_extract 中各解析后端在列表页和详情页上的单核吞吐（页/秒），
+并检查各后端的提取结果是否与 html.parser 一致。
+
+用法：
+    python bench_html_parser.py                       # 使用生成的模拟页面
+    python bench_html_parser.py --pages-dir saved/    # 使用保存下来的新浪页面（*.html）
+"""
+
+import argparse
+import glob
+import os
+import time
+
+from html_extract import available_backends, get_extractor
+from mock_server import FILLER_BLOCK, render_article_page, render_list_page
+
+
+def synthetic_pages(count, padding):
+    """生成带填充区块的模拟列表页和详情页"""
+    filler = FILLER_BLOCK * padding
+    list_pages = [
+        render_list_page('http://news.example.com', 60).replace('<body>', f'<body>{filler}')
+        for _ in range(max(1, count // 10))
+    ]
+    detail_pages = [render_article_page(i, padding) for i in range(count)]
+    return list_pages, detail_pages
+
+
+def saved_pages(directory):
+    """读取保存的页面，能提取到新闻列表的算列表页，其余算详情页"""
+    reference = get_extractor('html.parser')
+    list_pages, detail_pages = [], []
+    for path in sorted(glob.glob(os.path.join(directory, '*.html'))):
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            html = f.read()
+        (list_pages if reference.extract_list(html) else detail_pages).append(html)
+    return list_pages, detail_pages
+
+
+def measure(func, pages, min_time=1.0):
+    """重复解析直到累计耗时超过 min_time 秒，返回每秒页数"""
+    done = 0
+    start = time.perf_counter()
+    while True:
+        for html in pages:
+            func(html)
+        done += len(pages)
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return done / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTML解析基准测试')
+    parser.add_argument('--pages-dir', help='保存的新浪页面目录（*.html）')
+    parser.add_argument('--count', type=int, default=50, help='生成的模拟详情页数量')
+    parser.add_argument('--padding', type=int, default=5, help='模拟页面中填充区块的倍数')
+    args = parser.parse_args()
+
+    if args.pages_dir:
+        list_pages, detail_pages = saved_pages(args.pages_dir)
+    else:
+        list_pages, detail_pages = synthetic_pages(args.count, args.padding)
+    size = sum(map(len, list_pages + detail_pages)) / max(1, len(list_pages + detail_pages))
+    print(f'列表页 {len(list_pages)} 个，详情页 {len(detail_pages)} 个，平均 {size / 1024:.1f}KB')
+
+    reference = get_extractor('html.parser')
+    expected_lists = [reference.extract_list(html) for html in list_pages]
+    expected_details = [reference.extract_detail(html) for html in detail_pages]
+
+    print(f'{"后端":<12}{"列表页/秒":>12}{"详情页/秒":>12}  结果一致')
+    for backend in available_backends():
+        extractor = get_extractor(backend)
+        same = ([extractor.extract_list(html) for html in list_pages] == expected_lists and
+                [extractor.extract_detail(html) for html in detail_pages] == expected_details)
+        list_rate = measure(extractor.extract_list, list_pages) if list_pages else 0
+        detail_rate = measure(extractor.extract_detail, detail_pages) if detail_pages else 0
+        print(f'{backend:<12}{list_rate:>12.0f}{detail_rate:>12.0f}  {"是" if same else "否"}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+HTTP缓存基准测试
+
+在本地模拟站点上连续爬取两次：第一次冷缓存，第二次缓存已过期（ttl=0），
+所有页面都要重新验证，服务器对未变化的页面返回 304。
+打印两次的耗时、下载的正文字节数和缓存命中率。
+
+用法：
+    python bench_http_cache.py --articles 300
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+
+from http_cache import HTTPCache
+from http_session import create_session
+from mock_server import MockNewsServer
+from web_crawler import NewsCrawler
+
+
+def crawl(server, cache):
+    crawler = NewsCrawler(server.base_url + '/', max_pages=1, max_workers=8,
+                          session=create_session(), cache=cache)
+    sent_before = server.httpd.bytes_sent
+    start = time.perf_counter()
+    crawler.crawl_multiple_pages()
+    return time.perf_counter() - start, server.httpd.bytes_sent - sent_before, len(crawler.news_data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='HTTP缓存基准测试')
+    parser.add_argument('--articles', type=int, default=300, help='模拟站点的新闻数量')
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp(prefix='http_cache_')
+    try:
+        with MockNewsServer(articles=args.articles) as server:
+            for label in ('冷缓存', '热缓存（重新验证）'):
+                cache = HTTPCache(cache_dir, ttl=0)
+                elapsed, sent, count = crawl(server, cache)
+                stats = cache.stats()
+                print(f"{label}: {count} 篇新闻, 耗时 {elapsed:.2f}s, 下载正文 {sent / 1024:.1f}KB, "
+                      f"命中率 {stats['hit_rate']:.1%}, 节省 {stats['bytes_saved'] / 1024:.1f}KB")
+                cache.close()
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
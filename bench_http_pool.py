@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+连接池基准测试
+
+在本地模拟站点上对比「每次 requests.get 新建连接」和「共享连接池会话」
+抓取同一批详情页的耗时，并打印连接复用统计。
+
+用法：
+    python bench_http_pool.py --requests 500 --workers 8
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from http_session import create_session
+from mock_server import MockNewsServer
+
+
+def run(fetch, urls, workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(fetch, urls))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='连接池基准测试')
+    parser.add_argument('--requests', type=int, default=500, help='请求总数')
+    parser.add_argument('--workers', type=int, default=8, help='并发线程数')
+    args = parser.parse_args()
+
+    with MockNewsServer(articles=100) as server:
+        urls = [f'{server.base_url}/article/{i % 100}.html' for i in range(args.requests)]
+
+        elapsed = run(lambda url: requests.get(url).text, urls, args.workers)
+        print(f'requests.get（每次新建连接）: {elapsed:.2f}s, {args.requests / elapsed:.0f} 请求/秒')
+
+        session = create_session(pool_maxsize=args.workers)
+        elapsed = run(lambda url: session.get(url).text, urls, args.workers)
+        print(f'共享连接池会话:               {elapsed:.2f}s, {args.requests / elapsed:.0f} 请求/秒')
+        print(f'连接池统计: {session.connection_stats}')
+
+
+if __name__ == '__main__':
+    main()
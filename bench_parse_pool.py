@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+解析进程池基准测试
+
+在本地模拟站点上爬取同一批较大的详情页，比较在抓取线程中解析
+和交给不同数量的解析进程时的总耗时。
+
+用法：
+    python bench_parse_pool.py --articles 100 --parser html.parser
+"""
+
+import argparse
+import os
+import time
+
+from http_session import create_session
+from mock_server import MockNewsServer
+from web_crawler import NewsCrawler
+
+
+def crawl(server, parser, processes):
+    crawler = NewsCrawler(server.base_url + '/', max_pages=1, max_workers=16, per_host_limit=16,
+                          session=create_session(pool_maxsize=16), parser=parser, parse_processes=processes)
+    start = time.perf_counter()
+    crawler.crawl_multiple_pages()
+    return time.perf_counter() - start, len(crawler.news_data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='解析进程池基准测试')
+    parser.add_argument('--articles', type=int, default=100, help='详情页数量')
+    parser.add_argument('--padding', type=int, default=5, help='详情页填充区块的倍数')
+    parser.add_argument('--parser', default='html.parser', help='解析后端')
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    with MockNewsServer(articles=args.articles, padding=args.padding) as server:
+        for processes in sorted({0, 2, cores}):
+            elapsed, count = crawl(server, args.parser, processes)
+            label = '抓取线程内解析' if processes == 0 else f'{processes} 个解析进程'
+            print(f'{label:<16} {count} 篇, {elapsed:.2f}s, {count / elapsed:.1f} 篇/秒')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+命令行启动耗时基准测试
+
+用 python -X importtime 在新的解释器中测量：
+- import weather_query / import web_crawler 的导入耗时
+- weather_query.py 查询单个城市（预先写入 SQLite 缓存，命中缓存，不访问网络）的整体耗时
+每个场景运行多次取中位数，并扣除空解释器（python -c pass）的启动时间；
+同时列出该场景加载了哪些较重的库，以及导入耗时最多的几个顶层模块。
+
+--root 指定被测代码所在目录，可以用来比较修改前后的版本，例如：
+    git worktree add /tmp/before HEAD~1
+    python bench_startup.py --root /tmp/before
+
+用法：
+    python bench_startup.py --repeat 10
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# 关注的较重的第三方库
+HEAVY = ['pandas', 'numpy', 'pyarrow', 'matplotlib', 'seaborn', 'tabulate', 'requests', 'bs4']
+
+
+def run(args, root):
+    """在新的解释器中运行一次，返回 (墙钟耗时秒数, {顶层模块: 累计导入微秒}, 加载的全部模块)"""
+    env = dict(os.environ, PYTHONPATH=root)
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=root, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    top = {}
+    modules = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        modules.add(name.strip())
+        # 顶层导入的模块名前只有一个空格，嵌套导入按层级缩进
+        if not name.startswith('  '):
+            top[name.strip()] = int(cumulative)
+    return elapsed, top, modules
+
+
+def measure(args, root, repeat):
+    """运行 repeat 次，返回 (墙钟耗时中位数, 导入耗时中位数, 各顶层模块导入耗时的中位数, 加载的模块)"""
+    runs = [run(args, root) for _ in range(repeat)]
+    names = set().union(*(top for _, top, _ in runs))
+    top = {name: statistics.median(t.get(name, 0) for _, t, _ in runs) for name in names}
+    return (statistics.median(elapsed for elapsed, _, _ in runs),
+            statistics.median(sum(t.values()) for _, t, _ in runs) / 1e6,
+            top, runs[0][2])
+
+
+def seed_cache(root, path):
+    """写入一条北京当前天气的缓存，查询场景命中缓存，不访问网络"""
+    sys.path.insert(0, root)
+    from weather_cache import WeatherCache
+
+    WeatherCache(path=path).store('weather_raw', '北京', {
+        'name': '北京', 'weather': [{'description': '晴'}],
+        'main': {'temp': 20.5, 'feels_like': 19.0, 'humidity': 40},
+        'wind': {'speed': 3.2}, 'dt': int(time.time()), 'timezone': 28800,
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description='命令行启动耗时基准测试')
+    parser.add_argument('--root', default=os.path.dirname(os.path.abspath(__file__)), help='被测代码所在目录')
+    parser.add_argument('--repeat', type=int, default=10, help='每个场景的运行次数')
+    parser.add_argument('--top', type=int, default=5, help='列出导入耗时最多的顶层模块数')
+    args = parser.parse_args()
+    root = os.path.abspath(args.root)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_db = os.path.join(tmp, 'weather_cache.db')
+        seed_cache(root, cache_db)
+        scenarios = {
+            'import weather_query': ['-c', 'import weather_query'],
+            'import web_crawler': ['-c', 'import web_crawler'],
+            'weather_query.py 北京（命中缓存）': [os.path.join(root, 'weather_query.py'), '北京', '--cache-db', cache_db],
+        }
+
+        base_elapsed, base_imports, base_top, base_modules = measure(['-c', 'pass'], root, args.repeat)
+        print(f'空解释器启动 {base_elapsed * 1000:.0f}ms（其中导入 {base_imports * 1000:.0f}ms），以下耗时均已扣除\n')
+        for label, command in scenarios.items():
+            elapsed, imports, top, modules = measure(command, root, args.repeat)
+            heavy = [name for name in HEAVY if name in modules]
+            print(f'{label}')
+            print(f'  总耗时 {(elapsed - base_elapsed) * 1000:.0f}ms，导入 {(imports - base_imports) * 1000:.0f}ms')
+            print(f'  加载的重型库：{", ".join(heavy) or "无"}')
+            slowest = sorted((name for name in top if name not in base_top), key=top.get, reverse=True)
+            print('  导入最慢的模块：' + '，'.join(f'{name} {top[name] / 1000:.0f}ms' for name in slowest[:args.top]))
+
+
+if __name__ == '__main__':
+    main()
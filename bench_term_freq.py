@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+标题词频统计基准测试
+
+生成一批随机的中文新闻标题，比较三种做法的耗时和内存峰值：
+- split()：原来的做法，拼接全部标题后 split()，再用 pd.Series.value_counts 统计
+- 二元切分+Series：分词正确，但仍然先生成全部词的列表再统计
+- TermCounter：term_freq 按批统计
+内存峰值只统计计数过程中新分配的内存，不包括标题本身。
+
+用法：
+    python bench_term_freq.py --titles 1000000 --chunksize 10000
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+import pandas as pd
+
+from term_freq import BigramSegmenter, TermCounter
+
+WORDS = [
+    '经济', '发展', '改革', '科技', '创新', '教育', '医疗', '体育', '比赛', '冠军', '市场', '股市',
+    '央行', '政策', '城市', '交通', '环境', '气候', '能源', '汽车', '电影', '音乐', '旅游', '房价',
+    '就业', '人工智能', '芯片', '航天', '火箭', '卫星', '国际', '会议', '合作', '外交', '安全', '数据',
+]
+FILLERS = ['的', '在', '与', '了', '：', '，', '将', '为']
+
+
+def make_titles(count, seed=0):
+    rng = random.Random(seed)
+    titles = []
+    for _ in range(count):
+        parts = []
+        for _ in range(rng.randint(3, 6)):
+            parts.append(rng.choice(WORDS))
+            parts.append(rng.choice(FILLERS))
+        titles.append(''.join(parts))
+    return titles
+
+
+def old_way(titles):
+    """原来的实现：全部标题拼成一个字符串，再构建包含所有词的 Series"""
+    words = ' '.join(titles).split()
+    return pd.Series(words).value_counts().head(10)
+
+
+def bigram_series(titles):
+    """分词正确但沿用原来的统计方式：先生成全部词的列表，再构建 Series"""
+    words = BigramSegmenter().tokenize('\n'.join(titles))
+    return pd.Series(words).value_counts().head(10)
+
+
+def new_way(titles, chunksize):
+    counter = TermCounter('bigram')
+    for start in range(0, len(titles), chunksize):
+        counter.update(titles[start:start + chunksize])
+    return counter.most_common(10)
+
+
+def measure(label, func):
+    # 计时和内存峰值分开测量，tracemalloc 本身会拖慢分配密集的代码
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'{label:<16} {elapsed:6.2f}s  内存峰值 {peak / 1024 / 1024:7.1f}MB')
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='标题词频统计基准测试')
+    parser.add_argument('--titles', type=int, default=200_000, help='标题数量')
+    parser.add_argument('--chunksize', type=int, default=10_000, help='每批统计的标题数')
+    args = parser.parse_args()
+
+    titles = make_titles(args.titles)
+    old = measure('split()', lambda: old_way(titles))
+    measure('二元切分+Series', lambda: bigram_series(titles))
+    new = measure('TermCounter', lambda: new_way(titles, args.chunksize))
+    print('\nsplit() 的前 5 个“词”：', list(old.index[:5]))
+    print('TermCounter 的前 5 个词：', [word for word, _ in new[:5]])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+天气分组统计基准测试
+
+生成多个城市数年的随机天气数据，按 城市 × 周期 统计温度、湿度、风速的
+条数、均值、标准差、最小值、四分位数和最大值，比较三种做法的耗时：
+- 逐组循环：groupby 后逐组用 NumPy 计算，Python 层循环每个分组和指标
+- pandas groupby：agg(count/mean/std/min/max) 加 quantile
+- WeatherAnalysis.aggregate：weather_aggregate 中的整体向量化实现
+最后核对三者的结果是否一致。
+
+用法：
+    python bench_weather_aggregate.py --rows 2000000 --cities 50 --period month
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from weather_aggregate import PERIODS
+from weather_analysis import WeatherAnalysis
+
+METRICS = ['温度', '湿度', '风速']
+QUANTILES = [0.25, 0.5, 0.75]
+
+
+def make_data(rows, cities, years=4, seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 365 * years, rows), unit='D')
+    return pd.DataFrame({
+        '城市': rng.choice([f'城市{i:03d}' for i in range(cities)], rows),
+        '日期': dates,
+        '温度': np.round(15 + 10 * np.sin(dates.dayofyear / 58) + rng.normal(0, 3, rows), 1),
+        '湿度': rng.integers(20, 90, rows).astype(float),
+        '风速': np.round(rng.random(rows) * 5, 1),
+    })
+
+
+def period_column(df, period):
+    """pandas 中与 weather_aggregate.period_keys 对应的周期列"""
+    dates = df['日期'].dt.normalize()
+    if period == 'day':
+        return dates
+    if period == 'week':
+        return dates - pd.to_timedelta(dates.dt.dayofweek, unit='D')
+    if period == 'month':
+        return dates.dt.to_period('M').dt.to_timestamp()
+    if period == 'year':
+        return dates.dt.year
+    return dates.dt.month.map(lambda month: ['冬季', '春季', '夏季', '秋季'][month % 12 // 3])
+
+
+def loop_way(df, period):
+    """逐组、逐指标在 Python 中循环"""
+    rows = []
+    for (city, key), group in df.groupby(['城市', period_column(df, period)]):
+        for metric in METRICS:
+            values = group[metric].to_numpy()
+            values = values[~np.isnan(values)]
+            q1, median, q3 = np.quantile(values, QUANTILES)
+            rows.append({'城市': city, PERIODS[period]: key, '指标': metric, 'count': len(values),
+                         'mean': values.mean(), 'std': values.std(ddof=1) if len(values) > 1 else np.nan, 'min': values.min(),
+                         '25%': q1, '50%': median, '75%': q3, 'max': values.max()})
+    return pd.DataFrame(rows)
+
+
+def pandas_way(df, period):
+    grouped = df.groupby(['城市', period_column(df, period).rename(PERIODS[period])])
+    frames = []
+    for metric in METRICS:
+        stats = grouped[metric].agg(['count', 'mean', 'std', 'min', 'max'])
+        quantiles = grouped[metric].quantile(QUANTILES).unstack()
+        quantiles.columns = [f'{q:.0%}' for q in QUANTILES]
+        frames.append(stats.join(quantiles).assign(指标=metric).reset_index())
+    return pd.concat(frames, ignore_index=True)
+
+
+def engine_way(df, period):
+    analysis = WeatherAnalysis()
+    analysis.data = df
+    return analysis.aggregate(period, METRICS, QUANTILES)
+
+
+def measure(label, func):
+    start = time.perf_counter()
+    result = func()
+    print(f'{label:<16} {time.perf_counter() - start:7.2f}s  {len(result)} 行')
+    return result
+
+
+def normalized(result, period):
+    columns = ['城市', PERIODS[period], '指标', 'count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']
+    result = result[columns].astype({PERIODS[period]: str})
+    return result.sort_values(columns[:3]).reset_index(drop=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='天气分组统计基准测试')
+    parser.add_argument('--rows', type=int, default=1_000_000, help='数据行数')
+    parser.add_argument('--cities', type=int, default=50, help='城市数')
+    parser.add_argument('--period', choices=list(PERIODS), default='month', help='统计周期')
+    parser.add_argument('--skip-loop', action='store_true', help='不运行逐组循环（分组很多时很慢）')
+    args = parser.parse_args()
+
+    df = make_data(args.rows, args.cities)
+    print(f'{args.rows} 行，{args.cities} 个城市，按 城市 × {args.period} 统计 {len(METRICS)} 个指标')
+    results = {}
+    if not args.skip_loop:
+        results['逐组循环'] = measure('逐组循环', lambda: loop_way(df, args.period))
+    results['pandas groupby'] = measure('pandas groupby', lambda: pandas_way(df, args.period))
+    engine = measure('aggregate', lambda: engine_way(df, args.period))
+
+    expected = normalized(engine, args.period)
+    for label, result in results.items():
+        result = normalized(result, args.period)
+        same = all(np.allclose(result[column], expected[column], equal_nan=True)
+                   for column in ['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max'])
+        print(f'{label} 与 aggregate 的结果{"一致" if same else "不一致"}')
+
+
+if __name__ == '__main__':
+    main()
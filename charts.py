@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+图表渲染
+
+原来各处直接用 pyplot 画图：依赖全局状态，没有保存路径时调用 plt.show() 会阻塞批处理任务，
+有的地方创建了图表却从不关闭，生成大量图表时内存不断增长。这里把“计算数据”和“画图”分开：
+
+- Chart / Panel：只描述图表的数据和样式（纯数据，可以 pickle），由各分析代码生成
+- render_chart()：用 Agg 后端和独立的 Figure 对象画图并保存，不经过 pyplot，
+  画完即可回收，可以在任意进程中调用
+- ChartRenderer：批量渲染，图表较多时交给进程池并行；每张图的数据哈希记录在输出目录的
+  .chart_hashes.json 中，数据没有变化且文件存在时跳过。渲染可能发生在有后台线程的进程中
+  （缓存刷新、采集器的 on_flush），进程池与解析进程一样用 forkserver 启动（parse_pool.mp_context）
+
+matplotlib 只在真正画图时才导入。
+
+用法：
+    chart = Chart('out/trend.png', [Panel('line', {'x': dates, 'y': temps}, title='温度趋势')])
+    ChartRenderer(workers=4).render([chart])
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+# 记录图表数据哈希的文件（每个输出目录一个）
+HASH_FILE = '.chart_hashes.json'
+
+
+@dataclass
+class Panel:
+    """一个子图
+
+    Args:
+        kind: 'line'（data: x, y）、'bar' / 'barh'（labels, values）、'pie'（labels, values）、
+            'bxp'（stats：箱型图数据，见 box_stats），为 None 时只画空白坐标轴
+        data: 绘图数据
+        title / xlabel / ylabel: 标题和坐标轴标签
+        options: 其他样式，例如 rotation（x 轴刻度旋转角度）、grid、marker、autopct
+    """
+    kind: str = None
+    data: dict = field(default_factory=dict)
+    title: str = ''
+    xlabel: str = ''
+    ylabel: str = ''
+    options: dict = field(default_factory=dict)
+
+
+@dataclass
+class Chart:
+    """一张图表（一个文件），可以包含多个子图
+
+    Args:
+        path: 保存路径，格式由扩展名决定
+        panels: 子图列表，按 layout 的行列顺序排列
+        layout: (行数, 列数)
+        figsize: 图表尺寸（英寸）
+        tight: True 时调用 tight_layout，'bbox' 时按内容裁剪保存
+    """
+    path: str
+    panels: list
+    layout: tuple = (1, 1)
+    figsize: tuple = (10, 6)
+    tight: object = False
+
+    def digest(self):
+        """图表内容（数据和样式，不含保存路径）的哈希"""
+        content = pickle.dumps((self.panels, self.layout, self.figsize, self.tight), protocol=4)
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def box_stats(values, label):
+    """由一组数值计算箱型图数据（四分位数、1.5 倍四分位距内的须、离群点），与 seaborn 的画法一致"""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    return {
+        'label': label, 'q1': q1, 'med': median, 'q3': q3,
+        'whislo': inside.min(), 'whishi': inside.max(),
+        'fliers': values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)],
+    }
+
+
+def _draw(ax, panel):
+    data, options = panel.data, panel.options
+    values = data.get('stats', data.get('values', data.get('y')))
+    if values is not None and len(values) == 0:
+        # 没有数据（例如某城市的温度全部缺失）时只画空白坐标轴
+        pass
+    elif panel.kind == 'line':
+        ax.plot(data['x'], data['y'], marker=options.get('marker'))
+    elif panel.kind == 'bar':
+        ax.bar(data['labels'], data['values'])
+    elif panel.kind == 'barh':
+        ax.barh(data['labels'], data['values'])
+    elif panel.kind == 'pie':
+        ax.pie(data['values'], labels=data['labels'], autopct=options.get('autopct', '%1.1f%%'))
+    elif panel.kind == 'bxp':
+        ax.bxp(data['stats'], showfliers=options.get('showfliers', True))
+    elif panel.kind is not None:
+        raise ValueError(f'未知的图表类型: {panel.kind}')
+    if panel.title:
+        ax.set_title(panel.title)
+    if panel.xlabel:
+        ax.set_xlabel(panel.xlabel)
+    if panel.ylabel:
+        ax.set_ylabel(panel.ylabel)
+    if options.get('grid'):
+        ax.grid(True)
+    if options.get('rotation'):
+        ax.tick_params(axis='x', labelrotation=options['rotation'])
+
+
+def render_chart(chart):
+    """用 Agg 后端画图并保存，返回保存路径；不使用 pyplot，不影响全局状态"""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    figure = Figure(figsize=chart.figsize)
+    FigureCanvasAgg(figure)
+    rows, cols = chart.layout
+    for index, panel in enumerate(chart.panels, 1):
+        _draw(figure.add_subplot(rows, cols, index), panel)
+    if chart.tight is True:
+        figure.tight_layout()
+    directory = os.path.dirname(chart.path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # 先写临时文件再改名，中途失败不会留下不完整的图片
+    name, ext = os.path.splitext(chart.path)
+    temp = f'{name}.tmp{ext}'
+    figure.savefig(temp, format=ext.lstrip('.') or 'png', bbox_inches='tight' if chart.tight == 'bbox' else None)
+    os.replace(temp, chart.path)
+    return chart.path
+
+
+class ChartRenderer:
+    """批量渲染图表
+
+    Args:
+        workers: 渲染进程数，默认等于CPU核数；为 1 时在当前进程渲染
+        skip_unchanged: 数据哈希与上次相同且文件存在时跳过
+        min_batch: 需要渲染的图表少于该数量时直接在当前进程渲染（启动进程比画几张图还慢）
+    """
+
+    def __init__(self, workers=None, skip_unchanged=True, min_batch=4):
+        self.workers = workers or os.cpu_count() or 1
+        self.skip_unchanged = skip_unchanged
+        self.min_batch = min_batch
+        self.rendered = 0
+        self.skipped = 0
+
+    def _load_hashes(self, directory):
+        try:
+            with open(os.path.join(directory or '.', HASH_FILE), encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_hashes(self, directory, hashes):
+        path = os.path.join(directory or '.', HASH_FILE)
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(hashes, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(path + '.tmp', path)
+
+    def render(self, charts):
+        """渲染一批图表，返回实际渲染的路径列表；哈希文件只由当前进程读写"""
+        charts = list(charts)
+        hashes = {}
+        todo = []
+        for chart in charts:
+            directory, name = os.path.split(chart.path)
+            if directory not in hashes:
+                hashes[directory] = self._load_hashes(directory)
+            digest = chart.digest()
+            if (self.skip_unchanged and hashes[directory].get(name) == digest
+                    and os.path.exists(chart.path)):
+                self.skipped += 1
+                continue
+            todo.append((chart, digest))
+
+        if self.workers > 1 and len(todo) >= self.min_batch:
+            from parse_pool import mp_context
+
+            workers = min(self.workers, len(todo))
+            with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context()) as executor:
+                paths = list(executor.map(render_chart, [chart for chart, _ in todo],
+                                          chunksize=max(1, len(todo) // (workers * 4))))
+        else:
+            paths = [render_chart(chart) for chart, _ in todo]
+
+        for chart, digest in todo:
+            directory, name = os.path.split(chart.path)
+            hashes[directory][name] = digest
+        for directory in {os.path.dirname(chart.path) for chart, _ in todo}:
+            self._save_hashes(directory, hashes[directory])
+        self.rendered += len(paths)
+        return paths
+
+
+def render_charts(charts, workers=None):
+    """渲染一批图表的简便写法，返回实际渲染的路径列表"""
+    return ChartRenderer(workers).render(charts)
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+爬取队列与URL去重
+
+- normalize_url：把同一个地址的不同写法归一化，避免重复抓取
+- BloomFilter：定长位数组实现的布隆过滤器，百万级URL只占 1~2MB 内存，
+  每次查询 O(1)，代价是有极小的误判率（把新URL当成已见过）
+- HashedURLSet：保存URL的 64 位摘要，无误判但内存随URL数量线性增长
+- URLFrontier：按优先级出队的待爬队列，自带深度限制和去重
+"""
+
+import hashlib
+import heapq
+import math
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# 归一化时丢弃的跟踪参数
+TRACKING_PARAMS = ('utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content', 'spm', 'from')
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url):
+    """归一化URL：小写协议和主机、去掉默认端口、片段和跟踪参数、查询参数排序"""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f'{host}:{parts.port}'
+    path = parts.path or '/'
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key not in TRACKING_PARAMS
+    )
+    return urlunsplit((scheme, host, path, urlencode(query), ''))
+
+
+def _url_hashes(url):
+    """计算URL的两个 64 位哈希值，用于双重哈希"""
+    digest = hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little')
+
+
+class BloomFilter:
+    """布隆过滤器
+
+    Args:
+        capacity: 预计存放的元素个数
+        error_rate: 达到 capacity 时允许的误判率
+    """
+
+    def __init__(self, capacity=1_000_000, error_rate=0.001):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        h1, h2 = _url_hashes(item)
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def add(self, item):
+        """加入元素，返回该元素此前是否不存在"""
+        is_new = False
+        for pos in self._positions(item):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                is_new = True
+        if is_new:
+            self.count += 1
+        return is_new
+
+    def __len__(self):
+        return self.count
+
+
+class HashedURLSet:
+    """保存URL 64 位摘要的集合，不会误判"""
+
+    def __init__(self):
+        self._hashes = set()
+
+    def __contains__(self, item):
+        return _url_hashes(item)[0] in self._hashes
+
+    def add(self, item):
+        """加入元素，返回该元素此前是否不存在"""
+        key = _url_hashes(item)[0]
+        if key in self._hashes:
+            return False
+        self._hashes.add(key)
+        return True
+
+    def __len__(self):
+        return len(self._hashes)
+
+
+class URLFrontier:
+    """带优先级、深度限制和去重的待爬队列
+
+    优先级数值越小越先出队，同优先级按入队顺序出队。
+    """
+
+    def __init__(self, max_depth=None, seen=None):
+        self.max_depth = max_depth
+        self.seen = seen if seen is not None else BloomFilter()
+        self._heap = []
+        self._counter = 0
+
+    def is_new(self, url):
+        """URL是否未见过；未见过时同时把它标记为已见"""
+        return self.seen.add(normalize_url(url))
+
+    def push(self, url, depth=0, priority=None):
+        """加入待爬URL，超过深度或已见过则返回 False"""
+        if self.max_depth is not None and depth > self.max_depth:
+            return False
+        if not self.is_new(url):
+            return False
+        if priority is None:
+            priority = depth
+        heapq.heappush(self._heap, (priority, self._counter, depth, url))
+        self._counter += 1
+        return True
+
+    def pop(self):
+        """取出优先级最高的URL，返回 (url, depth)"""
+        _, _, depth, url = heapq.heappop(self._heap)
+        return url, depth
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __bool__(self):
+        return bool(self._heap)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+新闻页面解析
+
+把列表页和详情页的字段提取集中在这里，并提供几种可选的解析后端：
+- 'html.parser'：BeautifulSoup + 标准库解析器，无额外依赖，速度最慢
+- 'bs4-lxml'：BeautifulSoup + lxml 解析器，仍然构建完整的 Python 对象树
+- 'lxml'：直接用 lxml 的 C 语言文档树和预编译的 XPath，只为命中的节点创建 Python 对象
+- 'selectolax'：selectolax（lexbor 引擎）的 CSS 选择器，同样只取需要的节点
+- 'auto'：按 selectolax > lxml > html.parser 的顺序选择已安装的后端
+
+所有后端的提取结果保持一致，可以用 bench_html_parser.py 比较速度。
+"""
+
+# BeautifulSoup 只在使用 html.parser / bs4-lxml 后端时才导入（见 SoupExtractor），
+# auto 选中 selectolax 或 lxml 时不需要加载
+try:
+    from lxml import etree, html as lxml_html
+except ImportError:
+    lxml_html = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# 适配新浪新闻的HTML结构，按顺序尝试，使用第一个有结果的选择器
+LIST_SELECTORS = ['.news-item', '.main-news h2', '.ct_t_01 a', '.news-2 a']
+PAGE_LINK_SELECTOR = '.pagination a, .page a, #pages a, a[rel="next"]'
+CONTENT_SELECTORS = ['#article', '.article']
+TIME_SELECTORS = ['.date', '.time-source']
+AUTHOR_SELECTORS = ['.show_author', '.source']
+
+
+def _xpath_for(selector):
+    """把本模块用到的简单 CSS 选择器（.class、#id、后代、a[rel="next"]）转换为 XPath"""
+    steps = []
+    for part in selector.split():
+        if part.startswith('.'):
+            steps.append(f"*[contains(concat(' ', normalize-space(@class), ' '), ' {part[1:]} ')]")
+        elif part.startswith('#'):
+            steps.append(f"*[@id='{part[1:]}']")
+        elif '[' in part:
+            tag, attr = part.rstrip(']').split('[')
+            name, value = attr.split('=')
+            steps.append(f"{tag}[@{name}={value}]")
+        else:
+            steps.append(part)
+    return '//' + '//'.join(steps)
+
+
+class SoupExtractor:
+    """基于 BeautifulSoup 的解析，features 为 'html.parser' 或 'lxml'"""
+
+    def __init__(self, features='html.parser'):
+        from bs4 import BeautifulSoup
+
+        self.features = features
+        self._beautiful_soup = BeautifulSoup
+
+    def _soup(self, html):
+        return self._beautiful_soup(html, self.features)
+
+    def extract_list(self, html):
+        """返回列表页中的 [(标题, 链接), ...]；找不到新闻列表时返回 None"""
+        soup = self._soup(html)
+        news_items = []
+        for selector in LIST_SELECTORS:
+            news_items = soup.select(selector)
+            if news_items:
+                break
+        if not news_items:
+            return None
+
+        entries = []
+        for item in news_items:
+            title_link = item.select_one('a')
+            if title_link:
+                entries.append((title_link.text.strip(), title_link.get('href', '')))
+        return entries
+
+    def extract_page_links(self, html):
+        """返回列表页中的翻页链接（原始 href）"""
+        soup = self._soup(html)
+        return [a.get('href') for a in soup.select(PAGE_LINK_SELECTOR) if a.get('href')]
+
+    def _first(self, soup, selectors):
+        for selector in selectors:
+            element = soup.select_one(selector)
+            if element:
+                return element
+        return None
+
+    def extract_detail(self, html):
+        """返回详情页的正文、发布时间和作者；找不到正文时返回 None"""
+        soup = self._soup(html)
+        content = self._first(soup, CONTENT_SELECTORS)
+        if not content:
+            return None
+        time_element = self._first(soup, TIME_SELECTORS)
+        author_element = self._first(soup, AUTHOR_SELECTORS)
+        return {
+            'content': content.get_text(strip=True),
+            'publish_time': time_element.text.strip() if time_element else None,
+            'author': author_element.text.strip() if author_element else None
+        }
+
+
+class LxmlExtractor:
+    """基于 lxml 的定向解析：文档树留在 C 层，只把 XPath 命中的节点转换为 Python 对象"""
+
+    def __init__(self):
+        if lxml_html is None:
+            raise RuntimeError('lxml 后端需要先安装 lxml：pip install lxml')
+        self._list_xpaths = [etree.XPath(_xpath_for(selector)) for selector in LIST_SELECTORS]
+        self._page_link_xpath = etree.XPath(' | '.join(
+            _xpath_for(selector.strip()) for selector in PAGE_LINK_SELECTOR.split(',')
+        ))
+        self._content_xpaths = [etree.XPath(_xpath_for(selector)) for selector in CONTENT_SELECTORS]
+        self._time_xpaths = [etree.XPath(_xpath_for(selector)) for selector in TIME_SELECTORS]
+        self._author_xpaths = [etree.XPath(_xpath_for(selector)) for selector in AUTHOR_SELECTORS]
+        self._first_link = etree.XPath('.//a')
+        # 与 BeautifulSoup 的 get_text 一致：不包含 script / style 中的文字
+        self._visible_text = etree.XPath('.//text()[not(ancestor::script) and not(ancestor::style)]')
+
+    def _tree(self, html):
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        return lxml_html.fromstring(html, parser=lxml_html.HTMLParser(encoding='utf-8'))
+
+    def _first(self, tree, xpaths):
+        for xpath in xpaths:
+            found = xpath(tree)
+            if found:
+                return found[0]
+        return None
+
+    def extract_list(self, html):
+        tree = self._tree(html)
+        news_items = []
+        for xpath in self._list_xpaths:
+            news_items = xpath(tree)
+            if news_items:
+                break
+        if not news_items:
+            return None
+
+        entries = []
+        for item in news_items:
+            links = self._first_link(item)
+            if links:
+                entries.append((links[0].text_content().strip(), links[0].get('href', '')))
+        return entries
+
+    def extract_page_links(self, html):
+        return [a.get('href') for a in self._page_link_xpath(self._tree(html)) if a.get('href')]
+
+    def extract_detail(self, html):
+        tree = self._tree(html)
+        content = self._first(tree, self._content_xpaths)
+        if content is None:
+            return None
+        time_element = self._first(tree, self._time_xpaths)
+        author_element = self._first(tree, self._author_xpaths)
+        return {
+            'content': ''.join(text.strip() for text in self._visible_text(content)),
+            'publish_time': time_element.text_content().strip() if time_element is not None else None,
+            'author': author_element.text_content().strip() if author_element is not None else None
+        }
+
+
+class SelectolaxExtractor:
+    """基于 selectolax（lexbor 引擎）的定向解析"""
+
+    def __init__(self):
+        if LexborHTMLParser is None:
+            raise RuntimeError('selectolax 后端需要先安装 selectolax：pip install selectolax')
+
+    def _first(self, tree, selectors):
+        for selector in selectors:
+            node = tree.css_first(selector)
+            if node is not None:
+                return node
+        return None
+
+    def extract_list(self, html):
+        tree = LexborHTMLParser(html)
+        news_items = []
+        for selector in LIST_SELECTORS:
+            news_items = tree.css(selector)
+            if news_items:
+                break
+        if not news_items:
+            return None
+
+        entries = []
+        for item in news_items:
+            link = item.css_first('a')
+            if link is not None:
+                entries.append((link.text(deep=True).strip(), link.attributes.get('href') or ''))
+        return entries
+
+    def extract_page_links(self, html):
+        tree = LexborHTMLParser(html)
+        return [node.attributes['href'] for node in tree.css(PAGE_LINK_SELECTOR) if node.attributes.get('href')]
+
+    def extract_detail(self, html):
+        tree = LexborHTMLParser(html)
+        content = self._first(tree, CONTENT_SELECTORS)
+        if content is None:
+            return None
+        time_element = self._first(tree, TIME_SELECTORS)
+        author_element = self._first(tree, AUTHOR_SELECTORS)
+        # 与 BeautifulSoup 的 get_text 一致：不包含 script / style 中的文字
+        content.strip_tags(['script', 'style'])
+        return {
+            'content': content.text(deep=True, separator='', strip=True),
+            'publish_time': time_element.text(deep=True).strip() if time_element is not None else None,
+            'author': author_element.text(deep=True).strip() if author_element is not None else None
+        }
+
+
+BACKENDS = ['html.parser', 'bs4-lxml', 'lxml', 'selectolax']
+
+
+def available_backends():
+    """当前环境可用的解析后端"""
+    backends = ['html.parser']
+    if lxml_html is not None:
+        backends += ['bs4-lxml', 'lxml']
+    if LexborHTMLParser is not None:
+        backends.append('selectolax')
+    return backends
+
+
+def get_extractor(backend='auto'):
+    """按名称创建解析器"""
+    if backend == 'auto':
+        if LexborHTMLParser is not None:
+            backend = 'selectolax'
+        elif lxml_html is not None:
+            backend = 'lxml'
+        else:
+            backend = 'html.parser'
+    if backend == 'html.parser':
+        return SoupExtractor('html.parser')
+    if backend == 'bs4-lxml':
+        return SoupExtractor('lxml')
+    if backend == 'lxml':
+        return LxmlExtractor()
+    if backend == 'selectolax':
+        return SelectolaxExtractor()
+    raise ValueError(f'未知的解析后端: {backend}，可选 {BACKENDS} 或 auto')
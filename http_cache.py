@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+磁盘HTTP缓存
+
+把页面正文连同 ETag / Last-Modified 保存在本地目录中：
+- 缓存未过期（TTL 内）时直接返回，不发请求
+- 过期后带 If-None-Match / If-Modified-Since 重新验证，服务器返回 304 时沿用缓存
+- 缓存总大小超过上限时按最近最少使用（LRU）淘汰
+
+索引保存在 SQLite 中，正文按 URL 摘要分散存放在子目录里。
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from crawl_frontier import normalize_url
+
+
+class CacheEntry:
+    """一条缓存记录"""
+
+    def __init__(self, key, body, encoding, etag, last_modified, stored_at, ttl):
+        self.key = key
+        self.body = body
+        self.encoding = encoding
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.ttl = ttl
+
+    @property
+    def text(self):
+        return self.body.decode(self.encoding or 'utf-8', errors='replace')
+
+    def is_fresh(self, now=None):
+        """是否仍在 TTL 内，可以不经验证直接使用"""
+        return (now or time.time()) - self.stored_at < self.ttl
+
+    def validators(self):
+        """用于条件请求的请求头"""
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+
+class HTTPCache:
+    """带 TTL 和 LRU 淘汰的磁盘HTTP缓存
+
+    Args:
+        directory: 缓存目录
+        max_bytes: 缓存正文总大小上限
+        ttl: 缓存免验证的有效期（秒），0 表示每次都重新验证
+    """
+
+    def __init__(self, directory='.http_cache', max_bytes=200 * 1024 * 1024, ttl=600):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, 'index.db'), check_same_thread=False)
+        self._db.execute('''
+            CREATE TABLE IF NOT EXISTS entries (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                encoding TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL,
+                last_access REAL,
+                size INTEGER
+            )''')
+        self._db.execute('CREATE INDEX IF NOT EXISTS idx_last_access ON entries (last_access)')
+        self._db.commit()
+        self.total_bytes = self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        # 统计：直接命中、304 重新验证、完整下载、省下的下载字节数
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.bytes_saved = 0
+
+    def _key(self, url):
+        return hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def lookup(self, url):
+        """查找缓存记录，未缓存时返回 None"""
+        key = self._key(url)
+        with self._lock:
+            row = self._db.execute(
+                'SELECT encoding, etag, last_modified, stored_at FROM entries WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            try:
+                with open(self._path(key), 'rb') as f:
+                    body = f.read()
+            except OSError:
+                # 正文文件丢失，当作未缓存处理
+                self._delete(key)
+                return None
+            self._db.execute('UPDATE entries SET last_access = ? WHERE key = ?', (time.time(), key))
+            self._db.commit()
+            entry = CacheEntry(key, body, *row, ttl=self.ttl)
+            if entry.is_fresh():
+                self.hits += 1
+                self.bytes_saved += len(body)
+        return entry
+
+    def mark_revalidated(self, entry):
+        """服务器返回 304，刷新缓存的存储时间"""
+        now = time.time()
+        with self._lock:
+            self._db.execute('UPDATE entries SET stored_at = ?, last_access = ? WHERE key = ?',
+                             (now, now, entry.key))
+            self._db.commit()
+            self.revalidated += 1
+            self.bytes_saved += len(entry.body)
+        entry.stored_at = now
+
+    def store(self, url, response):
+        """保存一个 200 响应；没有 ETag 和 Last-Modified 的响应也会缓存，只是过期后需要完整下载"""
+        key = self._key(url)
+        body = response.content
+        encoding = response.encoding or response.apparent_encoding
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        now = time.time()
+        with self._lock:
+            tmp_path = f'{path}.tmp{threading.get_ident()}'
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+            old = self._db.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+            if old:
+                self.total_bytes -= old[0]
+            self._db.execute(
+                'INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, url, encoding, response.headers.get('ETag'), response.headers.get('Last-Modified'),
+                 now, now, len(body))
+            )
+            self.total_bytes += len(body)
+            self.misses += 1
+            self._evict()
+            self._db.commit()
+
+    def _delete(self, key):
+        row = self._db.execute('SELECT size FROM entries WHERE key = ?', (key,)).fetchone()
+        if row:
+            self.total_bytes -= row[0]
+        self._db.execute('DELETE FROM entries WHERE key = ?', (key,))
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _evict(self):
+        """按最近访问时间淘汰，直到总大小不超过上限"""
+        while self.total_bytes > self.max_bytes:
+            row = self._db.execute('SELECT key FROM entries ORDER BY last_access LIMIT 1').fetchone()
+            if row is None:
+                break
+            self._delete(row[0])
+
+    def stats(self):
+        """缓存统计"""
+        lookups = self.hits + self.revalidated + self.misses
+        return {
+            'hits': self.hits,
+            'revalidated': self.revalidated,
+            'misses': self.misses,
+            'hit_rate': (self.hits + self.revalidated) / lookups if lookups else 0.0,
+            'bytes_saved': self.bytes_saved,
+            'total_bytes': self.total_bytes,
+        }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+共享HTTP连接池
+
+为爬虫和天气查询提供复用 TCP/TLS 连接的 requests.Session，
+并统计连接复用次数和握手耗时，方便评估连接池的效果。
+
+用法：
+    from http_session import get_session
+    session = get_session()            # 进程内共享的默认会话
+    session.get(url, timeout=10)
+    print(session.connection_stats.snapshot())
+"""
+
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# 默认最多缓存的主机数，以及每个主机保留的连接数
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+
+class ConnectionStats:
+    """连接池统计：请求数、新建连接数、握手耗时"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.new_connections = 0
+            self.handshake_time = 0.0
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def record_connect(self, elapsed):
+        with self._lock:
+            self.new_connections += 1
+            self.handshake_time += elapsed
+
+    @property
+    def reused_connections(self):
+        """复用已有连接的请求数"""
+        return max(self.requests - self.new_connections, 0)
+
+    def snapshot(self):
+        """返回当前统计数据的字典"""
+        with self._lock:
+            requests_count = self.requests
+            new_connections = self.new_connections
+            handshake_time = self.handshake_time
+        reused = max(requests_count - new_connections, 0)
+        return {
+            'requests': requests_count,
+            'new_connections': new_connections,
+            'reused_connections': reused,
+            'reuse_rate': reused / requests_count if requests_count else 0.0,
+            'handshake_time': handshake_time,
+        }
+
+    def __str__(self):
+        stats = self.snapshot()
+        return (f"请求 {stats['requests']} 次，新建连接 {stats['new_connections']} 个，"
+                f"复用率 {stats['reuse_rate']:.1%}，握手耗时 {stats['handshake_time'] * 1000:.1f}ms")
+
+
+def _metered_pool_classes(stats):
+    """生成会把建连耗时记录到 stats 的连接池类"""
+
+    class MeteredHTTPConnection(HTTPConnection):
+        def connect(self):
+            start = time.perf_counter()
+            super().connect()
+            stats.record_connect(time.perf_counter() - start)
+
+    class MeteredHTTPSConnection(HTTPSConnection):
+        def connect(self):
+            # HTTPS 的 connect() 同时包含 TCP 建连和 TLS 握手
+            start = time.perf_counter()
+            super().connect()
+            stats.record_connect(time.perf_counter() - start)
+
+    class MeteredHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = MeteredHTTPConnection
+
+    class MeteredHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = MeteredHTTPSConnection
+
+    return {'http': MeteredHTTPConnectionPool, 'https': MeteredHTTPSConnectionPool}
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """带连接统计的 HTTPAdapter"""
+
+    def __init__(self, stats=None, **kwargs):
+        self.stats = stats or ConnectionStats()
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        # PoolManager 默认引用模块级的类映射，这里替换成新字典而不是原地修改
+        self.poolmanager.pool_classes_by_scheme = _metered_pool_classes(self.stats)
+
+    def send(self, request, **kwargs):
+        self.stats.record_request()
+        return super().send(request, **kwargs)
+
+
+def create_session(pool_maxsize=DEFAULT_POOL_MAXSIZE, pool_connections=DEFAULT_POOL_CONNECTIONS,
+                   pool_block=False, headers=None):
+    """创建一个新的连接池会话
+
+    Args:
+        pool_maxsize: 每个主机保留的最大连接数，应不小于对该主机的并发数
+        pool_connections: 缓存连接池的主机数量
+        pool_block: 连接数用满时是否阻塞等待，而不是临时新建连接
+        headers: 会话级默认请求头
+    Returns:
+        requests.Session，可通过 session.connection_stats 查看统计
+    """
+    stats = ConnectionStats()
+    adapter = PooledHTTPAdapter(stats=stats, pool_connections=pool_connections,
+                                pool_maxsize=pool_maxsize, pool_block=pool_block)
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    if headers:
+        session.headers.update(headers)
+    session.connection_stats = stats
+    return session
+
+
+def get_session(name='default', **kwargs):
+    """获取进程内共享的命名会话，不存在时用 kwargs 创建
+
+    同名会话只在第一次调用时按 kwargs 创建，之后的调用直接返回已有会话。
+    """
+    with _sessions_lock:
+        session = _sessions.get(name)
+        if session is None:
+            session = create_session(**kwargs)
+            _sessions[name] = session
+        return session
+
+
+def close_sessions():
+    """关闭所有共享会话"""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+本地模拟新闻站点
+
+启动一个仿新浪新闻结构的本地HTTP服务，供爬虫调试、压测和基准测试使用，
+避免直接访问真实网站。
+
+用法：
+    python mock_server.py --port 8000 --articles 200 --delay 0.1
+"""
+
+import argparse
+import hashlib
+import random
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+def render_list_page(base_url, articles, page=1, pages=1):
+    """生成新闻列表页HTML
+
+    新闻平均分布到 pages 个列表页上，每页还带有指向前 5 篇新闻的「热门」区块，
+    用来模拟同一篇新闻出现在多个列表页的情况。
+    """
+    per_page = -(-articles // pages)
+    start = (page - 1) * per_page
+    ids = list(range(start, min(start + per_page, articles)))
+    hot = [i for i in range(min(5, articles)) if i not in ids]
+    items = ''.join(
+        f'<div class="news-item"><h2><a href="{base_url}/article/{i}.html">'
+        f'模拟新闻标题 {i} 经济 科技 发展</a></h2></div>'
+        for i in ids + hot
+    )
+    pagination = ''.join(
+        f'<a href="/?page={p}">{p}</a>' for p in range(1, pages + 1) if p != page
+    )
+    return (f'<html><head><title>模拟新闻</title></head><body>{items}'
+            f'<div class="pagination">{pagination}</div></body></html>')
+
+
+# 模拟真实页面中与新闻无关的导航、推荐等区块
+FILLER_BLOCK = ''.join(
+    f'<div class="nav-block"><ul>{"".join(f"<li><a href=/channel/{i}>频道{i}</a></li>" for i in range(20))}</ul>'
+    f'<script>var ad{n} = {{"slot": {n}}};</script></div>'
+    for n in range(10)
+)
+
+
+# 生成正文用的词汇
+BODY_WORDS = [
+    '记者', '获悉', '近日', '有关部门', '发布', '通知', '要求', '各地', '加快', '推进', '项目', '建设',
+    '市场', '价格', '上涨', '下降', '企业', '投资', '增长', '同比', '百分点', '数据', '显示', '专家',
+    '认为', '未来', '趋势', '政策', '支持', '消费', '需求', '科技', '创新', '产业', '升级', '城市',
+    '居民', '服务', '保障', '安全', '环境', '治理', '会议', '强调', '落实', '措施', '效果', '明显',
+]
+
+
+def _article_paragraphs(article_id):
+    """按新闻编号生成固定的正文，不同新闻的正文各不相同"""
+    rng = random.Random(article_id)
+    return [''.join(rng.choice(BODY_WORDS) for _ in range(60)) + '。' for _ in range(8)]
+
+
+def republished_from(article_id, duplicates):
+    """按比例挑出“转载”的新闻：返回被转载的原文编号，不是转载时返回 None"""
+    if not duplicates or not article_id:
+        return None
+    rng = random.Random(f'dup-{article_id}')
+    if rng.random() < duplicates:
+        return rng.randrange(article_id)
+    return None
+
+
+def render_article_page(article_id, padding=0, source_id=None):
+    """生成新闻详情页HTML
+
+    padding 为填充区块的倍数，用来模拟真实页面的大小；
+    source_id 不为 None 时正文转载自该新闻，只在末尾加一句转载说明。
+    """
+    texts = _article_paragraphs(article_id if source_id is None else source_id)
+    if source_id is not None:
+        texts.append(f'本文转载自第{source_id}篇新闻。')
+    paragraphs = ''.join(f'<p>{text}</p>' for text in texts)
+    return (
+        '<html><head><title>模拟新闻详情</title></head><body>'
+        + FILLER_BLOCK * padding +
+        f'<h1 class="main-title">模拟新闻标题 {article_id}</h1>'
+        f'<span class="date">2024年01月{article_id % 28 + 1:02d}日 08:00</span>'
+        f'<a class="source">模拟来源{article_id % 5}</a>'
+        f'<div id="article">{paragraphs}</div>'
+        '</body></html>'
+    )
+
+
+class MockNewsHandler(BaseHTTPRequestHandler):
+    """处理列表页和详情页请求"""
+    protocol_version = 'HTTP/1.1'
+    # 响应头和正文分两次写出，关闭 Nagle 算法避免长连接上的 40ms 延迟确认
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests[self.path] = server.requests.get(self.path, 0) + 1
+        if server.delay:
+            time.sleep(server.delay)
+
+        # 每个路径的前 fail_times 次请求固定失败，测试重试时结果可以复现
+        failing = False
+        if server.fail_times:
+            with server.lock:
+                failures = server.failures.get(self.path, 0)
+                failing = failures < server.fail_times
+                if failing:
+                    server.failures[self.path] = failures + 1
+        if failing or server.error_rate and random.random() < server.error_rate:
+            # 模拟上游过载：返回 503 并要求客户端稍后重试
+            self.send_response(503)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        path, _, query = self.path.partition('?')
+        if path in ('/', '/index.html'):
+            params = parse_qs(query)
+            try:
+                page = int(params.get('page', ['1'])[0])
+            except ValueError:
+                page = 0
+            if not 1 <= page <= server.pages:
+                self.send_error(404)
+                return
+            body = render_list_page(server.base_url, server.articles, page, server.pages)
+        elif path.startswith('/article/') and path.endswith('.html'):
+            try:
+                article_id = int(path[len('/article/'):-len('.html')])
+            except ValueError:
+                article_id = -1
+            if not 0 <= article_id < server.articles:
+                self.send_error(404)
+                return
+            body = render_article_page(article_id, server.padding,
+                                       republished_from(article_id, server.duplicates))
+        else:
+            self.send_error(404)
+            return
+
+        data = body.encode('utf-8')
+        etag = '"' + hashlib.md5(data).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            # 内容没有变化，只返回响应头
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', server.last_modified)
+        self.end_headers()
+        self.wfile.write(data)
+        server.bytes_sent += len(data)
+
+    def log_message(self, format, *args):
+        # 压测时不打印访问日志
+        pass
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # 监听队列要在 listen() 之前设置，才能容纳上千个并发连接
+    request_queue_size = 1024
+
+    def handle_error(self, request, client_address):
+        # 客户端取消请求导致的断连属于正常情况，不打印堆栈
+        pass
+
+
+class MockNewsServer:
+    """在后台线程中运行的模拟新闻站点，可用作上下文管理器"""
+
+    def __init__(self, host='127.0.0.1', port=0, articles=50, delay=0.0, pages=1, padding=0, error_rate=0.0,
+                 duplicates=0.0, fail_times=0):
+        self.httpd = _MockHTTPServer((host, port), MockNewsHandler)
+        self.httpd.articles = articles
+        self.httpd.pages = pages
+        self.httpd.padding = padding
+        # 随机返回 503 的比例，用于测试重试
+        self.httpd.error_rate = error_rate
+        # 每个路径的前几次请求固定返回 503，用于可复现地测试重试
+        self.httpd.fail_times = fail_times
+        self.httpd.failures = {}
+        self.httpd.lock = threading.Lock()
+        # 各路径收到的请求数
+        self.httpd.requests = {}
+        # 正文转载自其他新闻的比例，用于测试近似重复检测
+        self.httpd.duplicates = duplicates
+        self.httpd.last_modified = formatdate(usegmt=True)
+        # 已发送的正文字节数，用于基准测试统计流量
+        self.httpd.bytes_sent = 0
+        self.httpd.delay = delay
+        self.httpd.base_url = f'http://{host}:{self.httpd.server_port}'
+        self._thread = None
+
+    @property
+    def base_url(self):
+        return self.httpd.base_url
+
+    def start(self):
+        """在后台线程中启动服务"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务并释放端口"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='本地模拟新闻站点')
+    parser.add_argument('--port', type=int, default=8000, help='监听端口')
+    parser.add_argument('--articles', type=int, default=50, help='列表页上的新闻数量')
+    parser.add_argument('--pages', type=int, default=1, help='列表页数量')
+    parser.add_argument('--padding', type=int, default=0, help='详情页填充区块的倍数（模拟真实页面大小）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='随机返回 503 的比例')
+    parser.add_argument('--duplicates', type=float, default=0.0, help='正文转载自其他新闻的比例')
+    parser.add_argument('--delay', type=float, default=0.0, help='每个请求的模拟延迟（秒）')
+    args = parser.parse_args()
+
+    server = MockNewsServer(port=args.port, articles=args.articles, delay=args.delay,
+                            pages=args.pages, padding=args.padding,
+                            error_rate=args.error_rate, duplicates=args.duplicates)
+    print(f'模拟新闻站点已启动: {server.base_url}/')
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+近似重复新闻检测
+
+同一篇稿件常以不同的URL和标题被多次发布，URL去重和内容哈希都识别不出来。
+这里用 MinHash + LSH（局部敏感哈希）找出正文近似的文章：
+
+- MinHasher：正文去掉空白后按字符 k-gram 切片，用 num_perm 个哈希函数各取最小值
+  作为签名，两篇文章签名相同位置相等的比例即切片集合 Jaccard 相似度的估计；
+  切片哈希和签名计算都在 NumPy 中完成
+- MinHashLSH：把签名分成 bands 段，每段作为哈希表的键。相似度高的文章至少有
+  一段完全相同的概率很高，查询只需核对同桶的少数候选，耗时基本不随已收录
+  的文章数增长
+- NearDuplicateFilter：爬虫使用的去重器，记录每篇文章并报告它与哪篇重复
+
+用法：
+    dedup = NearDuplicateFilter()
+    original = dedup.check(news)   # 重复时返回原文的 URL，否则返回 None
+"""
+
+import numpy as np
+
+# 多项式滚动哈希的乘数
+_PRIME = np.uint64(0x100000001B3)
+
+
+def _mix(h):
+    """splitmix64 的收尾混合，把线性变换后的哈希值重新打散"""
+    h ^= h >> np.uint64(30)
+    h *= np.uint64(0xBF58476D1CE4E5B9)
+    h ^= h >> np.uint64(27)
+    h *= np.uint64(0x94D049BB133111EB)
+    h ^= h >> np.uint64(31)
+    return h
+
+
+def shingle_hashes(text, shingle=4):
+    """正文去掉空白后，所有字符 k-gram 切片的 64 位哈希（去重）"""
+    text = ''.join(text.split())
+    codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    if len(codes) == 0:
+        return codes
+    width = min(shingle, len(codes))
+    count = len(codes) - width + 1
+    hashes = np.zeros(count, dtype=np.uint64)
+    for offset in range(width):
+        hashes = hashes * _PRIME + codes[offset:offset + count]
+    return np.unique(_mix(hashes))
+
+
+class MinHasher:
+    """计算 MinHash 签名
+
+    Args:
+        num_perm: 哈希函数个数（签名长度），越大相似度估计越准
+        shingle: 切片的字符数
+        seed: 生成哈希函数的随机种子，相互比较的签名必须使用相同的种子
+    """
+
+    def __init__(self, num_perm=128, shingle=4, seed=1):
+        self.num_perm = num_perm
+        self.shingle = shingle
+        rng = np.random.default_rng(seed)
+        # 第 i 个哈希函数为 mix(a[i] * h + b[i])，a 取奇数保证是 2^64 上的双射
+        self._a = rng.integers(1, 2 ** 63, size=(num_perm, 1), dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, size=(num_perm, 1), dtype=np.uint64)
+
+    def signature(self, text):
+        """返回长度为 num_perm 的签名，文本为空时返回 None"""
+        hashes = shingle_hashes(text, self.shingle)
+        if len(hashes) == 0:
+            return None
+        return _mix(hashes * self._a + self._b).min(axis=1)
+
+
+def jaccard(a, b):
+    """由两个签名估计 Jaccard 相似度"""
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+class MinHashLSH:
+    """MinHash 签名的 LSH 索引
+
+    Args:
+        threshold: 估计相似度不低于该值视为近似重复
+        num_perm: 签名长度
+        bands: 分段数，每段 num_perm // bands 个值；段越多越容易成为候选
+    """
+
+    def __init__(self, threshold=0.8, num_perm=128, bands=16):
+        self.threshold = threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._tables = [{} for _ in range(bands)]
+        self._signatures = {}
+
+    def _band_keys(self, signature):
+        rows = self.rows
+        return [signature[i * rows:(i + 1) * rows].tobytes() for i in range(self.bands)]
+
+    def add(self, key, signature):
+        for band_key, table in zip(self._band_keys(signature), self._tables):
+            table.setdefault(band_key, []).append(key)
+        self._signatures[key] = signature
+
+    def find(self, signature):
+        """返回相似度最高且不低于 threshold 的 (key, 相似度)，没有时返回 None"""
+        candidates = set()
+        for band_key, table in zip(self._band_keys(signature), self._tables):
+            candidates.update(table.get(band_key, ()))
+        best = None
+        for key in candidates:
+            similarity = jaccard(signature, self._signatures[key])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+    def __len__(self):
+        return len(self._signatures)
+
+
+class NearDuplicateFilter:
+    """新闻近似重复检测
+
+    Args:
+        threshold: 判为重复的最低相似度（正文切片的 Jaccard 相似度）
+        mode: 'drop' 丢弃重复的新闻，'cluster' 保留并在 duplicate_of 字段记录原文URL
+        min_length: 正文短于该长度时不参与检测（指纹不可靠）
+    """
+
+    MODES = ('drop', 'cluster')
+
+    def __init__(self, threshold=0.8, mode='drop', min_length=50):
+        if mode not in self.MODES:
+            raise ValueError(f'未知的去重方式: {mode}，可选 {self.MODES}')
+        self.mode = mode
+        self.min_length = min_length
+        self.hasher = MinHasher()
+        self.index = MinHashLSH(threshold, num_perm=self.hasher.num_perm)
+        self.duplicate_count = 0
+
+    def _signature(self, news):
+        content = news.get('content') or ''
+        if len(content) < self.min_length:
+            return None
+        return self.hasher.signature(content)
+
+    def add(self, news):
+        """收录一篇新闻（例如增量模式下已保存的新闻），不做检测"""
+        signature = self._signature(news)
+        if signature is not None:
+            self.index.add(news.get('url'), signature)
+
+    def check(self, news):
+        """检测并收录一篇新闻：与已收录的新闻近似重复时返回原文URL，否则返回 None"""
+        signature = self._signature(news)
+        if signature is None:
+            return None
+        found = self.index.find(signature)
+        if found:
+            self.duplicate_count += 1
+            return found[0]
+        self.index.add(news.get('url'), signature)
+        return None
@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+新闻全文索引
+
+在爬虫输出的新闻上建立倒排索引，按 BM25 排序检索标题和正文：
+- 分词与热门词汇统计一致（term_freq.BigramSegmenter）：汉字按相邻两字切分，
+  英文和数字按单词切分，并记录每个词的字符位置，用于短语查询
+- 索引由若干只追加的段（segment）组成，每次 add() 写入一个新段；同一URL
+  以最新的段为准，内容没有变化的新闻不会重复写入
+- 每个段是一组 NumPy 数组文件，查询时以内存映射方式打开，只读取命中的
+  词表项、倒排表和需要显示的文档，不把整个语料载入内存
+
+查询语法：空格分隔的词要求同时出现（标题或正文中），双引号括起的部分
+按短语匹配，例如 `人工智能 "芯片产业"`。
+
+用法：
+    python news_index.py build news_data.json --index news_index
+    python news_index.py search '人工智能 "芯片产业"' --index news_index --from 2024-01-01
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import re
+import shutil
+import time
+from itertools import chain
+
+import numpy as np
+
+from crawl_frontier import normalize_url
+from news_sink import iter_news_chunks
+from term_freq import BigramSegmenter
+
+# 建立索引的字段和各字段的评分权重
+FIELD_BOOSTS = {'title': 2.0, 'content': 1.0}
+# 查询结果中返回的字段
+STORED_FIELDS = ['url', 'title', 'date', 'publish_time', 'author', 'category']
+# BM25 参数
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_QUERY_PATTERN = re.compile(r'"([^"]*)"|(\S+)')
+# 发布时间中的日期，例如 "2024年01月05日 08:00"、"2024-01-05 08:00"
+_PUBLISH_DATE_PATTERN = re.compile(r'(\d{4})\D(\d{1,2})\D(\d{1,2})')
+_ARRAYS = ['term_hash', 'term_ptr', 'post_doc', 'post_tf', 'pos_ptr', 'positions', 'doc_len']
+
+
+def term_key(text):
+    """词、URL 等字符串的 64 位哈希，用作有序数组中的查找键"""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _date_days(value):
+    """'YYYY-MM-DD' -> 距 1970-01-01 的天数，无法解析时返回 -1"""
+    try:
+        return int(np.datetime64(str(value)[:10], 'D').astype(np.int64))
+    except (TypeError, ValueError):
+        return -1
+
+
+def _publish_days(record):
+    """新闻发布日期距 1970-01-01 的天数；没有发布时间或无法解析时按爬取日期（date 字段）"""
+    match = _PUBLISH_DATE_PATTERN.search(record.get('publish_time') or '')
+    if match:
+        days = _date_days('{}-{:0>2}-{:0>2}'.format(*match.groups()))
+        if days >= 0:
+            return days
+    return _date_days(record.get('date'))
+
+
+def _content_version(record):
+    return term_key(normalize_url(record['url']) + '\n' + (record.get('title') or '') + '\n'
+                    + (record.get('content') or ''))
+
+
+class _FieldIndex:
+    """一个段中某个字段的倒排表（内存映射）"""
+
+    def __init__(self, path, field):
+        for name in _ARRAYS:
+            setattr(self, name, np.load(os.path.join(path, f'{field}.{name}.npy'), mmap_mode='r'))
+
+    def lookup(self, key):
+        """返回词在倒排表中的 [start, end) 区间，词不存在时返回 None"""
+        i = int(np.searchsorted(self.term_hash, np.uint64(key)))
+        if i < len(self.term_hash) and int(self.term_hash[i]) == key:
+            return int(self.term_ptr[i]), int(self.term_ptr[i + 1])
+        return None
+
+    def docs(self, key):
+        span = self.lookup(key)
+        if span is None:
+            return np.empty(0, dtype=np.uint32)
+        return np.asarray(self.post_doc[span[0]:span[1]])
+
+    def occurrences(self, key, docs=None):
+        """返回词的所有出现位置，编码为 (文档编号 << 32) | 字符位置；docs 不为空时只保留这些文档"""
+        span = self.lookup(key)
+        if span is None:
+            return np.empty(0, dtype=np.uint64)
+        post_doc = np.asarray(self.post_doc[span[0]:span[1]], dtype=np.uint64)
+        # 同一个词的倒排项连续存放，位置也是连续的一段
+        positions = np.asarray(self.positions[self.pos_ptr[span[0]]:self.pos_ptr[span[1]]], dtype=np.uint64)
+        encoded = (np.repeat(post_doc, self.post_tf[span[0]:span[1]]) << np.uint64(32)) | positions
+        if docs is not None:
+            encoded = encoded[np.isin(encoded >> np.uint64(32), docs)]
+        return encoded
+
+    def term_frequencies(self, key, docs):
+        """返回 docs 中每篇文档里该词出现的次数"""
+        tf = np.zeros(len(docs), dtype=np.float64)
+        span = self.lookup(key)
+        if span is None:
+            return tf
+        post_doc = self.post_doc[span[0]:span[1]]
+        idx = np.searchsorted(post_doc, docs)
+        hit = idx < len(post_doc)
+        hit[hit] = post_doc[idx[hit]] == docs[hit]
+        tf[hit] = self.post_tf[span[0] + idx[hit]]
+        return tf
+
+
+class _Segment:
+    """索引中的一个段"""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'meta.json'), 'r', encoding='utf-8') as f:
+            self.meta = json.load(f)
+        self.fields = {field: _FieldIndex(path, field) for field in FIELD_BOOSTS}
+        self.doc_url = np.load(os.path.join(path, 'doc_url.npy'), mmap_mode='r')
+        self.doc_version = np.load(os.path.join(path, 'doc_version.npy'), mmap_mode='r')
+        self.doc_date = np.load(os.path.join(path, 'doc_date.npy'), mmap_mode='r')
+        self.doc_author = np.load(os.path.join(path, 'doc_author.npy'), mmap_mode='r')
+        self.doc_offsets = np.load(os.path.join(path, 'doc_offsets.npy'), mmap_mode='r')
+        # 被更新的段中同一URL覆盖的文档记为失效
+        self.alive = np.ones(len(self.doc_url), dtype=bool)
+
+    def stored(self, doc):
+        """读取一篇文档的存储字段"""
+        with open(os.path.join(self.path, 'docs.jsonl'), 'rb') as f:
+            f.seek(int(self.doc_offsets[doc]))
+            return json.loads(f.readline())
+
+
+def _write_segment(path, records, segmenter):
+    """把一批新闻写成一个段"""
+    os.makedirs(path)
+    postings = {field: {} for field in FIELD_BOOSTS}
+    doc_len = {field: [] for field in FIELD_BOOSTS}
+    authors = {}
+    doc_author = []
+    offsets = []
+    with open(os.path.join(path, 'docs.jsonl'), 'wb') as f:
+        for doc, record in enumerate(records):
+            for field, field_postings in postings.items():
+                tokens, positions = segmenter.tokenize_positions(record.get(field) or '')
+                doc_len[field].append(len(tokens))
+                doc_terms = {}
+                for token, position in zip(tokens, positions):
+                    doc_terms.setdefault(token, []).append(position)
+                for token, token_positions in doc_terms.items():
+                    field_postings.setdefault(token, []).append((doc, token_positions))
+            author = record.get('author')
+            doc_author.append(authors.setdefault(author, len(authors)) if author else -1)
+            offsets.append(f.tell())
+            stored = {name: record.get(name) for name in STORED_FIELDS}
+            f.write(json.dumps(stored, ensure_ascii=False, default=str).encode('utf-8') + b'\n')
+
+    def save(name, values, dtype):
+        np.save(os.path.join(path, name + '.npy'), np.asarray(values, dtype=dtype))
+
+    for field, field_postings in postings.items():
+        items = sorted((term_key(token), entries) for token, entries in field_postings.items())
+        save(f'{field}.term_hash', [key for key, _ in items], np.uint64)
+        save(f'{field}.term_ptr', np.cumsum([0] + [len(entries) for _, entries in items]), np.int64)
+        entries = [entry for _, term_entries in items for entry in term_entries]
+        save(f'{field}.post_doc', [doc for doc, _ in entries], np.uint32)
+        save(f'{field}.post_tf', [len(positions) for _, positions in entries], np.uint32)
+        save(f'{field}.pos_ptr', np.cumsum([0] + [len(positions) for _, positions in entries]), np.int64)
+        save(f'{field}.positions', [p for _, positions in entries for p in positions], np.uint32)
+        save(f'{field}.doc_len', doc_len[field], np.uint32)
+    save('doc_url', [term_key(normalize_url(record['url'])) for record in records], np.uint64)
+    save('doc_version', [_content_version(record) for record in records], np.uint64)
+    save('doc_date', [_publish_days(record) for record in records], np.int32)
+    save('doc_author', doc_author, np.int32)
+    save('doc_offsets', offsets, np.int64)
+    meta = {
+        'docs': len(records),
+        'authors': list(authors),
+        'total_len': {field: int(sum(lengths)) for field, lengths in doc_len.items()},
+    }
+    with open(os.path.join(path, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+
+def parse_query(query, segmenter):
+    """把查询拆成子句 [(词列表, 相对位置列表, 是否短语), ...]"""
+    clauses = []
+    for phrase, word in _QUERY_PATTERN.findall(query):
+        tokens, positions = segmenter.tokenize_positions(phrase or word)
+        if tokens:
+            ordered = sorted(zip(positions, tokens))
+            start = ordered[0][0]
+            clauses.append(([token for _, token in ordered], [p - start for p, _ in ordered], bool(phrase)))
+    return clauses
+
+
+class NewsIndex:
+    """新闻全文索引
+
+    Args:
+        path: 索引目录，不存在时在第一次 add() 时创建
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # 索引保留单个字母和数字，例如“第7篇”中的 7
+        self.segmenter = BigramSegmenter(min_ascii_len=1)
+        self.segments = []
+        self._open()
+
+    def _manifest_path(self):
+        return os.path.join(self.path, 'index.json')
+
+    def _open(self):
+        names = []
+        if os.path.exists(self._manifest_path()):
+            with open(self._manifest_path(), 'r', encoding='utf-8') as f:
+                names = json.load(f)['segments']
+        self.segments = [_Segment(os.path.join(self.path, name)) for name in names]
+        # 从新到旧标记失效文档：同一URL只保留最新段中的一份
+        newer = np.empty(0, dtype=np.uint64)
+        for segment in reversed(self.segments):
+            segment.alive = ~np.isin(segment.doc_url, newer)
+            newer = np.union1d(newer, segment.doc_url)
+            # 有效文档各字段的总长度，评分时的平均长度不计入已被覆盖的文档
+            segment.alive_len = {
+                field: int(field_index.doc_len[segment.alive].sum()) for field, field_index in segment.fields.items()
+            }
+
+    def __len__(self):
+        return sum(int(segment.alive.sum()) for segment in self.segments)
+
+    def add(self, records, segment_size=10000):
+        """把新闻加入索引，返回新写入的文档数
+
+        已索引且标题、正文都没有变化的新闻会被跳过；每 segment_size 篇写一个段，
+        控制建立索引时的内存占用。
+        """
+        os.makedirs(self.path, exist_ok=True)
+        indexed = np.empty(0, dtype=np.uint64)
+        if self.segments:
+            indexed = np.concatenate([segment.doc_version[segment.alive] for segment in self.segments])
+        indexed = set(indexed.tolist())
+
+        added = 0
+        batch = {}
+        names = [os.path.basename(segment.path) for segment in self.segments]
+        for record in records:
+            if not record.get('url') or _content_version(record) in indexed:
+                continue
+            # 同一批中同一URL以最后一条为准
+            batch.pop(normalize_url(record['url']), None)
+            batch[normalize_url(record['url'])] = record
+            if len(batch) >= segment_size:
+                names.append(self._flush(batch, len(names)))
+                added += len(batch)
+                batch = {}
+        if batch:
+            names.append(self._flush(batch, len(names)))
+            added += len(batch)
+
+        if added:
+            # 先写好新段再原子替换清单，中途失败不会破坏已有索引
+            tmp = self._manifest_path() + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'segments': names}, f)
+            os.replace(tmp, self._manifest_path())
+            self._open()
+        return added
+
+    def _flush(self, batch, number):
+        name = f'seg-{number:06d}-{os.getpid()}-{int(time.time())}'
+        _write_segment(os.path.join(self.path, name), list(batch.values()), self.segmenter)
+        return name
+
+    def _stats(self, clauses):
+        """全局统计：文档数、各字段平均长度、每个词的文档频率，只计入有效（没有被更新的段覆盖）的文档"""
+        docs = len(self)
+        avg_len = {
+            field: sum(segment.alive_len[field] for segment in self.segments) / max(docs, 1)
+            for field in FIELD_BOOSTS
+        }
+        keys = {term_key(token) for tokens, _, _ in clauses for token in tokens}
+        df = {}
+        for field in FIELD_BOOSTS:
+            for key in keys:
+                df[field, key] = 0
+                for segment in self.segments:
+                    span = segment.fields[field].lookup(key)
+                    if span:
+                        post_doc = segment.fields[field].post_doc[span[0]:span[1]]
+                        df[field, key] += int(segment.alive[post_doc].sum())
+        return docs, avg_len, df
+
+    def _phrase_docs(self, field_index, keys, offsets, candidates=None):
+        """返回字段中按顺序包含整个短语的文档编号"""
+        starts = field_index.occurrences(keys[0], candidates)
+        for key, offset in zip(keys[1:], offsets[1:]):
+            if not len(starts):
+                break
+            starts = starts[np.isin(starts + np.uint64(offset), field_index.occurrences(key, candidates))]
+        return np.unique(starts >> np.uint64(32)).astype(np.uint32)
+
+    def _match(self, segment, clauses):
+        """返回段中满足所有子句的文档编号"""
+        candidates = None
+        for tokens, offsets, is_phrase in clauses:
+            keys = [term_key(token) for token in tokens]
+            if is_phrase:
+                docs = np.unique(np.concatenate([
+                    self._phrase_docs(field_index, keys, offsets, candidates)
+                    for field_index in segment.fields.values()
+                ]))
+            else:
+                docs = None
+                for key in keys:
+                    key_docs = np.unique(np.concatenate([
+                        field_index.docs(key) for field_index in segment.fields.values()
+                    ]))
+                    docs = key_docs if docs is None else np.intersect1d(docs, key_docs, assume_unique=True)
+            candidates = docs if candidates is None else np.intersect1d(candidates, docs, assume_unique=True)
+            if not len(candidates):
+                break
+        return candidates
+
+    def search(self, query, limit=10, date_from=None, date_to=None, author=None):
+        """检索新闻，返回按相关度排序的结果列表
+
+        Args:
+            query: 查询字符串，空格分隔的词须同时出现，双引号括起的部分按短语匹配
+            limit: 最多返回的条数
+            date_from / date_to: 发布日期范围（含两端），'YYYY-MM-DD'；没有发布时间的新闻按爬取日期
+            author: 只返回该作者（来源）的新闻
+        """
+        clauses = parse_query(query, self.segmenter)
+        if not clauses or not self.segments:
+            return []
+        total, avg_len, df = self._stats(clauses)
+        keys = list({term_key(token) for tokens, _, _ in clauses for token in tokens})
+
+        top = []
+        for number, segment in enumerate(self.segments):
+            docs = self._match(segment, clauses)
+            if docs is None or not len(docs):
+                continue
+            mask = segment.alive[docs]
+            if date_from:
+                mask &= segment.doc_date[docs] >= _date_days(date_from)
+            if date_to:
+                mask &= segment.doc_date[docs] <= _date_days(date_to)
+            if author is not None:
+                authors = segment.meta['authors']
+                author_id = authors.index(author) if author in authors else -2
+                mask &= segment.doc_author[docs] == author_id
+            docs = docs[mask]
+            if not len(docs):
+                continue
+
+            scores = np.zeros(len(docs))
+            for field, boost in FIELD_BOOSTS.items():
+                field_index = segment.fields[field]
+                length_norm = 1 - BM25_B + BM25_B * field_index.doc_len[docs] / max(avg_len[field], 1e-9)
+                for key in keys:
+                    tf = field_index.term_frequencies(key, docs)
+                    if not tf.any():
+                        continue
+                    idf = np.log(1 + (total - df[field, key] + 0.5) / (df[field, key] + 0.5))
+                    scores += boost * idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm)
+
+            if len(docs) > limit:
+                best = np.argpartition(-scores, limit - 1)[:limit]
+            else:
+                best = np.arange(len(docs))
+            top.extend((float(scores[i]), number, int(docs[i])) for i in best)
+
+        results = []
+        for score, number, doc in heapq.nlargest(limit, top):
+            result = self.segments[number].stored(doc)
+            result['score'] = round(score, 4)
+            results.append(result)
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='新闻全文索引')
+    parser.add_argument('--index', default='news_index', help='索引目录')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    build = commands.add_parser('build', help='把爬虫输出的新闻加入索引（增量）')
+    build.add_argument('source', nargs='?', default='news_data.json', help='新闻数据文件')
+    build.add_argument('--rebuild', action='store_true', help='删除已有索引后重新建立')
+
+    search = commands.add_parser('search', help='检索新闻')
+    search.add_argument('query', help='查询，双引号括起的部分按短语匹配')
+    search.add_argument('-n', '--limit', type=int, default=10, help='返回条数')
+    search.add_argument('--from', dest='date_from', help='发布日期起始 YYYY-MM-DD')
+    search.add_argument('--to', dest='date_to', help='发布日期截止 YYYY-MM-DD')
+    search.add_argument('--author', help='作者（来源）')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        if args.rebuild and os.path.exists(args.index):
+            shutil.rmtree(args.index)
+        index = NewsIndex(args.index)
+        start = time.perf_counter()
+        added = index.add(chain.from_iterable(iter_news_chunks(args.source)))
+        print(f"新增或更新 {added} 篇，索引共 {len(index)} 篇，{len(index.segments)} 个段，"
+              f"耗时 {time.perf_counter() - start:.2f}s")
+    else:
+        index = NewsIndex(args.index)
+        start = time.perf_counter()
+        results = index.search(args.query, limit=args.limit, date_from=args.date_from,
+                               date_to=args.date_to, author=args.author)
+        elapsed = (time.perf_counter() - start) * 1000
+        for result in results:
+            print(f"{result['score']:8.3f}  {result.get('publish_time') or result['date']}  "
+                  f"{result['title']}  {result['url']}")
+        print(f"\n共 {len(results)} 条结果，耗时 {elapsed:.1f}ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+JSON Lines 流式输出
+
+爬虫每解析出一条新闻就追加一行 JSON 到文件中，不在内存里累积全部数据，
+程序中途崩溃也只会丢失最后几条未落盘的记录。
+
+支持 gzip 压缩（标准库）和 zstd 压缩（需要安装 zstandard），
+读取时按扩展名（.gz / .zst）自动识别压缩格式。压缩文件每次落盘都结束当前的
+gzip member / zstd frame，落盘后的文件总是完整可读的；崩溃时写了一半的末尾
+在重新打开追加前截掉，读取时遇到损坏的末尾也只是停止，不会报错。
+"""
+
+import gzip
+import io
+import json
+import os
+import threading
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 读取到损坏（被截断）的压缩数据时的异常
+_DAMAGED_ERRORS = (EOFError, zlib.error, gzip.BadGzipFile, UnicodeDecodeError)
+if zstandard is not None:
+    _DAMAGED_ERRORS += (zstandard.ZstdError,)
+
+
+def _detect_compression(path):
+    if path.endswith('.gz'):
+        return 'gzip'
+    if path.endswith('.zst'):
+        return 'zstd'
+    return None
+
+
+def _require_zstd():
+    if zstandard is None:
+        raise RuntimeError('使用 zstd 压缩需要先安装 zstandard：pip install zstandard')
+
+
+def _decompressor(compression):
+    """解压一个 gzip member 或 zstd frame 的解压器，结束时 eof 为 True，之后的数据在 unused_data 中"""
+    if compression == 'gzip':
+        return zlib.decompressobj(wbits=31)
+    return zstandard.ZstdDecompressor().decompressobj()
+
+
+def _complete_length(path, compression, block_size=1 << 20):
+    """文件开头完整部分的字节数：压缩文件为完整的 gzip member / zstd frame，未压缩文件为完整的行"""
+    with open(path, 'rb') as f:
+        if compression is None:
+            position = f.seek(0, os.SEEK_END)
+            while position > 0:
+                step = min(block_size, position)
+                position -= step
+                f.seek(position)
+                index = f.read(step).rfind(b'\n')
+                if index >= 0:
+                    return position + index + 1
+            return 0
+
+        complete = offset = 0
+        decompressor = _decompressor(compression)
+        while True:
+            data = f.read(block_size)
+            if not data:
+                return complete
+            while data:
+                try:
+                    decompressor.decompress(data)
+                except _DAMAGED_ERRORS:
+                    return complete
+                if not decompressor.eof:
+                    offset += len(data)
+                    break
+                offset += len(data) - len(decompressor.unused_data)
+                complete = offset
+                data = decompressor.unused_data
+                decompressor = _decompressor(compression)
+
+
+def repair(path, compression=None):
+    """截掉崩溃时写了一半的末尾（不完整的压缩段或行），返回截掉的字节数"""
+    compression = compression or _detect_compression(path)
+    size = os.path.getsize(path)
+    length = _complete_length(path, compression)
+    if length < size:
+        with open(path, 'r+b') as f:
+            f.truncate(length)
+    return size - length
+
+
+class JsonLinesSink:
+    """追加写入的 JSON Lines 文件
+
+    Args:
+        path: 输出文件路径
+        compression: None、'gzip' 或 'zstd'，默认按扩展名判断
+        fsync_every: 每写入多少条记录强制落盘一次，0 表示只在关闭时落盘；
+            压缩文件每次落盘结束一个压缩段，间隔太小会降低压缩率
+    """
+
+    def __init__(self, path, compression=None, fsync_every=100):
+        self.path = path
+        self.compression = compression or _detect_compression(path)
+        self.fsync_every = fsync_every
+        self.count = 0
+        self._lock = threading.Lock()
+        if self.compression not in (None, 'gzip', 'zstd'):
+            raise ValueError(f'不支持的压缩格式: {self.compression}')
+        if self.compression == 'zstd':
+            _require_zstd()
+        # 上次崩溃留下的不完整末尾先截掉，否则追加的数据接在损坏的数据后面无法读取
+        if os.path.exists(path):
+            dropped = repair(path, self.compression)
+            if dropped:
+                print(f'{path} 末尾有 {dropped} 字节不完整的数据（上次写入中断），已截掉')
+        # 以追加方式打开：gzip 和 zstd 都支持多段数据首尾相接
+        self._raw = open(path, 'ab')
+        self._writer = self._raw if self.compression is None else None
+
+    def _open_writer(self):
+        """开始一个新的压缩段"""
+        if self.compression == 'gzip':
+            return gzip.GzipFile(fileobj=self._raw, mode='ab')
+        return zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+
+    def write(self, record):
+        """写入一条记录"""
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            if self._writer is None:
+                self._writer = self._open_writer()
+            self._writer.write(line.encode('utf-8'))
+            self.count += 1
+            if self.fsync_every and self.count % self.fsync_every == 0:
+                self._sync()
+
+    def _end_member(self):
+        """结束当前的压缩段（gzip 写入 member 尾部，zstd 结束 frame），下次写入时开始新的一段"""
+        if self.compression == 'gzip' and self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        elif self.compression == 'zstd' and self._writer is not None:
+            self._writer.flush(zstandard.FLUSH_FRAME)
+
+    def _sync(self):
+        """结束当前压缩段，把数据写入磁盘；之后即使崩溃，已落盘的部分也是完整可读的"""
+        self._end_member()
+        self._raw.flush()
+        os.fsync(self._raw.fileno())
+
+    def flush(self):
+        with self._lock:
+            if not self._raw.closed:
+                self._sync()
+
+    def close(self):
+        with self._lock:
+            if self._raw.closed:
+                return
+            self._end_member()
+            self._raw.flush()
+            os.fsync(self._raw.fileno())
+            self._raw.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def _open_text(path, compression):
+    if compression == 'gzip':
+        return gzip.open(path, 'rt', encoding='utf-8')
+    if compression == 'zstd':
+        _require_zstd()
+        raw = open(path, 'rb')
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def iter_jsonl(path, compression=None):
+    """逐条读取 JSON Lines 文件；末尾写了一半的行或被截断的压缩段（例如崩溃时）会被忽略"""
+    with _open_text(path, compression or _detect_compression(path)) as f:
+        lines = iter(f)
+        while True:
+            try:
+                line = next(lines)
+            except StopIteration:
+                return
+            except _DAMAGED_ERRORS:
+                # 损坏的末尾：之前的记录已经读出，到此为止
+                return
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                continue
+
+
+def read_jsonl_chunks(path, chunksize=1000, compression=None):
+    """按块读取 JSON Lines 文件，每次产出最多 chunksize 条记录的列表"""
+    chunk = []
+    for record in iter_jsonl(path, compression):
+        chunk.append(record)
+        if len(chunk) >= chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def is_jsonl_path(path):
+    """根据扩展名判断是否为 JSON Lines 文件"""
+    return path.endswith(('.jsonl', '.jsonl.gz', '.jsonl.zst'))
+
+
+def iter_news_chunks(source, chunksize=1000, columns=None):
+    """按块读取爬虫输出的新闻（.json、.jsonl[.gz|.zst] 或 Parquet 数据集）
+
+    读取 Parquet 时只加载 columns 中的列，None 表示全部列。
+    """
+    if is_jsonl_path(source):
+        yield from read_jsonl_chunks(source, chunksize)
+        return
+    from storage import is_parquet_path, open_storage
+
+    if is_parquet_path(source):
+        yield from open_storage(source, 'news').iter_batches(columns=columns, batch_size=chunksize)
+    else:
+        with open(source, 'r', encoding='utf-8') as f:
+            records = json.load(f)
+        for i in range(0, len(records), chunksize):
+            yield records[i:i + chunksize]
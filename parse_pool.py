@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+多进程解析流水线
+
+HTML 解析是纯 CPU 工作，受 GIL 限制在线程里无法并行。这里把抓取到的页面
+交给一组解析进程处理：
+- 抓取线程调用 submit_detail() 提交页面，立即拿到一个 Future，继续抓取下一页
+- 等待解析的页面数超过 queue_size 时 submit_detail() 会阻塞，抓取自然放慢（背压）
+- 解析结果通过 Future 按提交顺序交回写入端
+
+第一次提交发生在抓取线程中，此时其他抓取线程正在运行；用 fork 启动解析进程会继承
+这些线程持有的锁，子进程可能死锁（Python 3.12 起会给出警告），所以改用 forkserver
+（不支持时用 spawn）启动。
+"""
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from html_extract import get_extractor
+
+# 每个解析进程各自持有的解析器
+_extractor = None
+
+
+def mp_context():
+    """不用 fork 的进程启动方式：forkserver，不支持时（Windows）用 spawn；charts.ChartRenderer 也使用"""
+    method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return multiprocessing.get_context(method)
+
+
+def _init_worker(parser):
+    global _extractor
+    _extractor = get_extractor(parser)
+
+
+def _parse_detail(html):
+    try:
+        return _extractor.extract_detail(html)
+    except Exception as e:
+        print(f"解析新闻详情失败: {e}")
+        return None
+
+
+class ParsePipeline:
+    """有界队列 + 解析进程池
+
+    Args:
+        parser: 解析后端，见 html_extract.get_extractor
+        workers: 解析进程数，默认等于CPU核数
+        queue_size: 最多有多少个页面在排队或解析中，默认为进程数的 4 倍
+    """
+
+    def __init__(self, parser='auto', workers=None, queue_size=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size or self.workers * 4
+        self._slots = threading.BoundedSemaphore(self.queue_size)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=mp_context(), initializer=_init_worker, initargs=(parser,)
+        )
+
+    def submit_detail(self, html):
+        """提交一个详情页，队列已满时阻塞等待"""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(_parse_detail, html)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def close(self):
+        """等待所有页面解析完成并关闭进程池"""
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+限速与重试调度
+
+- TokenBucket / HostRateLimiter：按主机的令牌桶，持续请求速率不超过设定值，允许短时突发
+- RetryPolicy：指数退避 + 随机抖动，优先遵循服务器返回的 Retry-After
+- RetryScheduler：多线程执行一批请求，失败的请求按退避时间放回调度队列，
+  而不是在原地睡眠或递归重试，工作线程在等待期间会先处理其他已就绪的请求
+"""
+
+import heapq
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# 值得重试的HTTP状态码
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class RetryableError(Exception):
+    """可以重试的失败（超时、连接错误、429/5xx），retry_after 为服务器要求的等待秒数"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value):
+    """解析 Retry-After 头：可以是秒数，也可以是HTTP日期；无法解析时返回 None"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """令牌桶：每秒补充 rate 个令牌，最多积累 burst 个"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        """尝试取一个令牌：成功返回 0，否则返回还需等待的秒数（不阻塞）"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self):
+        """阻塞直到取得一个令牌"""
+        while True:
+            wait = self.try_acquire()
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """按主机分配令牌桶
+
+    Args:
+        rate: 每个主机每秒允许的请求数
+        burst: 允许的突发请求数
+        overrides: {主机: 每秒请求数}，为个别主机单独设置速率
+    """
+
+    def __init__(self, rate, burst=1, overrides=None):
+        self.rate = rate
+        self.burst = burst
+        self.overrides = overrides or {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.overrides.get(host, self.rate), self.burst)
+                self._buckets[host] = bucket
+            return bucket
+
+    def try_acquire(self, url):
+        return self._bucket(url).try_acquire()
+
+    def acquire(self, url):
+        self._bucket(url).acquire()
+
+
+class RetryPolicy:
+    """指数退避 + 全抖动（full jitter）
+
+    第 n 次重试前等待 random(0, min(max_delay, base_delay * 2**n)) 秒；
+    服务器给出 Retry-After 时至少等待该时长。
+    """
+
+    def __init__(self, retry_times=3, base_delay=0.5, max_delay=30.0):
+        self.retry_times = retry_times
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt, retry_after=None):
+        backoff = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            return max(retry_after, backoff)
+        return backoff
+
+
+class RetryScheduler:
+    """用若干工作线程执行一批任务，失败的任务按退避时间重新排队
+
+    Args:
+        workers: 工作线程数
+        policy: 重试策略
+        rate_limiter: 按主机限速，取不到令牌的任务延后执行
+    """
+
+    def __init__(self, workers=1, policy=None, rate_limiter=None):
+        self.workers = max(1, workers)
+        self.policy = policy or RetryPolicy()
+        self.rate_limiter = rate_limiter
+
+    def run(self, func, urls):
+        """对每个 url 调用 func(url)，返回结果列表（顺序与 urls 一致，最终失败的为 None）
+
+        func 抛出 RetryableError 时按重试策略重新排队，抛出其他异常时记为失败。
+        """
+        results = [None] * len(urls)
+        # 调度队列：(就绪时间, 序号, 已重试次数)
+        queue = [(0.0, index, 0) for index in range(len(urls))]
+        heapq.heapify(queue)
+        state = {'pending': len(urls)}
+        condition = threading.Condition()
+
+        def next_task():
+            with condition:
+                while state['pending']:
+                    if queue:
+                        ready_at = queue[0][0]
+                        now = time.monotonic()
+                        if ready_at <= now:
+                            return heapq.heappop(queue)
+                        condition.wait(ready_at - now)
+                    else:
+                        condition.wait()
+                return None
+
+        def reschedule(delay, index, attempt):
+            with condition:
+                heapq.heappush(queue, (time.monotonic() + delay, index, attempt))
+                condition.notify()
+
+        def finish(index, result):
+            with condition:
+                results[index] = result
+                state['pending'] -= 1
+                condition.notify_all()
+
+        def worker():
+            while True:
+                task = next_task()
+                if task is None:
+                    return
+                _, index, attempt = task
+                url = urls[index]
+                if self.rate_limiter:
+                    wait = self.rate_limiter.try_acquire(url)
+                    if wait:
+                        reschedule(wait, index, attempt)
+                        continue
+                try:
+                    finish(index, func(url))
+                except RetryableError as e:
+                    if attempt < self.policy.retry_times:
+                        delay = self.policy.delay(attempt, e.retry_after)
+                        print(f"获取页面失败（{e}），{delay:.1f}秒后进行第{attempt + 1}次重试...")
+                        reschedule(delay, index, attempt + 1)
+                    else:
+                        print(f"获取页面失败: {e}")
+                        finish(index, None)
+                except Exception as e:
+                    print(f"获取页面失败: {e}")
+                    finish(index, None)
+
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(min(self.workers, len(urls)))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
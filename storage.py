@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+数据存储层
+
+爬虫和天气查询的结果原来只能保存为 JSON / CSV 文本。这里提供统一的读写接口：
+- JsonStorage / CsvStorage：兼容原有的文本格式
+- ParquetStorage：按列存储、带类型的 Parquet 数据集，可按日期/类别/城市分区，
+  读取时只加载需要的列（列裁剪），并把过滤条件下推到文件和分区层面（谓词下推）
+
+Parquet 需要安装 pyarrow：pip install pyarrow
+
+用法：
+    store = open_storage('news_parquet', kind='news')
+    store.write(records)
+    df = store.load(columns=['title', 'author'], filters=[('date', '>=', '2024-01-01')])
+"""
+
+import json
+import os
+import uuid
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pc = None
+    ds = None
+    pq = None
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise RuntimeError('Parquet 存储需要先安装 pyarrow：pip install pyarrow')
+
+
+def news_schema():
+    """新闻数据的列类型"""
+    _require_pyarrow()
+    return pa.schema([
+        ('title', pa.string()),
+        ('date', pa.date32()),
+        ('category', pa.string()),
+        ('url', pa.string()),
+        ('content', pa.string()),
+        ('publish_time', pa.string()),
+        ('author', pa.string()),
+        ('content_hash', pa.string()),
+        ('duplicate_of', pa.string()),
+    ])
+
+
+def weather_schema():
+    """天气数据的列类型，温度等数值列以浮点数保存"""
+    _require_pyarrow()
+    return pa.schema([
+        ('城市', pa.string()),
+        ('日期', pa.date32()),
+        ('天气', pa.string()),
+        ('温度', pa.float64()),
+        ('体感温度', pa.float64()),
+        ('最低温度', pa.float64()),
+        ('最高温度', pa.float64()),
+        ('湿度', pa.float64()),
+        ('风速', pa.float64()),
+        ('更新时间', pa.timestamp('ms')),
+    ])
+
+
+# 不同数据的默认分区列
+NEWS_PARTITION_COLS = ['date', 'category']
+WEATHER_PARTITION_COLS = ['城市', '日期']
+
+
+def _to_frame(records):
+    if isinstance(records, pd.DataFrame):
+        return records.copy()
+    return pd.DataFrame.from_records(list(records))
+
+
+def to_number(series):
+    """把 '23.5°C'、'60%' 这类带单位的字符串转换为浮点数"""
+    if not pd.api.types.is_numeric_dtype(series):
+        series = series.astype(str).str.extract(r'(-?\d+(?:\.\d+)?)', expand=False)
+    return pd.to_numeric(series, errors='coerce')
+
+
+def _prepare_weather(df):
+    """统一天气数据的列类型"""
+    for column in ('温度', '体感温度', '最低温度', '最高温度', '湿度', '风速'):
+        if column in df:
+            df[column] = to_number(df[column])
+    if '更新时间' in df:
+        df['更新时间'] = pd.to_datetime(df['更新时间'], errors='coerce')
+    if '日期' in df:
+        df['日期'] = pd.to_datetime(df['日期'], errors='coerce')
+    elif '更新时间' in df:
+        # 实时天气没有日期列，用更新时间所在的日期分区
+        df['日期'] = df['更新时间']
+    return df
+
+
+def _prepare_news(df):
+    """统一新闻数据的列类型"""
+    if 'date' in df:
+        df['date'] = pd.to_datetime(df['date'], errors='coerce')
+    return df
+
+
+def _to_table(df, schema):
+    """按 schema 补齐缺失列、调整列顺序并转换为 Arrow 表"""
+    for field in schema:
+        if field.name not in df:
+            df[field.name] = None
+    df = df[schema.names]
+    for field in schema:
+        if pa.types.is_date32(field.type):
+            df[field.name] = pd.to_datetime(df[field.name]).dt.date
+    return pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+
+
+_OPERATORS = {
+    '=': lambda field, value: field == value,
+    '==': lambda field, value: field == value,
+    '!=': lambda field, value: field != value,
+    '>': lambda field, value: field > value,
+    '>=': lambda field, value: field >= value,
+    '<': lambda field, value: field < value,
+    '<=': lambda field, value: field <= value,
+    'in': lambda field, value: field.isin(value),
+}
+
+
+def _filter_expression(filters, schema):
+    """把 [(列名, 运算符, 值), ...] 转换为 pyarrow 过滤表达式（条件之间为“且”）"""
+    expression = None
+    for column, op, value in filters or []:
+        field_type = schema.field(column).type
+        if op == 'in':
+            value = pa.array(list(value)).cast(field_type)
+        elif not isinstance(value, pa.Scalar):
+            value = pa.scalar(value).cast(field_type)
+        condition = _OPERATORS[op](ds.field(column), value)
+        expression = condition if expression is None else expression & condition
+    return expression
+
+
+class ParquetStorage:
+    """分区 Parquet 数据集
+
+    Args:
+        root: 数据集目录
+        schema: 列类型（pyarrow.Schema）
+        partition_cols: 分区列，例如 ['城市', '日期']
+        prepare: 写入前统一列类型的函数
+    """
+
+    def __init__(self, root, schema, partition_cols=None, prepare=None):
+        _require_pyarrow()
+        self.root = root
+        self.schema = schema
+        self.partition_cols = partition_cols or []
+        self.prepare = prepare
+        self.partitioning = None
+        if self.partition_cols:
+            self.partitioning = ds.partitioning(
+                pa.schema([schema.field(column) for column in self.partition_cols]), flavor='hive'
+            )
+
+    def write(self, records, replace_key=None):
+        """追加写入记录（列表或 DataFrame），每次写入生成新的文件
+
+        replace_key 为列名（不能是分区列）时，已有数据中该列取值与本次写入相同的行会被删除，
+        例如按 url 更新新闻；否则不覆盖已有数据。先写入新文件再删除旧行，中途失败时最多留下重复的行，
+        不会丢失数据。
+        """
+        df = _to_frame(records)
+        if df.empty:
+            return 0
+        if self.prepare:
+            df = self.prepare(df)
+        table = _to_table(df, self.schema)
+        token = uuid.uuid4().hex
+        # pyarrow 默认一次最多写入 1024 个分区，采集上千个城市时会超出
+        partitions = len(df[self.partition_cols].drop_duplicates()) if self.partition_cols else 1
+        ds.write_dataset(
+            table, self.root, format='parquet', partitioning=self.partitioning,
+            existing_data_behavior='overwrite_or_ignore', max_partitions=max(1024, partitions),
+            basename_template=f'part-{token}-{{i}}.parquet'
+        )
+        if replace_key:
+            self._delete_rows(replace_key, table.column(replace_key).drop_null().unique(), skip=f'part-{token}-')
+        return table.num_rows
+
+    def _delete_rows(self, column, values, skip=None):
+        """删除 column 列取值在 values 中的行，只重写包含这些行的文件；文件名以 skip 开头的文件不处理"""
+        deleted = 0
+        for directory, _, filenames in os.walk(self.root):
+            for name in sorted(filenames):
+                if not name.endswith('.parquet') or (skip and name.startswith(skip)):
+                    continue
+                path = os.path.join(directory, name)
+                # 先只读这一列判断文件中是否有要删除的行
+                mask = pc.is_in(pq.read_table(path, columns=[column]).column(column), value_set=values)
+                matched = pc.sum(mask).as_py() or 0
+                if not matched:
+                    continue
+                kept = pq.read_table(path).filter(pc.invert(mask))
+                if kept.num_rows:
+                    temp = os.path.join(directory, f'.{name}.tmp')
+                    pq.write_table(kept, temp)
+                    os.replace(temp, path)
+                else:
+                    os.remove(path)
+                deleted += matched
+        return deleted
+
+    def compact(self, min_files=2, skip=None):
+        """把每个分区目录下的多个小文件合并为一个，返回合并的分区数
+
+        每次 write() 都会在各分区生成新文件，持续追加写入（例如天气采集）会产生大量小文件。
+
+        Args:
+            min_files: 分区中至少有这么多文件时才合并
+            skip: 函数 skip(分区目录) 返回 True 时不合并该分区，例如仍在写入的当天分区
+        """
+        if not os.path.exists(self.root):
+            return 0
+        compacted = 0
+        for directory, _, filenames in os.walk(self.root):
+            parts = sorted(name for name in filenames if name.endswith('.parquet'))
+            if len(parts) < min_files or (skip and skip(directory)):
+                continue
+            paths = [os.path.join(directory, name) for name in parts]
+            table = pa.concat_tables([pq.read_table(path) for path in paths])
+            # 先写入隐藏的临时文件（读取数据集时会忽略）再改名，中途失败时原文件不受影响
+            name = f'part-{uuid.uuid4().hex}-0.parquet'
+            temp = os.path.join(directory, f'.{name}.tmp')
+            pq.write_table(table, temp)
+            os.replace(temp, os.path.join(directory, name))
+            for path in paths:
+                os.remove(path)
+            compacted += 1
+        return compacted
+
+    def _dataset(self):
+        return ds.dataset(self.root, schema=self.schema, format='parquet', partitioning=self.partitioning)
+
+    def load(self, columns=None, filters=None):
+        """读取为 DataFrame；columns 为需要的列，filters 为 [(列名, 运算符, 值), ...]"""
+        if not os.path.exists(self.root):
+            return pd.DataFrame(columns=columns or self.schema.names)
+        table = self._dataset().to_table(columns=columns, filter=_filter_expression(filters, self.schema))
+        return table.to_pandas()
+
+    def iter_frames(self, columns=None, filters=None, batch_size=100000):
+        """按批读取，每批产出一个 DataFrame，内存占用不随数据集大小增长"""
+        if not os.path.exists(self.root):
+            return
+        scanner = self._dataset().scanner(
+            columns=columns, filter=_filter_expression(filters, self.schema), batch_size=batch_size
+        )
+        for batch in scanner.to_batches():
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    def iter_batches(self, columns=None, filters=None, batch_size=1000):
+        """按批读取，每批产出一个记录列表"""
+        if not os.path.exists(self.root):
+            return
+        scanner = self._dataset().scanner(
+            columns=columns, filter=_filter_expression(filters, self.schema), batch_size=batch_size
+        )
+        for batch in scanner.to_batches():
+            if batch.num_rows:
+                yield batch.to_pylist()
+
+
+class JsonStorage:
+    """JSON 文件（整体读写，兼容原有的 news_data.json 等格式）"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, records):
+        df = _to_frame(records)
+        with open(self.path, 'w', encoding='utf-8') as f:
+            json.dump(df.to_dict(orient='records'), f, ensure_ascii=False, indent=2, default=str)
+        return len(df)
+
+    def load(self, columns=None, filters=None):
+        df = _apply_filters(pd.read_json(self.path, orient='records'), filters)
+        return df[columns] if columns else df
+
+
+class CsvStorage:
+    """CSV 文件"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def write(self, records):
+        df = _to_frame(records)
+        df.to_csv(self.path, index=False)
+        return len(df)
+
+    def load(self, columns=None, filters=None):
+        # 过滤条件用到的列也需要读入
+        usecols = None
+        if columns:
+            usecols = list(dict.fromkeys(list(columns) + [column for column, _, _ in filters or []]))
+        df = _apply_filters(pd.read_csv(self.path, usecols=usecols), filters)
+        return df[columns] if columns else df
+
+    def iter_frames(self, columns=None, filters=None, chunksize=100000, dtype=None):
+        """分块读取，每块产出一个 DataFrame；dtype 为 {列名: 类型}，指定后不再逐块推断类型"""
+        usecols = None
+        if columns:
+            usecols = list(dict.fromkeys(list(columns) + [column for column, _, _ in filters or []]))
+        with pd.read_csv(self.path, usecols=usecols, dtype=dtype, chunksize=chunksize) as reader:
+            for chunk in reader:
+                chunk = _apply_filters(chunk, filters)
+                if len(chunk):
+                    yield chunk[columns] if columns else chunk
+
+
+def _apply_filters(df, filters):
+    """文本格式没有谓词下推，读入后再按条件筛选"""
+    for column, op, value in filters or []:
+        if op == 'in':
+            df = df[df[column].isin(value)]
+        else:
+            df = df[_OPERATORS[op](df[column], value)]
+    return df
+
+
+def is_parquet_path(path):
+    """根据扩展名或目录内容判断是否为 Parquet 数据集"""
+    if path.endswith('.parquet'):
+        return True
+    if os.path.isdir(path):
+        for _, _, files in os.walk(path):
+            if any(name.endswith('.parquet') for name in files):
+                return True
+    return False
+
+
+def open_storage(path, kind='news'):
+    """按路径选择存储后端；kind 为 'news' 或 'weather'，决定 Parquet 的列类型和分区方式"""
+    if path.endswith('.csv'):
+        return CsvStorage(path)
+    if path.endswith('.json'):
+        return JsonStorage(path)
+    if kind == 'news':
+        return ParquetStorage(path, news_schema(), NEWS_PARTITION_COLS, _prepare_news)
+    if kind == 'weather':
+        return ParquetStorage(path, weather_schema(), WEATHER_PARTITION_COLS, _prepare_weather)
+    raise ValueError(f'未知的数据类型: {kind}')
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+标题词频统计
+
+原来的热门词汇统计把所有标题拼成一个字符串再 split()，中文标题没有空格，
+整条标题会被当成一个“词”，而且要先构建包含全部词的 pd.Series。这里改为：
+- 可替换的分词器：安装了 jieba 时按词典分词，否则使用无依赖的二元切分
+  （连续汉字按相邻两个字切分，英文和数字按单词切分）
+- 停用词表：单字虚词和标点视为分隔符，不会产生跨虚词的词；多字停用词在取 TOP-K 时跳过
+- 按批统计：每批标题拼接成一个字符串，二元切分用 NumPy 在码点数组上一次完成，
+  只为不同的词创建 Python 字符串，再累加到 Counter；
+  词表超过 max_terms 时丢弃低频词，内存占用有上限
+- TOP-K 用堆选出，不对整个词表排序
+
+用法：
+    counter = TermCounter()
+    for chunk in chunks:
+        counter.update(news['title'] for news in chunk)
+    counter.most_common(10)
+"""
+
+import heapq
+import re
+from collections import Counter
+
+import numpy as np
+
+try:
+    import jieba
+except ImportError:
+    jieba = None
+
+# 单字虚词：出现在标题中时视为分隔符
+STOP_CHARS = '的了是在和与及或等着把被对从向为也都而就将让给这那个之其于'
+# 标点和符号
+PUNCTUATION = '，。、；：？！“”‘’（）《》【】〈〉「」『』—…·,.;:?!"\'()[]{}<>|/\\-_+=*&^%$#@~`'
+
+# 多字停用词
+DEFAULT_STOPWORDS = frozenset([
+    '我们', '你们', '他们', '她们', '它们', '这个', '那个', '这些', '那些', '什么', '怎么',
+    '如何', '为何', '已经', '正在', '可以', '没有', '不是', '还是', '就是', '以及', '因为',
+    '所以', '但是', '如果', '或者', '一个', '进行', '表示', '今天', '昨天', '明天', '记者',
+    '日电', '消息', '最新', '相关', '关于', '通过', '目前',
+    'the', 'a', 'an', 'of', 'to', 'in', 'on', 'for', 'and', 'or', 'is', 'are', 'with', 'by',
+    'at', 'as', 'from', 'be', 'it', 'this', 'that',
+])
+
+_SEPARATORS = str.maketrans({char: ' ' for char in STOP_CHARS + PUNCTUATION})
+_ASCII_WORD = re.compile(r'[a-z0-9]+')
+
+# 码点 -> 是否为可组词的汉字（CJK 统一汉字及扩展A，去掉单字虚词）
+_CJK_TABLE = np.zeros(0x10000, dtype=bool)
+_CJK_TABLE[0x3400:0xA000] = True
+_CJK_TABLE[[ord(char) for char in STOP_CHARS]] = False
+
+
+def load_stopwords(path):
+    """从文件读取停用词表，每行一个词，# 开头的行为注释"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return frozenset(line.strip().lower() for line in f if line.strip() and not line.startswith('#'))
+
+
+class BigramSegmenter:
+    """无依赖的二元切分：连续汉字按相邻两个字切分，英文数字按单词切分"""
+
+    def __init__(self, min_ascii_len=2):
+        self.min_ascii_len = min_ascii_len
+
+    def _bigram_codes(self, text):
+        """返回所有相邻汉字对的起始位置和编码（前一个字的码点 << 16 | 后一个字的码点）"""
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        # 基本多文种平面以外的字符（如 emoji）按非汉字处理
+        is_cjk = _CJK_TABLE[np.minimum(codes, 0xFFFF)]
+        starts = np.flatnonzero(is_cjk[:-1] & is_cjk[1:])
+        return starts, (codes[starts].astype(np.uint64) << 16) | codes[starts + 1]
+
+    def _ascii_words(self, text):
+        return [word for word in _ASCII_WORD.findall(text) if len(word) >= self.min_ascii_len]
+
+    def tokenize(self, text):
+        text = text.lower()
+        _, codes = self._bigram_codes(text)
+        bigrams = [chr(code >> 16) + chr(code & 0xFFFF) for code in codes.tolist()]
+        return bigrams + self._ascii_words(text)
+
+    def tokenize_positions(self, text):
+        """返回 (词列表, 每个词在文本中的字符位置)，用于短语查询"""
+        text = text.lower()
+        starts, codes = self._bigram_codes(text)
+        tokens = [chr(code >> 16) + chr(code & 0xFFFF) for code in codes.tolist()]
+        positions = starts.tolist()
+        for match in _ASCII_WORD.finditer(text):
+            if len(match.group()) >= self.min_ascii_len:
+                tokens.append(match.group())
+                positions.append(match.start())
+        return tokens, positions
+
+    def count(self, text):
+        """统计一段文本的词频；相同的二元组先在 NumPy 中合并计数"""
+        text = text.lower()
+        codes, counts = np.unique(self._bigram_codes(text)[1], return_counts=True)
+        result = Counter({chr(code >> 16) + chr(code & 0xFFFF): count
+                          for code, count in zip(codes.tolist(), counts.tolist())})
+        result.update(self._ascii_words(text))
+        return result
+
+
+class JiebaSegmenter:
+    """基于 jieba 词典的中文分词，单字词丢弃"""
+
+    def __init__(self):
+        if jieba is None:
+            raise RuntimeError('jieba 分词需要先安装 jieba：pip install jieba')
+
+    def tokenize(self, text):
+        text = text.lower().translate(_SEPARATORS)
+        return [word for word in jieba.lcut(text) if len(word) > 1 and not word.isspace()]
+
+    def count(self, text):
+        return Counter(self.tokenize(text))
+
+
+SEGMENTERS = ['bigram', 'jieba']
+
+
+def get_segmenter(name='auto'):
+    """按名称创建分词器，auto 在安装了 jieba 时使用 jieba"""
+    if name == 'auto':
+        name = 'jieba' if jieba is not None else 'bigram'
+    if name == 'bigram':
+        return BigramSegmenter()
+    if name == 'jieba':
+        return JiebaSegmenter()
+    raise ValueError(f'未知的分词器: {name}，可选 {SEGMENTERS} 或 auto')
+
+
+class TermCounter:
+    """按批累加的词频统计
+
+    Args:
+        segmenter: 分词器（提供 tokenize(text) 和 count(text) 方法的对象）或名称，默认 auto
+        stopwords: 停用词集合，默认 DEFAULT_STOPWORDS
+        max_terms: 词表上限，超过时只保留出现次数最多的一半，None 表示不限制；
+            裁剪后低频词的计数是近似值，高频词的排名不受影响
+    """
+
+    def __init__(self, segmenter='auto', stopwords=None, max_terms=1_000_000):
+        self.segmenter = get_segmenter(segmenter) if isinstance(segmenter, str) else segmenter
+        self.stopwords = DEFAULT_STOPWORDS if stopwords is None else frozenset(stopwords)
+        self.max_terms = max_terms
+        self.counts = Counter()
+        self.documents = 0
+
+    def update(self, texts):
+        """统计一批文本；整批拼接后一次分词计数，减少逐条调用的开销"""
+        texts = [text for text in texts if text]
+        if not texts:
+            return
+        self.documents += len(texts)
+        self.counts.update(self.segmenter.count('\n'.join(texts)))
+        if self.max_terms and len(self.counts) > self.max_terms:
+            self._prune()
+
+    def add(self, text):
+        self.update([text])
+
+    def _prune(self):
+        keep = heapq.nlargest(self.max_terms // 2, self.counts.items(), key=lambda item: item[1])
+        self.counts = Counter(dict(keep))
+
+    def merge(self, other):
+        """合并另一个 TermCounter（例如多个进程各自统计的结果）"""
+        self.counts.update(other.counts)
+        self.documents += other.documents
+        if self.max_terms and len(self.counts) > self.max_terms:
+            self._prune()
+
+    def most_common(self, k=10):
+        """返回出现次数最多的 k 个词 [(词, 次数), ...]，跳过停用词"""
+        stopwords = self.stopwords
+        candidates = ((word, count) for word, count in self.counts.items() if word not in stopwords)
+        return heapq.nlargest(k, candidates, key=lambda item: item[1])
+
+    def __len__(self):
+        return len(self.counts)
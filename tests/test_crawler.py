@@ -0,0 +1,92 @@
+import json
+
+import pytest
+
+from http_session import create_session
+from mock_server import MockNewsServer
+from web_crawler import NewsCrawler, content_hash
+
+
+def make_crawler(server, **kwargs):
+    kwargs.setdefault('max_workers', 4)
+    return NewsCrawler(server.base_url + '/', session=create_session(), **kwargs)
+
+
+def article_urls(server, count):
+    return {f'{server.base_url}/article/{i}.html' for i in range(count)}
+
+
+@pytest.mark.parametrize('max_pages, expected', [(1, 10), (2, 20), (3, 30)])
+def test_crawl_follows_pagination_up_to_max_pages(max_pages, expected):
+    with MockNewsServer(articles=30, pages=3) as server:
+        crawler = make_crawler(server, max_pages=max_pages)
+        crawler.crawl_multiple_pages()
+        list_pages = [path for path in server.httpd.requests if not path.startswith('/article/')]
+    assert len(list_pages) == max_pages
+    urls = [news['url'] for news in crawler.news_data]
+    # 「热门」区块中重复出现的新闻只抓取一次
+    assert len(urls) == len(set(urls)) == expected
+    assert all(news['content'] for news in crawler.news_data)
+
+
+def test_crawl_retries_injected_5xx():
+    with MockNewsServer(articles=5, fail_times=1) as server:
+        crawler = make_crawler(server, max_pages=1, retry_times=2)
+        crawler.crawl_multiple_pages()
+        requests = dict(server.httpd.requests)
+    assert {news['url'] for news in crawler.news_data} == article_urls(server, 5)
+    assert all(news['content'] for news in crawler.news_data)
+    # 每个页面第一次 503，重试一次成功
+    assert set(requests.values()) == {2}
+
+
+def test_incremental_crawl_skips_saved_news(tmp_path):
+    data_file = str(tmp_path / 'news.json')
+    with MockNewsServer(articles=10) as server:
+        first = make_crawler(server, max_pages=1, data_file=data_file)
+        first.crawl_multiple_pages()
+        first.save_data()
+        assert len(first.news_data) == 10
+
+        second = make_crawler(server, max_pages=1, data_file=data_file, incremental=True)
+        second.crawl_multiple_pages()
+        detail_requests = sum(count for path, count in server.httpd.requests.items() if path.startswith('/article/'))
+    assert second.news_data == []
+    assert second.skipped_count == 10
+    # 第二次没有再请求任何详情页
+    assert detail_requests == 10
+
+
+def test_incremental_crawl_refetches_news_saved_without_content(tmp_path):
+    data_file = tmp_path / 'news.json'
+    with MockNewsServer(articles=3) as server:
+        records = [{'url': f'{server.base_url}/article/{i}.html', 'title': f'模拟新闻标题 {i} 经济 科技 发展',
+                    'content': '正文' if i else ''} for i in range(3)]
+        for record in records:
+            record['content_hash'] = content_hash(record)
+        data_file.write_text(json.dumps(records, ensure_ascii=False), encoding='utf-8')
+
+        crawler = make_crawler(server, max_pages=1, data_file=str(data_file), incremental=True)
+        crawler.crawl_multiple_pages()
+    assert [news['url'] for news in crawler.news_data] == [records[0]['url']]
+    assert crawler.news_data[0]['content']
+
+
+def test_parquet_output_keeps_one_row_per_url(tmp_path):
+    pytest.importorskip('pyarrow')
+    from storage import open_storage
+
+    data_file = str(tmp_path / 'news.parquet')
+    with MockNewsServer(articles=5) as server:
+        # 第一篇保存时没有正文，增量爬取时会重新抓取并更新
+        open_storage(data_file, 'news').write([{'url': f'{server.base_url}/article/0.html',
+                                                'title': '模拟新闻标题 0 经济 科技 发展', 'date': '2024-01-01'}])
+        for incremental in (True, False):
+            crawler = make_crawler(server, max_pages=1, data_file=data_file, incremental=incremental)
+            crawler.crawl_multiple_pages()
+            crawler.save_data()
+
+    saved = open_storage(data_file, 'news').load(columns=['url', 'content'])
+    assert sorted(saved['url']) == sorted(article_urls(server, 5))
+    assert saved['content'].notna().all()
+    assert make_crawler(server, data_file=data_file).load_index() == 5
@@ -0,0 +1,39 @@
+from news_index import NewsIndex
+
+
+def test_date_filter_uses_publish_time(tmp_path):
+    index = NewsIndex(str(tmp_path / 'index'))
+    index.add([
+        {'url': 'http://news.test/1.html', 'title': '芯片产业 新闻', 'content': '正文',
+         'date': '2024-03-01', 'publish_time': '2024年01月05日 08:00'},
+        {'url': 'http://news.test/2.html', 'title': '芯片产业 快讯', 'content': '正文',
+         'date': '2024-03-01', 'publish_time': None},
+    ])
+
+    def found(**dates):
+        return sorted(result['url'] for result in index.search('芯片', **dates))
+
+    assert found(date_from='2024-01-01', date_to='2024-01-31') == ['http://news.test/1.html']
+    # 没有发布时间时按爬取日期过滤
+    assert found(date_from='2024-03-01') == ['http://news.test/2.html']
+
+
+def test_scores_after_reindex_match_fresh_build(tmp_path):
+    records = [
+        {'url': f'http://news.test/{i}.html', 'title': f'芯片产业 新闻 {i}', 'content': '人工智能 芯片' * (i + 1)}
+        for i in range(4)
+    ]
+    updated = {**records[1], 'content': '经济 发展 新能源 汽车'}
+
+    reindexed = NewsIndex(str(tmp_path / 'reindexed'))
+    reindexed.add(records)
+    reindexed.add([updated])
+    fresh = NewsIndex(str(tmp_path / 'fresh'))
+    fresh.add([updated] + records[:1] + records[2:])
+    assert len(reindexed.segments) == 2 and len(reindexed) == len(fresh) == 4
+
+    def scores(index, query):
+        return {result['url']: result['score'] for result in index.search(query)}
+
+    for query in ('芯片', '人工智能', '新闻 汽车', '"芯片产业"'):
+        assert scores(reindexed, query) == scores(fresh, query)
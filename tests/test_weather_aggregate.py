@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from weather_analysis import WeatherAnalysis
+
+
+def make_analysis(df):
+    analysis = WeatherAnalysis()
+    analysis.data = df
+    return analysis
+
+
+def test_aggregate_matches_pandas():
+    rng = np.random.default_rng(0)
+    rows = 2000
+    df = pd.DataFrame({
+        '城市': rng.choice(['北京', '上海', '广州'], rows),
+        '日期': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 120, rows), unit='D'),
+        '温度': rng.normal(15, 5, rows).round(1),
+    })
+    result = make_analysis(df).aggregate('month', metrics=['温度'])
+    expected = df.groupby(['城市', df['日期'].dt.to_period('M').dt.to_timestamp()])['温度'].agg(
+        ['count', 'mean', 'std', 'min', 'median', 'max'])
+    result = result.set_index(['城市', '月份']).loc[expected.index]
+    for column in ['count', 'mean', 'std', 'min', 'max']:
+        assert np.allclose(result[column], expected[column])
+    assert np.allclose(result['50%'], expected['median'])
+
+
+def test_aggregate_skips_missing_city_and_date():
+    df = pd.DataFrame({
+        '城市': ['北京', None, '北京', np.nan, '上海'],
+        '日期': pd.to_datetime(['2024-01-01', '2024-01-01', '2024-01-02', '2024-01-03', None]),
+        '温度': [1.0, 100.0, 3.0, 100.0, 100.0],
+    })
+    result = make_analysis(df).aggregate('month', metrics=['温度'])
+    assert list(result['城市']) == ['北京']
+    assert result['count'].tolist() == [2]
+    assert result['mean'].tolist() == [2.0]
+    assert result['max'].tolist() == [3.0]
+
+
+def test_chunked_load_skips_blank_date(tmp_path):
+    path = tmp_path / 'weather.csv'
+    path.write_text('城市,日期,天气,温度\n'
+                    '北京,2024-01-01,晴,1.0\n'
+                    '北京,,晴,100.0\n'
+                    '北京,2024-07-01,雨,30.0\n'
+                    '北京,2024-07-02,雨,\n', encoding='utf-8')
+    analysis = WeatherAnalysis()
+    assert analysis.load_data(str(path), chunksize=2)
+    summary = analysis.summary
+    assert summary.rows == 4
+    assert summary.daily_mean().tolist() == [1.0, 30.0]
+    assert summary.weather_counts().to_dict() == {'晴': 2, '雨': 2}
+    assert summary.seasonal_stats()['平均温度'].tolist() == [30.0, 1.0]
@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from weather_rolling import RollingWeather
+
+
+def test_fit_and_update_skip_missing_city_and_date():
+    df = pd.DataFrame({
+        '城市': ['北京', None, '北京', '北京', '上海'],
+        '日期': ['2024-01-01', '2024-01-01', None, '2024-01-02', '2024-01-02'],
+        '温度': [1.0, 100.0, 100.0, 3.0, np.nan],
+    })
+    rolling = RollingWeather()
+    table = rolling.fit(df)
+    assert table['城市'].tolist() == ['北京', '北京']
+    assert table['日均温度'].tolist() == [1.0, 3.0]
+    assert table['日变化'].tolist()[1] == 2.0
+
+    incremental = RollingWeather()
+    updated = pd.concat([incremental.update(df.iloc[[i]]) for i in range(len(df))], ignore_index=True)
+    assert updated['日均温度'].tolist() == [1.0, 3.0]
+
+
+def test_fit_and_update_without_usable_rows():
+    rolling = RollingWeather()
+    for rows in (pd.DataFrame(columns=['城市', '日期', '温度']),
+                 pd.DataFrame({'城市': ['北京'], '日期': [None], '温度': [1.0]})):
+        table = rolling.fit(rows)
+        assert table.empty and list(table.columns) == rolling._columns()
+        assert rolling.update(rows).empty
+    assert rolling.update([]).empty
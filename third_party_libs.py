@@ -3,16 +3,21 @@ import requests
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from http_session import get_session
+
 # requests库示例：发送HTTP请求
 print("\nrequests库使用示例：")
 
 # 发送GET请求
-def get_weather(city):
-    """获取城市天气信息（示例API）"""
+def get_weather(city, session=None):
+    """获取城市天气信息（示例API）
+
+    session 为空时借用共享连接池，多次调用会复用同一个连接
+    """
     try:
         # 这是一个示例API URL，实际使用时需要替换为真实的天气API
         url = f"https://api.example.com/weather?city={city}"
-        response = requests.get(url)
+        response = (session or get_session()).get(url)
         
         # 检查请求是否成功
         response.raise_for_status()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+天气数据的分组统计
+
+按 城市 × 周期（日 / 周 / 月 / 季节 / 年）分组，计算温度、湿度、风速的
+条数、均值、标准差、最小值、分位数和最大值。数百万行、上万个分组时，
+逐组在 Python 中循环（或 groupby().quantile()）都很慢，这里整体向量化：
+
+- 分组键是整数编号：城市用 pd.factorize 编号，周期只对不同的日期计算一次，
+  再按每行的日期编号展开；两者合成一个编号 城市 * 周期数 + 周期
+- 每个指标按 (分组编号, 数值) 排序一次（合成一个浮点键只排序一次），之后各组在数组中连续：
+  最小值、最大值和分位数按每组的起止位置直接取，均值和离差平方和用 np.bincount 累加
+
+WeatherAnalysis.aggregate() 使用这里的函数并返回整齐的长表。
+"""
+
+import numpy as np
+import pandas as pd
+
+SEASONS = ['春季', '夏季', '秋季', '冬季']
+# 月份 -> 季节编号（SEASONS 的下标），下标 0 不使用
+SEASON_OF_MONTH = np.array([-1, 3, 3, 0, 0, 0, 1, 1, 1, 2, 2, 2, 3])
+
+# 周期 -> 结果中的列名
+PERIODS = {'day': '日期', 'week': '周', 'month': '月份', 'season': '季节', 'year': '年份'}
+
+
+def period_keys(days, period):
+    """把按时间排序的日期（DatetimeIndex）映射到周期
+
+    返回 (每个日期所属周期的编号, 各周期的标签)；week 的标签为该周周一，month 为该月 1 日。
+    """
+    if period == 'day':
+        return np.arange(len(days)), days
+    if period == 'season':
+        return SEASON_OF_MONTH[days.month.to_numpy()], pd.CategoricalIndex(SEASONS, categories=SEASONS)
+    if period == 'week':
+        keys = days - pd.to_timedelta(days.dayofweek, unit='D')
+    elif period == 'month':
+        keys = days.to_period('M').to_timestamp()
+    elif period == 'year':
+        keys = days.year
+    else:
+        raise ValueError(f'未知的周期: {period}，可选 {list(PERIODS)}')
+    codes, labels = pd.factorize(keys, sort=True)
+    return codes, labels
+
+
+def grouped_stats(codes, size, values, quantiles=(0.25, 0.5, 0.75)):
+    """按分组编号统计一列数值
+
+    Args:
+        codes: 每行的分组编号（0 ~ size-1，负数表示不参与统计）
+        size: 分组数
+        values: 数值（float 数组），NaN 不参与统计
+        quantiles: 需要的分位数，与 pandas 默认一样使用线性插值
+
+    Returns:
+        {'count', 'mean', 'std', 'min', 分位数..., 'max': 长度为 size 的数组}，分位数的键为 '25%' 这样的形式；
+        没有数据的分组 count 为 0，其余统计为 NaN
+    """
+    values = np.asarray(values, dtype=float)
+    valid = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[valid], values[valid]
+    # 按 (分组编号, 数值) 排序，之后各组连续且组内有序。把两者合成一个浮点键
+    # 编号 * 跨度 + (数值 - 最小值)，只需排序一次，比先后两次稳定排序快一倍多
+    if len(values):
+        low = values.min()
+        span = values.max() - low + 1.0
+        order = np.argsort(codes * span + (values - low))
+        codes, values = codes[order], values[order]
+
+    count = np.bincount(codes, minlength=size)
+    start = np.cumsum(count) - count
+    present = count > 0
+    last = np.maximum(start + count - 1, 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(codes, weights=values, minlength=size) / count
+        m2 = np.bincount(codes, weights=(values - mean[codes]) ** 2, minlength=size)
+        std = np.sqrt(m2 / (count - 1))
+
+    def pick(positions):
+        if not len(values):
+            return np.full(size, np.nan)
+        return np.where(present, values[np.minimum(positions, len(values) - 1)], np.nan)
+
+    result = {'count': count, 'mean': mean, 'std': std, 'min': pick(start)}
+    for q in quantiles:
+        position = start + q * (count - 1)
+        low = np.floor(position).astype(np.int64)
+        high = np.minimum(low + 1, last)
+        low_value = pick(low)
+        result[f'{q:.0%}'] = low_value + (pick(high) - low_value) * (position - low)
+    result['max'] = pick(last)
+    return result
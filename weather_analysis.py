@@ -1,125 +1,503 @@
+import argparse
+import os
+import re
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime, timedelta
 import numpy as np
 
+from charts import Chart, ChartRenderer, Panel, box_stats
+from storage import CsvStorage, is_parquet_path, open_storage, to_number
+from weather_aggregate import PERIODS, SEASON_OF_MONTH, SEASONS, grouped_stats, period_keys
+from weather_rolling import RollingWeather
+
+# 数值列
+NUMERIC_COLUMNS = ('温度', '体感温度', '最低温度', '最高温度', '湿度', '风速')
+# 分块分析需要的列
+ANALYSIS_COLUMNS = ['日期', '天气', '温度']
+
+
+def parse_dates(series, date_format='%Y-%m-%d'):
+    """按固定格式解析日期，不逐个推断格式；格式不符时退回 ISO 8601 解析"""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    try:
+        return pd.to_datetime(series, format=date_format)
+    except ValueError:
+        return pd.to_datetime(series, format='ISO8601')
+
+
+def numeric_columns(df):
+    """旧版本保存的 CSV 中温度等是 '23.5°C' 这样的字符串，统一转换为数值"""
+    for column in NUMERIC_COLUMNS:
+        if column in df and not pd.api.types.is_numeric_dtype(df[column]):
+            df[column] = to_number(df[column])
+    return df
+
+
+class WeatherSummary:
+    """可以逐块累加的天气统计，内存占用只与天数和天气类型数有关，与数据行数无关
+
+    - 每日平均温度：按天累加温度之和与条数
+    - 天气类型：累加各类型的条数
+    - 季节温度：按季节合并条数、均值和离差平方和（Chan 并行算法），得到均值和标准差；
+      另外按 0.1°C 分桶统计直方图，用于估计箱型图的四分位数
+    """
+
+    BIN_WIDTH = 0.1
+    BIN_MIN = -100.0
+    BIN_COUNT = 1700
+
+    def __init__(self):
+        self.rows = 0
+        self._daily = None
+        self._weather = None
+        self._count = np.zeros(len(SEASONS))
+        self._mean = np.zeros(len(SEASONS))
+        self._m2 = np.zeros(len(SEASONS))
+        self._histogram = np.zeros((len(SEASONS), self.BIN_COUNT), dtype=np.int64)
+
+    def update(self, chunk):
+        """累加一块数据：需要日期（datetime）、天气和数值温度列"""
+        self.rows += len(chunk)
+        weather = chunk['天气'].value_counts()
+        self._weather = weather if self._weather is None else self._weather.add(weather, fill_value=0)
+
+        # 温度或日期缺失的行不计入每日、季节统计和直方图
+        valid = (chunk['温度'].notna() & chunk['日期'].notna()).to_numpy()
+        dates = chunk['日期'][valid]
+        temps = chunk['温度'].to_numpy(dtype=float)[valid]
+        if not len(temps):
+            return
+
+        daily = pd.DataFrame({'sum': temps, 'count': 1}, index=dates.dt.normalize()).groupby(level=0).sum()
+        self._daily = daily if self._daily is None else self._daily.add(daily, fill_value=0)
+
+        season = SEASON_OF_MONTH[dates.dt.month.to_numpy()]
+        count = np.bincount(season, minlength=len(SEASONS)).astype(float)
+        total = np.bincount(season, weights=temps, minlength=len(SEASONS))
+        mean = np.divide(total, count, out=np.zeros_like(total), where=count > 0)
+        m2 = np.bincount(season, weights=(temps - mean[season]) ** 2, minlength=len(SEASONS))
+        merged = self._count + count
+        delta = mean - self._mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self._mean = np.where(merged > 0, self._mean + delta * count / merged, 0.0)
+            self._m2 = self._m2 + m2 + np.where(merged > 0, delta ** 2 * self._count * count / merged, 0.0)
+        self._count = merged
+
+        bins = np.clip(((temps - self.BIN_MIN) / self.BIN_WIDTH).astype(np.int64), 0, self.BIN_COUNT - 1)
+        self._histogram += np.bincount(
+            season * self.BIN_COUNT + bins, minlength=len(SEASONS) * self.BIN_COUNT
+        ).reshape(len(SEASONS), self.BIN_COUNT)
+
+    def daily_mean(self):
+        """每日平均温度（按日期排序的 Series）"""
+        if self._daily is None:
+            return pd.Series(dtype=float)
+        daily = self._daily.sort_index()
+        return daily['sum'] / daily['count']
+
+    def weather_counts(self):
+        if self._weather is None:
+            return pd.Series(dtype='int64')
+        return self._weather.astype('int64').sort_values(ascending=False)
+
+    def seasonal_stats(self):
+        """各季节的平均温度和（样本）标准差，没有数据的季节不列出"""
+        present = self._count > 0
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(self._m2 / (self._count - 1))
+        stats = pd.DataFrame({'平均温度': self._mean, '标准差': std}, index=SEASONS)[present]
+        return stats.round(1)
+
+    def seasonal_box_stats(self):
+        """由直方图估计各季节的箱型图数据，可直接传给 plt.bxp"""
+        centers = self.BIN_MIN + (np.arange(self.BIN_COUNT) + 0.5) * self.BIN_WIDTH
+        result = []
+        for index, season in enumerate(SEASONS):
+            histogram = self._histogram[index]
+            if not histogram.any():
+                continue
+            cumulative = np.cumsum(histogram) / histogram.sum()
+            q1, median, q3 = (centers[np.searchsorted(cumulative, q)] for q in (0.25, 0.5, 0.75))
+            present = centers[histogram > 0]
+            iqr = q3 - q1
+            result.append({
+                'label': season, 'q1': q1, 'med': median, 'q3': q3,
+                'whislo': present[present >= q1 - 1.5 * iqr].min(),
+                'whishi': present[present <= q3 + 1.5 * iqr].max(),
+                'fliers': [],
+            })
+        return result
+
+
 class WeatherAnalysis:
     def __init__(self):
         self.data = None
+        # 分块加载时只保留累加的统计结果，不保留原始数据
+        self.summary = None
+        # 派生特征和统计结果的缓存，见 feature()
+        self._features = {}
+        # 滑动窗口和异常检测的增量状态（weather_rolling.RollingWeather），见 rolling_stats()
+        self.rolling = None
+        # 单张图表在当前进程中渲染，数据没有变化时跳过，见 charts.ChartRenderer
+        self.renderer = ChartRenderer(workers=1)
     
-    def load_data(self, file_path):
-        """加载天气数据CSV文件"""
+    def load_data(self, file_path, columns=None, filters=None, chunksize=None, date_format='%Y-%m-%d'):
+        """加载天气数据（CSV 文件或 Parquet 数据集）
+
+        Args:
+            file_path: 数据文件路径
+            columns: 只加载这些列（Parquet 按列读取，不读其余列）
+            filters: [(列名, 运算符, 值), ...]，例如 [('城市', '=', '北京')]，Parquet 会下推到分区和文件层面
+            chunksize: 指定时分块读取，每块只累加统计结果（WeatherSummary），
+                内存占用与文件大小无关，适合超过内存的数据；此时 self.data 为 None
+            date_format: 日期列的格式，按固定格式解析比逐个推断快得多
+        """
+        self.data = None
+        self.summary = None
+        self._features = {}
+        self.rolling = None
         try:
-            self.data = pd.read_csv(file_path)
+            if chunksize:
+                self.summary = self._summarize(file_path, filters, chunksize, date_format)
+                return True
+            if is_parquet_path(file_path):
+                self.data = open_storage(file_path, 'weather').load(columns=columns, filters=filters)
+            else:
+                self.data = CsvStorage(file_path).load(columns=columns, filters=filters)
             # 将日期列转换为datetime类型
-            self.data['日期'] = pd.to_datetime(self.data['日期'])
+            self.data['日期'] = parse_dates(self.data['日期'], date_format)
+            numeric_columns(self.data)
             return True
         except Exception as e:
             print(f'加载数据失败: {str(e)}')
             return False
+
+    def feature(self, name):
+        """派生特征，第一次使用时计算并缓存，重新 load_data 时清空
+
+        - temperature：数值温度（float64 数组）
+        - city：(每行城市的编号, 各城市名)，没有城市列时所有行属于同一组
+        - day：(每行所属日期的编号, 按时间排序的日期)，每日统计的分组键
+        - season：季节（Categorical，类别顺序为 SEASONS），只对不同的日期查表再按编号展开
+        - daily_temp：每日平均温度
+        - seasonal_temp：各季节温度的均值和标准差
+        - seasonal_box：各季节温度的箱型图数据（charts.box_stats）
+
+        统计都用 np.bincount 按编号一次累加，不再对每个分析各做一次 groupby。
+        """
+        if name not in self._features:
+            self._features[name] = self._FEATURES[name](self)
+        return self._features[name]
+
+    def _temperature(self):
+        return self.data['温度'].to_numpy(dtype=float)
+
+    def _city(self):
+        if '城市' not in self.data:
+            return np.zeros(len(self.data), dtype=np.int64), pd.Index([''])
+        return pd.factorize(self.data['城市'])
+
+    def _day(self):
+        dates = self.data['日期'].to_numpy().astype('datetime64[D]')
+        codes, days = pd.factorize(dates, sort=True)
+        return codes, pd.DatetimeIndex(days)
+
+    def _season(self):
+        codes, days = self.feature('day')
+        season_of_day = SEASON_OF_MONTH[days.month.to_numpy()]
+        # 日期缺失的行（编号 -1）季节也为缺失
+        return pd.Categorical.from_codes(np.where(codes >= 0, season_of_day[codes], -1), SEASONS)
+
+    def _grouped_temperature(self, codes, size):
+        """按编号累加温度：返回每组的条数、均值和离差平方和，缺失的温度不计入"""
+        temps = self.feature('temperature')
+        valid = ~np.isnan(temps) & (codes >= 0)
+        codes, temps = codes[valid], temps[valid]
+        count = np.bincount(codes, minlength=size).astype(float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.bincount(codes, weights=temps, minlength=size) / count
+        m2 = np.bincount(codes, weights=(temps - mean[codes]) ** 2, minlength=size)
+        return count, mean, m2
+
+    def _daily_temp(self):
+        codes, days = self.feature('day')
+        count, mean, _ = self._grouped_temperature(codes, len(days))
+        return pd.Series(mean, index=days)[count > 0]
+
+    def _seasonal_temp(self):
+        count, mean, m2 = self._grouped_temperature(self.feature('season').codes, len(SEASONS))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            std = np.sqrt(m2 / (count - 1))
+        seasonal_temp = pd.DataFrame({'平均温度': mean, '标准差': std}, index=SEASONS)[count > 0]
+        return seasonal_temp.round(1)
+
+    def _seasonal_box(self):
+        temps = self.feature('temperature')
+        codes = self.feature('season').codes
+        return [box_stats(temps[codes == index], season)
+                for index, season in enumerate(SEASONS) if (~np.isnan(temps[codes == index])).any()]
+
+    _FEATURES = {
+        'temperature': _temperature,
+        'city': _city,
+        'day': _day,
+        'season': _season,
+        'daily_temp': _daily_temp,
+        'seasonal_temp': _seasonal_temp,
+        'seasonal_box': _seasonal_box,
+    }
+
+    def aggregate(self, period='day', metrics=('温度', '湿度', '风速'), quantiles=(0.25, 0.5, 0.75), by_city=True):
+        """按 城市 × 周期 分组统计多个指标，返回长表
+
+        Args:
+            period: 'day'、'week'、'month'、'season' 或 'year'
+            metrics: 要统计的数值列，数据中没有的列跳过
+            quantiles: 分位数
+            by_city: 为 False 时不区分城市
+
+        Returns:
+            DataFrame，每个 (城市, 周期, 指标) 一行，列为 count、mean、std、min、分位数和 max；
+            需要整体加载数据（分块加载时返回 None）
+        """
+        if self.data is None:
+            return None
+        city_codes, cities = self.feature('city') if by_city else (np.zeros(len(self.data), dtype=np.int64), pd.Index(['']))
+        day_codes, days = self.feature('day')
+        period_of_day, labels = period_keys(days, period)
+        # 城市或日期缺失的行编号为 -1，与 pandas groupby 一样不参与统计
+        valid = (city_codes >= 0) & (day_codes >= 0)
+        codes = np.where(valid, city_codes * len(labels) + period_of_day[np.maximum(day_codes, 0)], -1)
+        size = len(cities) * len(labels)
+        rows = np.bincount(codes[valid], minlength=size) > 0
+
+        frames = []
+        for metric in metrics:
+            if metric not in self.data:
+                continue
+            stats = grouped_stats(codes, size, self.data[metric].to_numpy(dtype=float), quantiles)
+            frame = pd.DataFrame({
+                '城市': np.repeat(np.asarray(cities), len(labels)),
+                PERIODS[period]: np.tile(np.asarray(labels), len(cities)),
+                '指标': metric,
+                **stats,
+            })
+            frames.append(frame[rows])
+        if not frames:
+            return pd.DataFrame()
+        result = pd.concat(frames, ignore_index=True)
+        return result if by_city else result.drop(columns='城市')
+
+    def rolling_stats(self, windows=(7, 30), threshold=3.0):
+        """各城市每天的滑动平均、日变化、z 分数和异常标记（见 weather_rolling）
+
+        对已加载的全部数据计算一次并保留各城市末尾的窗口状态，之后用 update() 追加的
+        新数据只更新末尾的窗口。需要整体加载数据（分块加载时返回 None）。
+        """
+        if self.data is None:
+            return None
+        self.rolling = RollingWeather(windows, threshold)
+        return self.rolling.fit(self.data)
+
+    def update(self, rows):
+        """追加新采集的记录（例如 WeatherCollector 写入的记录）
+
+        新记录并入 self.data，派生特征的缓存失效；调用过 rolling_stats() 时增量更新滑动窗口，
+        返回涉及的 (城市, 日期) 的最新结果。
+        """
+        new = rows.copy() if isinstance(rows, pd.DataFrame) else pd.DataFrame.from_records(list(rows))
+        if new.empty:
+            return None
+        if '日期' not in new:
+            new['日期'] = new['更新时间']
+        new['日期'] = parse_dates(new['日期'])
+        numeric_columns(new)
+        if self.data is not None:
+            self.data = pd.concat([self.data, new], ignore_index=True)
+            self._features = {}
+        if self.rolling is not None:
+            return self.rolling.update(new)
+        return None
+
+    def _summarize(self, file_path, filters, chunksize, date_format):
+        """分块读取并累加统计，只读取分析需要的列"""
+        if is_parquet_path(file_path):
+            chunks = open_storage(file_path, 'weather').iter_frames(
+                columns=ANALYSIS_COLUMNS, filters=filters, batch_size=chunksize
+            )
+        else:
+            storage = CsvStorage(file_path)
+            # 用前几行判断温度是数值还是旧版带单位的字符串，之后各块使用固定的列类型
+            sample = pd.read_csv(file_path, usecols=['温度'], nrows=1000)
+            dtype = {'日期': str, '天气': 'category',
+                     '温度': float if pd.api.types.is_numeric_dtype(sample['温度']) else str}
+            chunks = storage.iter_frames(columns=ANALYSIS_COLUMNS, filters=filters, chunksize=chunksize, dtype=dtype)
+        summary = WeatherSummary()
+        for chunk in chunks:
+            chunk['日期'] = parse_dates(chunk['日期'], date_format)
+            summary.update(numeric_columns(chunk))
+        return summary
     
     def analyze_temperature_trend(self, save_path=None):
-        """分析温度趋势"""
-        if self.data is None:
+        """分析温度趋势，指定 save_path 时保存图表"""
+        if self.data is None and self.summary is None:
             return '请先加载数据'
         
-        # 提取温度数值
-        self.data['温度数值'] = self.data['温度'].str.rstrip('°C').astype(float)
-        
-        # 计算每日平均温度
-        daily_temp = self.data.groupby('日期')['温度数值'].mean()
-        
-        # 绘制温度趋势图
-        plt.figure(figsize=(12, 6))
-        plt.plot(daily_temp.index, daily_temp.values, marker='o')
-        plt.title('每日平均温度趋势')
-        plt.xlabel('日期')
-        plt.ylabel('温度 (°C)')
-        plt.grid(True)
-        plt.xticks(rotation=45)
+        if self.data is not None:
+            # 计算每日平均温度
+            daily_temp = self.feature('daily_temp')
+        else:
+            daily_temp = self.summary.daily_mean()
         
         if save_path:
-            plt.savefig(f'{save_path}_temperature_trend.png', bbox_inches='tight')
-            plt.close()
-        else:
-            plt.show()
+            self.renderer.render([trend_chart(daily_temp, f'{save_path}_temperature_trend.png')])
         
         # 计算基本统计信息
-        stats = {
-            '平均温度': f"{daily_temp.mean():.1f}°C",
-            '最高温度': f"{daily_temp.max():.1f}°C",
-            '最低温度': f"{daily_temp.min():.1f}°C",
-            '温度标准差': f"{daily_temp.std():.1f}°C"
-        }
-        return stats
+        return temperature_stats(daily_temp)
     
     def analyze_weather_types(self, save_path=None):
-        """分析天气类型分布"""
-        if self.data is None:
+        """分析天气类型分布，指定 save_path 时保存图表"""
+        if self.data is None and self.summary is None:
             return '请先加载数据'
         
         # 统计天气类型频率
-        weather_counts = self.data['天气'].value_counts()
-        
-        # 绘制饼图
-        plt.figure(figsize=(10, 8))
-        plt.pie(weather_counts.values, labels=weather_counts.index, autopct='%1.1f%%')
-        plt.title('天气类型分布')
+        if self.data is not None:
+            weather_counts = self.data['天气'].value_counts()
+        else:
+            weather_counts = self.summary.weather_counts()
         
         if save_path:
-            plt.savefig(f'{save_path}_weather_types.png', bbox_inches='tight')
-            plt.close()
-        else:
-            plt.show()
+            self.renderer.render([weather_types_chart(weather_counts, f'{save_path}_weather_types.png')])
         
         return dict(weather_counts)
     
     def analyze_seasonal_patterns(self, save_path=None):
-        """分析季节性模式"""
-        if self.data is None:
+        """分析季节性模式，指定 save_path 时保存图表"""
+        if self.data is None and self.summary is None:
             return '请先加载数据'
         
-        # 添加季节信息
-        self.data['季节'] = self.data['日期'].dt.month.map({
-            12: '冬季', 1: '冬季', 2: '冬季',
-            3: '春季', 4: '春季', 5: '春季',
-            6: '夏季', 7: '夏季', 8: '夏季',
-            9: '秋季', 10: '秋季', 11: '秋季'
-        })
-        
-        # 计算每个季节的平均温度
-        seasonal_temp = self.data.groupby('季节')['温度数值'].agg(['mean', 'std']).round(1)
-        seasonal_temp.columns = ['平均温度', '标准差']
-        
-        # 绘制箱型图
-        plt.figure(figsize=(10, 6))
-        sns.boxplot(x='季节', y='温度数值', data=self.data, order=['春季', '夏季', '秋季', '冬季'])
-        plt.title('季节温度分布')
-        plt.xlabel('季节')
-        plt.ylabel('温度 (°C)')
+        if self.data is not None:
+            # 计算每个季节的平均温度
+            seasonal_temp = self.feature('seasonal_temp')
+            stats = self.feature('seasonal_box')
+        else:
+            seasonal_temp = self.summary.seasonal_stats()
+            # 分块加载时没有原始数据，箱型图的四分位数由直方图估计
+            stats = self.summary.seasonal_box_stats()
         
         if save_path:
-            plt.savefig(f'{save_path}_seasonal_patterns.png', bbox_inches='tight')
-            plt.close()
-        else:
-            plt.show()
+            chart = seasonal_chart(stats, f'{save_path}_seasonal_patterns.png', showfliers=self.data is not None)
+            self.renderer.render([chart])
         
         return seasonal_temp.to_dict()
 
+    def city_reports(self, output_dir='city_reports', workers=None):
+        """为每个城市生成温度趋势、天气类型和季节分布三张图，多个进程并行渲染
+
+        各城市的统计在当前进程中按编号一次算好，交给渲染进程的只有画图需要的数据；
+        数据没有变化的城市不重新渲染。
+
+        Returns:
+            {城市: 温度统计}
+        """
+        if self.data is None:
+            return '请先加载数据（分块加载时没有逐城市数据）'
+        city_codes, cities = self.feature('city')
+        day_codes, days = self.feature('day')
+        season_codes = self.feature('season').codes
+        temps = self.feature('temperature')
+        weather_codes, weathers = pd.factorize(self.data['天气'])
+
+        # 按城市把行号分组（稳定排序，组内保持原顺序）；城市缺失的行（编号 -1）不参与
+        present = np.flatnonzero(city_codes >= 0)
+        order = present[np.argsort(city_codes[present], kind='stable')]
+        bounds = np.cumsum(np.bincount(city_codes[present], minlength=len(cities)))[:-1]
+        charts = []
+        result = {}
+        for city, rows in zip(cities, np.split(order, bounds)):
+            city_temps = temps[rows]
+            # 温度或日期缺失的行不计入
+            valid = ~np.isnan(city_temps) & (day_codes[rows] >= 0)
+            codes = day_codes[rows][valid]
+            count = np.bincount(codes, minlength=len(days))
+            with np.errstate(invalid='ignore', divide='ignore'):
+                mean = np.bincount(codes, weights=city_temps[valid], minlength=len(days)) / count
+            daily_temp = pd.Series(mean, index=days)[count > 0]
+
+            city_weather = weather_codes[rows]
+            weather_counts = pd.Series(np.bincount(city_weather[city_weather >= 0], minlength=len(weathers)),
+                                       index=weathers, name='count')
+            weather_counts = weather_counts[weather_counts > 0].sort_values(ascending=False, kind='stable')
+
+            city_seasons = season_codes[rows]
+            stats = [box_stats(city_temps[(city_seasons == index) & valid], season)
+                     for index, season in enumerate(SEASONS) if ((city_seasons == index) & valid).any()]
+
+            prefix = os.path.join(output_dir, re.sub(r'[\\/:*?"<>|\s]', '_', str(city)) or 'all')
+            charts.append(trend_chart(daily_temp, f'{prefix}_temperature_trend.png', city))
+            charts.append(weather_types_chart(weather_counts, f'{prefix}_weather_types.png', city))
+            charts.append(seasonal_chart(stats, f'{prefix}_seasonal_patterns.png', city=city))
+            result[city] = temperature_stats(daily_temp)
+
+        renderer = ChartRenderer(workers)
+        renderer.render(charts)
+        print(f'城市图表：渲染 {renderer.rendered} 张，数据未变化跳过 {renderer.skipped} 张，保存在 {output_dir}')
+        return result
+
+
+def temperature_stats(daily_temp):
+    """每日平均温度的基本统计信息"""
+    return {
+        '平均温度': f"{daily_temp.mean():.1f}°C",
+        '最高温度': f"{daily_temp.max():.1f}°C",
+        '最低温度': f"{daily_temp.min():.1f}°C",
+        '温度标准差': f"{daily_temp.std():.1f}°C"
+    }
+
+
+def trend_chart(daily_temp, path, city=None):
+    """温度趋势图"""
+    panel = Panel('line', {'x': daily_temp.index.to_numpy(), 'y': daily_temp.to_numpy()},
+                  title=f'{city} 每日平均温度趋势' if city else '每日平均温度趋势',
+                  xlabel='日期', ylabel='温度 (°C)', options={'marker': 'o', 'grid': True, 'rotation': 45})
+    return Chart(path, [panel], figsize=(12, 6), tight='bbox')
+
+
+def weather_types_chart(weather_counts, path, city=None):
+    """天气类型饼图"""
+    panel = Panel('pie', {'labels': [str(label) for label in weather_counts.index],
+                          'values': weather_counts.to_numpy()},
+                  title=f'{city} 天气类型分布' if city else '天气类型分布')
+    return Chart(path, [panel], figsize=(10, 8), tight='bbox')
+
+
+def seasonal_chart(stats, path, showfliers=True, city=None):
+    """季节温度箱型图，stats 为各季节的箱型图数据（见 charts.box_stats）"""
+    panel = Panel('bxp', {'stats': stats}, title=f'{city} 季节温度分布' if city else '季节温度分布',
+                  xlabel='季节', ylabel='温度 (°C)', options={'showfliers': showfliers})
+    return Chart(path, [panel], figsize=(10, 6), tight='bbox')
+
 def main():
+    parser = argparse.ArgumentParser(description='天气数据分析工具')
+    parser.add_argument('data', nargs='?', default='weather_data.csv',
+                        help='数据文件：CSV 文件，或 weather_collector.py 采集的 Parquet 数据集（如 weather_history.parquet）')
+    parser.add_argument('--city', help='只分析该城市的数据')
+    parser.add_argument('--chunksize', type=int,
+                        help='分块读取，每块只累加统计结果，用于超过内存的数据文件（例如 500000）')
+    parser.add_argument('--date-format', default='%Y-%m-%d', help='日期列的格式')
+    parser.add_argument('--by-city', metavar='DIR', help='另外为每个城市生成图表，保存到该目录')
+    parser.add_argument('--workers', type=int, help='渲染城市图表的进程数，默认等于CPU核数')
+    args = parser.parse_args()
+
     # 创建分析实例
     analyzer = WeatherAnalysis()
     
-    # 示例数据加载和分析
     print('天气数据分析工具')
     print('请确保数据文件格式正确（包含日期、温度、天气等列）')
     
-    # 这里可以添加命令行参数解析，类似于weather_query.py
-    # 现在仅作为示例展示基本功能
-    
-    # 假设我们有一个示例数据文件
-    if analyzer.load_data('weather_data.csv'):
+    filters = [('城市', '=', args.city)] if args.city else None
+    if analyzer.load_data(args.data, filters=filters, chunksize=args.chunksize, date_format=args.date_format):
         print('\n1. 温度趋势分析')
         temp_stats = analyzer.analyze_temperature_trend(save_path='analysis_results')
         print('\n温度统计信息：')
@@ -140,5 +518,9 @@ def main():
             for stat_name, value in stats.items():
                 print(f'  {stat_name}: {value}°C')
 
+        if args.by_city:
+            print('\n4. 城市图表')
+            analyzer.city_reports(args.by_city, workers=args.workers)
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
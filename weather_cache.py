@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+天气查询结果缓存
+
+OpenWeatherMap 的实时天气大约 10 分钟更新一次，预报每 3 小时更新一次，
+在此期间重复查询同一城市只会消耗 API 配额。这里按 (接口, 城市) 缓存接口返回的原始数据：
+- 进程内 LRU：最多保存 max_entries 条，超出时淘汰最久未使用的
+- 每个接口单独设置 TTL，例如实时天气 10 分钟、预报 3 小时
+- 过期后的 stale 秒内先返回旧结果，同时在后台刷新（stale-while-revalidate）
+- 可选的 SQLite 文件作为第二层，多个进程或多次运行之间共享
+
+城市名不区分大小写和多余空格，坐标按两位小数（约 1 公里）归一化。
+"""
+
+import copy
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# 各接口的默认有效期（秒）
+DEFAULT_TTLS = {'weather_raw': 600, 'forecast_raw': 3 * 3600}
+
+
+def normalize_location(location):
+    """城市名、城市ID或 (纬度, 经度) -> 缓存键中的位置部分"""
+    if isinstance(location, (tuple, list)):
+        lat, lon = location
+        return f'{float(lat):.2f},{float(lon):.2f}'
+    return ' '.join(str(location).split()).casefold()
+
+
+class WeatherCache:
+    """LRU + TTL 的天气结果缓存
+
+    Args:
+        max_entries: 进程内最多缓存的条数
+        ttls: {接口: 有效期秒数}，未列出的接口使用 DEFAULT_TTLS 或 600 秒
+        stale: 过期后仍可先返回旧结果、同时后台刷新的时长（秒），0 表示不使用
+        path: SQLite 文件路径，为空时只使用进程内缓存
+    """
+
+    def __init__(self, max_entries=1024, ttls=None, stale=300, path=None):
+        self.max_entries = max_entries
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.stale = stale
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._db = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute('''
+                CREATE TABLE IF NOT EXISTS weather_cache (
+                    key TEXT PRIMARY KEY,
+                    value TEXT,
+                    stored_at REAL
+                )''')
+            self._db.commit()
+        # 统计：新鲜命中、过期但先返回旧结果、未命中、从 SQLite 读到、LRU 淘汰
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    def _key(self, endpoint, location):
+        return f'{endpoint}:{normalize_location(location)}'
+
+    def ttl(self, endpoint):
+        return self.ttls.get(endpoint, 600)
+
+    def _load(self, key):
+        """从进程内缓存或 SQLite 读取 (结果, 写入时间)，调用时需持有锁"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry
+        if self._db is None:
+            return None
+        row = self._db.execute('SELECT value, stored_at FROM weather_cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        self.disk_hits += 1
+        entry = (json.loads(row[0]), row[1])
+        self._remember(key, entry)
+        return entry
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def lookup(self, endpoint, location, count_miss=True):
+        """返回 (结果, 状态)：状态为 'fresh'、'stale'，未命中或已彻底过期时返回 (None, None)
+
+        count_miss 为 False 时未命中不计入统计，用于顺带查看另一个接口是否有缓存。
+        """
+        key = self._key(endpoint, location)
+        with self._lock:
+            entry = self._load(key)
+            if entry is not None:
+                age = time.time() - entry[1]
+                if age < self.ttl(endpoint):
+                    self.hits += 1
+                    return copy.deepcopy(entry[0]), 'fresh'
+                if age < self.ttl(endpoint) + self.stale:
+                    self.stale_hits += 1
+                    return copy.deepcopy(entry[0]), 'stale'
+            if count_miss:
+                self.misses += 1
+            return None, None
+
+    def store(self, endpoint, location, value):
+        key = self._key(endpoint, location)
+        entry = (copy.deepcopy(value), time.time())
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO weather_cache (key, value, stored_at) VALUES (?, ?, ?)',
+                    (key, json.dumps(value, ensure_ascii=False), entry[1])
+                )
+                self._db.commit()
+
+    def get(self, endpoint, location, fetch):
+        """读取缓存，未命中时调用 fetch() 获取并缓存；过期不久的结果先返回，后台刷新
+
+        fetch 返回带 'error' 键的字典时视为失败，不写入缓存。
+        """
+        value, state = self.lookup(endpoint, location)
+        if state == 'fresh':
+            return value
+        if state == 'stale':
+            self.refresh_in_background(endpoint, location, fetch)
+            return value
+        value = fetch()
+        if not (isinstance(value, dict) and 'error' in value):
+            self.store(endpoint, location, value)
+        return value
+
+    def refresh_in_background(self, endpoint, location, fetch):
+        """在后台线程中调用 fetch() 更新缓存"""
+        key = self._key(endpoint, location)
+        with self._lock:
+            # 同一条记录只需要一个刷新线程
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                value = fetch()
+                if not (isinstance(value, dict) and 'error' in value):
+                    self.store(endpoint, location, value)
+            except Exception:
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def stats(self):
+        requests_avoided = self.hits + self.stale_hits
+        total = requests_avoided + self.misses
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'disk_hits': self.disk_hits,
+            'evictions': self.evictions,
+            'entries': len(self._entries),
+            'hit_rate': round(requests_avoided / total, 3) if total else 0.0,
+        }
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+天气数据持续采集
+
+weather_query.py 只能查询一次当前天气，WeatherAnalysis 需要的历史数据没有来源。
+WeatherCollector 按固定间隔轮询一组城市，把结果追加到按城市和日期分区的
+Parquet 数据集（storage.ParquetStorage），供 WeatherAnalysis.load_data 直接读取：
+
+- 批量：城市分成若干批，每批交给 WeatherQuery.get_weather_many，城市ID每 20 个
+  合并为一次 /group 请求，批内并发
+- 错峰：各批的首次采集时间均匀分布在一个间隔内，之后每次再加随机抖动，
+  请求不会集中在每个间隔的开头
+- 配额：按每分钟调用次数限速（令牌桶），并根据每分钟和每日配额自动放宽采集间隔；
+  某批全部失败时按指数退避推迟该批
+- 紧凑存储：接口数据未更新（更新时间相同）时不重复写入，记录先在内存中缓冲，
+  定期批量写入；日期变化后把不再写入的分区中的小文件合并为一个
+
+两次采集之间只在事件上等待，不占用 CPU。
+
+用法：
+    python weather_collector.py 1816670 1796236 --cities-file cities.txt --interval 600
+"""
+
+import argparse
+import heapq
+import math
+import os
+import random
+import re
+import threading
+import time
+from datetime import date, timedelta
+
+from rate_limit import RetryPolicy, TokenBucket
+from storage import open_storage
+from weather_query import GROUP_BATCH_SIZE, WeatherQuery, _is_city_id
+from weather_records import WeatherRecord
+
+# OpenWeatherMap 免费账户的默认配额
+DEFAULT_CALLS_PER_MINUTE = 60
+DEFAULT_DAILY_QUOTA = 1000000 // 31
+
+
+def load_cities(path):
+    """读取城市列表文件：每行一个城市名、城市ID或 "纬度,经度"，# 开头的行为注释"""
+    cities = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if not line:
+                continue
+            match = re.fullmatch(r'(-?\d+(?:\.\d+)?)\s*,\s*(-?\d+(?:\.\d+)?)', line)
+            cities.append((float(match.group(1)), float(match.group(2))) if match else line)
+    return cities
+
+
+def batch_cost(batch):
+    """一批城市需要的接口调用次数：城市ID每 GROUP_BATCH_SIZE 个一次，其余每个一次"""
+    ids = sum(1 for city in batch if _is_city_id(city))
+    return math.ceil(ids / GROUP_BATCH_SIZE) + len(batch) - ids
+
+
+class WeatherCollector:
+    """定时采集多个城市的当前天气
+
+    Args:
+        cities: 城市名、城市ID或 (纬度, 经度) 的列表，大量城市时建议使用城市ID
+        store: 写入目标，需要有 write(records) 方法，例如 open_storage(path, 'weather')
+        query: WeatherQuery 实例，默认不使用结果缓存
+        interval: 每个城市的采集间隔（秒）
+        jitter: 每次采集时间的随机抖动，占间隔的比例
+        calls_per_minute: 每分钟最多调用接口的次数
+        daily_quota: 每天最多调用接口的次数，为空时不限制
+        batch_size: 每批的城市数
+        flush_rows: 缓冲的记录达到该数量时写入
+        flush_interval: 距上次写入超过该秒数时写入
+        on_flush: 每次写入后以写入的记录调用 on_flush(records)，例如 WeatherAnalysis.update，
+            让滑动窗口统计随采集增量更新
+    """
+
+    def __init__(self, cities, store, query=None, interval=600, jitter=0.1,
+                 calls_per_minute=DEFAULT_CALLS_PER_MINUTE, daily_quota=DEFAULT_DAILY_QUOTA,
+                 batch_size=GROUP_BATCH_SIZE * 5, flush_rows=50000, flush_interval=3600, on_flush=None):
+        # 城市ID排在一起，尽量让每批都能凑满 /group 请求
+        cities = sorted(dict.fromkeys(tuple(c) if isinstance(c, list) else c for c in cities),
+                        key=lambda city: not _is_city_id(city))
+        self.batches = [cities[i:i + batch_size] for i in range(0, len(cities), batch_size)]
+        self.store = store
+        self.query = query or WeatherQuery(cache=False)
+        self.jitter = jitter
+        self.bucket = TokenBucket(calls_per_minute / 60, burst=calls_per_minute)
+        self.policy = RetryPolicy(base_delay=interval / 10, max_delay=interval * 4)
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+
+        # 配额不够时放宽采集间隔
+        calls_per_cycle = sum(batch_cost(batch) for batch in self.batches)
+        self.interval = max(interval, calls_per_cycle * 60 / calls_per_minute)
+        if daily_quota:
+            self.interval = max(self.interval, calls_per_cycle * 86400 / daily_quota)
+        if self.interval > interval:
+            print(f'每轮需要调用 {calls_per_cycle} 次，受配额限制采集间隔调整为 {self.interval:.0f} 秒')
+
+        self._buffer = []
+        self._last_flush = time.monotonic()
+        self._last_updated = {}
+        self._failures = [0] * len(self.batches)
+        self._day = date.today()
+        self._stop = threading.Event()
+        # 统计
+        self.calls = 0
+        self.rows = 0
+        self.skipped = 0
+        self.errors = 0
+
+    def _initial_schedule(self, now, spread=True):
+        """各批的首次采集时间均匀分布在一个间隔内；spread 为 False 时全部立即开始（仍受限速）"""
+        step = self.interval / max(1, len(self.batches)) if spread else 0.0
+        return [(now + index * step + random.uniform(0, step * self.jitter), index)
+                for index in range(len(self.batches))]
+
+    def _next_due(self, due, index):
+        """下一次采集时间：按计划时间推进（不累积误差），失败时再按退避推迟"""
+        spread = self.interval * self.jitter
+        next_due = due + self.interval + random.uniform(-spread, spread)
+        if self._failures[index]:
+            next_due += self.policy.delay(self._failures[index])
+        # 采集落后于计划时不补采，从现在开始重新计时
+        return max(next_due, time.monotonic())
+
+    def collect_batch(self, index):
+        """采集一批城市，返回新增的记录数"""
+        batch = self.batches[index]
+        for _ in range(batch_cost(batch)):
+            self.bucket.acquire()
+        self.calls += batch_cost(batch)
+        results = self.query.get_weather_many(batch)
+        added = 0
+        succeeded = 0
+        for city, result in zip(batch, results):
+            if not isinstance(result, WeatherRecord):
+                self.errors += 1
+                continue
+            succeeded += 1
+            # 接口约 10 分钟更新一次，数据没有更新时不重复保存
+            if self._last_updated.get(city) == result.updated:
+                self.skipped += 1
+                continue
+            self._last_updated[city] = result.updated
+            self._buffer.append(result.to_row())
+            added += 1
+        # 只有整批都出错才算失败并退避；数据没有更新不是失败
+        if succeeded or not batch:
+            self._failures[index] = 0
+        else:
+            self._failures[index] = min(self._failures[index] + 1, self.policy.retry_times + 3)
+        return added
+
+    def flush(self):
+        """把缓冲的记录写入存储"""
+        if self._buffer:
+            self.rows += self.store.write(self._buffer) or 0
+            if self.on_flush:
+                self.on_flush(self._buffer)
+            self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def _maybe_flush(self):
+        if (len(self._buffer) >= self.flush_rows
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+        if date.today() != self._day:
+            # 日期变化：写入剩余记录，合并已经不再写入的分区中的小文件。
+            # 分区按城市当地日期划分，与本机相差一天以内的分区可能仍在写入
+            self.flush()
+            self._day = date.today()
+            if hasattr(self.store, 'compact'):
+                active = f'日期={self._day - timedelta(days=1)}'
+                self.store.compact(skip=lambda directory: os.path.basename(directory) >= active)
+
+    def run(self, cycles=None, spread=True):
+        """开始采集，直到调用 stop()
+
+        Args:
+            cycles: 每批采集的次数，为空时一直运行
+            spread: 首次采集是否错开到整个间隔内
+        """
+        remaining = [cycles] * len(self.batches)
+        schedule = self._initial_schedule(time.monotonic(), spread)
+        heapq.heapify(schedule)
+        try:
+            while schedule and not self._stop.is_set():
+                due, index = schedule[0]
+                wait = due - time.monotonic()
+                if wait > 0:
+                    # 等待下一批或下一次写入，期间不占用 CPU
+                    flush_wait = self.flush_interval - (time.monotonic() - self._last_flush)
+                    if self._stop.wait(max(0.0, min(wait, flush_wait))):
+                        break
+                    self._maybe_flush()
+                    continue
+                heapq.heappop(schedule)
+                self.collect_batch(index)
+                self._maybe_flush()
+                if remaining[index] is not None:
+                    remaining[index] -= 1
+                    if remaining[index] <= 0:
+                        continue
+                heapq.heappush(schedule, (self._next_due(due, index), index))
+        finally:
+            self.flush()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {
+            'cities': sum(len(batch) for batch in self.batches),
+            'interval': round(self.interval),
+            'calls': self.calls,
+            'rows': self.rows,
+            'buffered': len(self._buffer),
+            'unchanged': self.skipped,
+            'errors': self.errors,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='定时采集多个城市的天气，写入按城市和日期分区的 Parquet 数据集')
+    parser.add_argument('cities', nargs='*', help='城市名称或城市ID')
+    parser.add_argument('--cities-file', help='城市列表文件，每行一个城市名、城市ID或 "纬度,经度"')
+    parser.add_argument('--output', default='weather_history.parquet', help='数据集目录')
+    parser.add_argument('--interval', type=float, default=600, help='每个城市的采集间隔（秒）')
+    parser.add_argument('--jitter', type=float, default=0.1, help='采集时间的随机抖动（占间隔的比例）')
+    parser.add_argument('--calls-per-minute', type=int, default=DEFAULT_CALLS_PER_MINUTE, help='每分钟最多调用接口的次数')
+    parser.add_argument('--daily-quota', type=int, default=DEFAULT_DAILY_QUOTA, help='每天最多调用接口的次数，0 表示不限制')
+    parser.add_argument('--flush-interval', type=float, default=3600, help='缓冲的记录最长多久写入一次（秒）')
+    parser.add_argument('--once', action='store_true', help='每个城市只采集一次后退出（适合由 cron 调度）')
+    args = parser.parse_args()
+
+    cities = list(args.cities)
+    if args.cities_file:
+        cities.extend(load_cities(args.cities_file))
+    if not cities:
+        parser.error('请指定城市或 --cities-file')
+
+    collector = WeatherCollector(
+        cities, open_storage(args.output, 'weather'), interval=args.interval, jitter=args.jitter,
+        calls_per_minute=args.calls_per_minute, daily_quota=args.daily_quota or None,
+        flush_interval=args.flush_interval
+    )
+    print(f'开始采集 {len(cities)} 个城市，间隔 {collector.interval:.0f} 秒，写入 {args.output}')
+    try:
+        collector.run(cycles=1, spread=False) if args.once else collector.run()
+    except KeyboardInterrupt:
+        collector.stop()
+    print(f'采集统计：{collector.stats()}')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,93 +1,267 @@
-import requests
 import json
 import argparse
-from datetime import datetime
-import pandas as pd
-import matplotlib.pyplot as plt
-from tabulate import tabulate
+
+# requests、pandas、tabulate、matplotlib 等较重的库在用到时才导入：
+# 查询单个城市且命中缓存时一个都不需要，命令行启动更快（见 bench_startup.py）
+from weather_cache import WeatherCache
+from weather_records import WeatherRecord, format_frame, to_frame
+from weather_snapshot import CityWeatherSnapshot
+
+# /group 接口一次最多查询的城市数
+GROUP_BATCH_SIZE = 20
+
+
+def _is_city_id(city):
+    """OpenWeatherMap 的城市ID是纯数字，只有按ID查询时才能使用 /group 批量接口"""
+    return str(city).isdigit()
+
 
 class WeatherQuery:
-    def __init__(self):
+    def __init__(self, session=None, max_workers=8, cache=None, timeout=(5, 15)):
         # 使用 OpenWeatherMap API，需要注册获取 API key
         self.api_key = "YOUR_API_KEY"  # 请替换为你的 API key
         self.base_url = "http://api.openweathermap.org/data/2.5/weather"
         self.forecast_url = "http://api.openweathermap.org/data/2.5/forecast"
-    
+        self.group_url = "http://api.openweathermap.org/data/2.5/group"
+        # HTTP会话，默认借用进程内共享的连接池，第一次发送请求时才创建
+        self._session = session
+        # 查询多个城市时同时进行的请求数
+        self.max_workers = max_workers
+        # 结果缓存（weather_cache.WeatherCache），默认只在进程内缓存，传入 False 关闭
+        self.cache = WeatherCache() if cache is None else cache
+        # 请求超时（连接超时, 读取超时），避免一个卡住的连接让采集循环一直等待
+        self.timeout = timeout
+
+    @property
+    def session(self):
+        if self._session is None:
+            from http_session import get_session
+            self._session = get_session()
+        return self._session
+
+    def _parse_weather(self, weather_data):
+        """接口返回的 JSON -> WeatherRecord，数据不完整时返回 {'error': ...}"""
+        if 'error' in weather_data:
+            return weather_data
+        try:
+            return WeatherRecord.from_api(weather_data)
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            return {'error': f'解析天气数据失败: {str(e)}'}
+
+    def _map_concurrent(self, func, items):
+        """并发调用 func，结果顺序与 items 一致；单个城市出错不影响其他城市"""
+        def call(item):
+            try:
+                return func(item)
+            except Exception as e:
+                return {'error': f'查询 {item} 失败: {str(e)}'}
+
+        if len(items) <= 1 or self.max_workers <= 1:
+            return [call(item) for item in items]
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            return list(executor.map(call, items))
+
+    def _location_params(self, city):
+        """城市名、城市ID或 (纬度, 经度) -> 查询参数"""
+        if isinstance(city, (tuple, list)):
+            return {'lat': city[0], 'lon': city[1]}
+        if _is_city_id(city):
+            return {'id': city}
+        return {'q': city}
+
     def get_weather(self, city):
+        """查询当前天气，返回 WeatherRecord，失败时返回 {'error': ...}
+
+        city 可以是城市名、城市ID或 (纬度, 经度)；缓存中保存接口的原始数据，有缓存时优先使用缓存：
+        先用实时天气，过期的也先返回，同时在后台刷新；完全没有实时天气的缓存时，如果有该城市
+        未过期的预报快照（get_snapshot），用离现在最近的预报点近似（记录的 forecast 为 True，
+        显示的更新时间带“预报”），不再请求 /weather；都没有时才请求。
+        """
+        if not self.cache:
+            return self._parse_weather(self._fetch_weather(city))
+        value, state = self.cache.lookup('weather_raw', city)
+        if state == 'fresh':
+            return self._parse_weather(value)
+        if state == 'stale':
+            self.cache.refresh_in_background('weather_raw', city, lambda: self._fetch_weather(city))
+            return self._parse_weather(value)
+        current = self._snapshot_current(city)
+        if current is not None:
+            return current
+        value = self._fetch_weather(city)
+        if 'error' not in value:
+            self.cache.store('weather_raw', city, value)
+        return self._parse_weather(value)
+
+    def _snapshot_current(self, city):
+        """由缓存中未过期的预报快照得到当前天气（WeatherRecord），没有快照时返回 None"""
+        forecast, state = self.cache.lookup('forecast_raw', city, count_miss=False)
+        if state != 'fresh':
+            return None
+        try:
+            return CityWeatherSnapshot(forecast).current()
+        except (KeyError, IndexError, TypeError, ValueError):
+            return None
+
+    def _fetch_weather(self, city):
+        """获取 /weather 接口的原始数据"""
+        import requests
+
         try:
             # 构建请求参数
             params = {
-                'q': city,
+                **self._location_params(city),
                 'appid': self.api_key,
                 'lang': 'zh_cn',  # 返回中文结果
                 'units': 'metric'  # 使用摄氏度
             }
             
             # 发送 GET 请求
-            response = requests.get(self.base_url, params=params)
+            response = self.session.get(self.base_url, params=params, timeout=self.timeout)
             response.raise_for_status()  # 检查请求是否成功
             
-            # 解析返回的 JSON 数据
             weather_data = response.json()
-            
-            # 提取需要的信息
-            result = {
-                '城市': weather_data['name'],
-                '天气': weather_data['weather'][0]['description'],
-                '温度': f"{weather_data['main']['temp']}°C",
-                '体感温度': f"{weather_data['main']['feels_like']}°C",
-                '湿度': f"{weather_data['main']['humidity']}%",
-                '风速': f"{weather_data['wind']['speed']}m/s",
-                '更新时间': datetime.fromtimestamp(weather_data['dt']).strftime('%Y-%m-%d %H:%M:%S')
-            }
-            
-            return result
+            if 'main' not in weather_data:
+                raise KeyError('main')
+            return weather_data
         
         except requests.exceptions.RequestException as e:
             return {'error': f'获取天气信息失败: {str(e)}'}
         except (KeyError, json.JSONDecodeError) as e:
             return {'error': f'解析天气数据失败: {str(e)}'}
 
+    def get_snapshot(self, city):
+        """获取城市的天气快照（一次 /forecast 请求的完整数据），失败时返回 {'error': ...}
+
+        缓存中有未过期的实时天气时一并放入快照，snapshot.current() 直接使用实时数据。
+        """
+        current = None
+        if self.cache:
+            payload = self.cache.get('forecast_raw', city, lambda: self._fetch_forecast(city))
+            value, state = self.cache.lookup('weather_raw', city, count_miss=False)
+            if state == 'fresh':
+                current = value
+        else:
+            payload = self._fetch_forecast(city)
+        if 'error' in payload:
+            return payload
+        try:
+            return CityWeatherSnapshot(payload, current=current)
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            return {'error': f'解析天气预报数据失败: {str(e)}'}
+
     def get_forecast(self, city, days=5):
+        """按天汇总的天气预报（每天的最低 / 最高 / 平均温度等）"""
+        snapshot = self.get_snapshot(city)
+        if isinstance(snapshot, dict):
+            return snapshot
+        return snapshot.daily(days)
+
+    def _fetch_forecast(self, city):
+        """获取 /forecast 接口的原始数据（5 天内每 3 小时一个数据点）"""
+        import requests
+
         try:
             params = {
-                'q': city,
+                **self._location_params(city),
                 'appid': self.api_key,
                 'lang': 'zh_cn',
                 'units': 'metric'
             }
             
-            response = requests.get(self.forecast_url, params=params)
+            response = self.session.get(self.forecast_url, params=params, timeout=self.timeout)
             response.raise_for_status()
             
             forecast_data = response.json()
-            forecasts = []
-            
-            for item in forecast_data['list'][:days*8:8]:  # 每天8个数据点，取每天的第一个
-                forecast = {
-                    '日期': datetime.fromtimestamp(item['dt']).strftime('%Y-%m-%d'),
-                    '天气': item['weather'][0]['description'],
-                    '温度': f"{item['main']['temp']}°C",
-                    '湿度': f"{item['main']['humidity']}%",
-                    '风速': f"{item['wind']['speed']}m/s"
-                }
-                forecasts.append(forecast)
-            
-            return forecasts
+            if not forecast_data.get('list'):
+                raise KeyError('list')
+            return forecast_data
         except requests.exceptions.RequestException as e:
             return {'error': f'获取天气预报失败: {str(e)}'}
         except (KeyError, json.JSONDecodeError) as e:
             return {'error': f'解析天气预报数据失败: {str(e)}'}
     
+    def _get_weather_group(self, city_ids):
+        """用 /group 接口一次查询一批城市ID，返回 {城市ID: WeatherRecord 或 {'error': ...}}"""
+        params = {
+            'id': ','.join(str(city_id) for city_id in city_ids),
+            'appid': self.api_key,
+            'lang': 'zh_cn',
+            'units': 'metric'
+        }
+        response = self.session.get(self.group_url, params=params, timeout=self.timeout)
+        response.raise_for_status()
+        results = {}
+        for item in response.json()['list']:
+            result = self._parse_weather(item)
+            results[str(item.get('id'))] = result
+            if self.cache and not isinstance(result, dict):
+                self.cache.store('weather_raw', str(item['id']), item)
+        return results
+
+    def get_weather_many(self, cities):
+        """查询多个城市的当前天气，返回与 cities 顺序一致的结果列表
+
+        缓存中已有实时天气（包括过期的）或预报快照的城市不再请求（见 get_weather）；其余城市ID（纯数字）按每批 GROUP_BATCH_SIZE 个
+        合并为一次 /group 请求，城市名和坐标逐个查询；各批次和各城市的请求并发进行。
+        成功时对应位置为 WeatherRecord，某个城市出错时为 {'error': ...}，不影响其他城市。
+        """
+        cities = list(cities)
+        found = {}
+        ids = []
+        for city in dict.fromkeys(str(city) for city in cities if _is_city_id(city)):
+            cached, state = self.cache.lookup('weather_raw', city) if self.cache else (None, None)
+            current = self._snapshot_current(city) if self.cache and not state else None
+            if current is not None:
+                found[city] = current
+            elif state:
+                found[city] = self._parse_weather(cached)
+                if state == 'stale':
+                    self.cache.refresh_in_background('weather_raw', city, lambda city=city: self._fetch_weather(city))
+            else:
+                ids.append(city)
+        batches = [ids[i:i + GROUP_BATCH_SIZE] for i in range(0, len(ids), GROUP_BATCH_SIZE)]
+        others = list(dict.fromkeys(
+            tuple(city) if isinstance(city, list) else city for city in cities if not _is_city_id(city)
+        ))
+
+        def fetch(task):
+            kind, value = task
+            if kind == 'single':
+                return {str(value): self.get_weather(value)}
+            import requests
+
+            try:
+                return self._get_weather_group(value)
+            except requests.exceptions.Timeout as e:
+                # 超时多半是接口或网络暂时不可用，逐个重试只会再等一轮超时，整批记为失败
+                return {city_id: {'error': f'获取天气信息失败: {str(e)}'} for city_id in value}
+            except (requests.exceptions.RequestException, KeyError, json.JSONDecodeError):
+                # 批量请求失败时退回逐个查询，避免一批城市全部失败
+                return {city_id: self.get_weather(city_id) for city_id in value}
+
+        for result in self._map_concurrent(fetch, [('group', batch) for batch in batches]
+                                           + [('single', city) for city in others]):
+            found.update(result)
+        return [found.get(str(tuple(city) if isinstance(city, list) else city))
+                or {'error': f'获取天气信息失败: 未找到城市 {city}'} for city in cities]
+
+    def get_forecast_many(self, cities, days=5):
+        """并发查询多个城市的天气预报，结果顺序与 cities 一致"""
+        return self._map_concurrent(lambda city: self.get_forecast(city, days), list(cities))
+
+    def get_snapshots(self, cities):
+        """并发获取多个城市的天气快照，结果顺序与 cities 一致"""
+        return self._map_concurrent(self.get_snapshot, list(cities))
+
     def compare_cities(self, cities):
-        results = []
-        for city in cities:
-            result = self.get_weather(city)
-            if 'error' not in result:
-                results.append(result)
+        """多个城市当前天气的对比表，温度等列为数值"""
+        results = [result for result in self.get_weather_many(cities) if isinstance(result, WeatherRecord)]
         
         if results:
-            df = pd.DataFrame(results)
+            df = to_frame(results)
             return df
         return None
 
@@ -96,64 +270,96 @@ def main():
     parser = argparse.ArgumentParser(description='天气查询工具')
     parser.add_argument('cities', nargs='+', help='要查询天气的城市名称（可多个）')
     parser.add_argument('--forecast', action='store_true', help='显示天气预报')
+    parser.add_argument('--hourly', type=int, metavar='N', help='与 --forecast 一起使用，同时显示未来 N 小时的逐 3 小时预报')
     parser.add_argument('--compare', action='store_true', help='比较多个城市的天气')
     parser.add_argument('--save', help='保存结果到文件')
+    parser.add_argument('--format', choices=['text', 'parquet'], default='text',
+                        help='保存格式：text 为原来的 CSV/JSON 文件，parquet 追加到按城市和日期分区的 {save}_weather.parquet 数据集')
+    parser.add_argument('--cache-db', default='.weather_cache.db',
+                        help='天气缓存的 SQLite 文件，多次运行之间共享；传入空字符串只在进程内缓存')
     args = parser.parse_args()
+    parquet_store = None
+    if args.save and args.format == 'parquet':
+        from storage import open_storage
+
+        parquet_store = open_storage(f'{args.save}_weather.parquet', 'weather')
     
-    weather = WeatherQuery()
+    weather = WeatherQuery(cache=WeatherCache(path=args.cache_db or None))
     
     if args.compare and len(args.cities) > 1:
         # 比较多个城市的天气
         df = weather.compare_cities(args.cities)
         if df is not None:
+            from tabulate import tabulate
+
             print('\n城市天气对比:')
-            print(tabulate(df, headers='keys', tablefmt='pretty'))
-            
-            # 绘制温度对比图
-            plt.figure(figsize=(10, 6))
-            plt.bar(df['城市'], df['温度'].str.rstrip('°C').astype(float))
-            plt.title('城市温度对比')
-            plt.xlabel('城市')
-            plt.ylabel('温度 (°C)')
-            plt.xticks(rotation=45)
+            print(tabulate(format_frame(df), headers='keys', tablefmt='pretty'))
             
             if args.save:
-                plt.savefig(f'{args.save}_temperature_comparison.png')
-                df.to_csv(f'{args.save}_weather_comparison.csv')
-                print(f'\n结果已保存到 {args.save}_temperature_comparison.png 和 {args.save}_weather_comparison.csv')
-            
-            plt.close()
+                # 绘制温度对比图（Agg 后端，不依赖显示器）
+                from charts import Chart, Panel, render_charts
+
+                render_charts([Chart(f'{args.save}_temperature_comparison.png', [Panel(
+                    'bar', {'labels': df['城市'].tolist(), 'values': df['温度'].to_numpy()},
+                    title='城市温度对比', xlabel='城市', ylabel='温度 (°C)', options={'rotation': 45}
+                )])])
+                if parquet_store:
+                    parquet_store.write(df)
+                    print(f'\n结果已保存到 {args.save}_temperature_comparison.png 和 {parquet_store.root}')
+                else:
+                    df.to_csv(f'{args.save}_weather_comparison.csv')
+                    print(f'\n结果已保存到 {args.save}_temperature_comparison.png 和 {args.save}_weather_comparison.csv')
     
     elif args.forecast:
-        # 显示天气预报
-        for city in args.cities:
-            forecasts = weather.get_forecast(city)
-            if isinstance(forecasts, list):
-                print(f'\n{city}未来5天天气预报:')
-                df = pd.DataFrame(forecasts)
-                print(tabulate(df, headers='keys', tablefmt='pretty'))
-                
-                if args.save:
-                    df.to_csv(f'{args.save}_{city}_forecast.csv')
-                    print(f'预报已保存到 {args.save}_{city}_forecast.csv')
-            else:
-                print(forecasts['error'])
+        # 显示天气预报（多个城市并发查询），按天汇总、逐小时和极值都来自同一次请求
+        import pandas as pd
+        from tabulate import tabulate
+
+        for city, snapshot in zip(args.cities, weather.get_snapshots(args.cities)):
+            if isinstance(snapshot, dict):
+                print(snapshot['error'])
+                continue
+            print(f'\n{city}未来5天天气预报:')
+            df = to_frame(snapshot.daily())
+            print(tabulate(format_frame(df), headers='keys', tablefmt='pretty'))
+            coldest, hottest = snapshot.extremes()
+            print(f"最低 {coldest.temp_min:.1f}°C（{coldest.local_time:%Y-%m-%d %H:%M}），"
+                  f"最高 {hottest.temp_max:.1f}°C（{hottest.local_time:%Y-%m-%d %H:%M}）")
+            if args.hourly:
+                print(f'\n{city}未来{args.hourly}小时天气:')
+                hourly = [point.display() for point in snapshot.hourly(args.hourly)]
+                print(tabulate(pd.DataFrame(hourly), headers='keys', tablefmt='pretty'))
+            
+            if parquet_store:
+                parquet_store.write(df.assign(城市=city))
+                print(f'预报已保存到 {parquet_store.root}')
+            elif args.save:
+                df.to_csv(f'{args.save}_{city}_forecast.csv')
+                print(f'预报已保存到 {args.save}_{city}_forecast.csv')
     
     else:
-        # 显示单个城市的当前天气
-        for city in args.cities:
-            result = weather.get_weather(city)
-            if 'error' in result:
+        # 显示各城市的当前天气（多个城市并发查询）
+        for city, result in zip(args.cities, weather.get_weather_many(args.cities)):
+            if isinstance(result, dict):
                 print(result['error'])
             else:
                 print(f'\n{city}天气查询结果:')
-                for key, value in result.items():
+                for key, value in result.display().items():
                     print(f'{key}: {value}')
                 
-                if args.save:
+                if parquet_store:
+                    parquet_store.write([result.to_row()])
+                    print(f'结果已保存到 {parquet_store.root}')
+                elif args.save:
+                    # 保存数值而不是带单位的字符串，读取后可以直接计算
+                    row = result.to_row()
+                    row['更新时间'] = result.display()['更新时间']
                     with open(f'{args.save}_{city}_weather.json', 'w', encoding='utf-8') as f:
-                        json.dump(result, f, ensure_ascii=False, indent=4)
+                        json.dump(row, f, ensure_ascii=False, indent=4)
                     print(f'结果已保存到 {args.save}_{city}_weather.json')
 
+    if weather.cache:
+        print(f'\n缓存统计：{weather.cache.stats()}')
+
 if __name__ == '__main__':
     main()
\ No newline at end of file
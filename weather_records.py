@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+天气查询结果记录
+
+查询结果原来是 {'温度': '23.5°C', '湿度': '60%'} 这样的格式化字符串，
+绘图和分析时又要用 .str.rstrip('°C').astype(float) 解析回数值。
+这里改为带类型的记录：数值保存为 float，时间保存为 Unix 时间戳，
+只在显示时（display() / format_frame()）加上单位。
+
+记录使用 __slots__，每条记录不带 __dict__，大量历史数据占用的内存更少。
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+# 数值列的显示格式
+DISPLAY_FORMATS = {
+    '温度': '{:.1f}°C',
+    '体感温度': '{:.1f}°C',
+    '最低温度': '{:.1f}°C',
+    '最高温度': '{:.1f}°C',
+    '湿度': '{:.0f}%',
+    '风速': '{:.1f}m/s',
+}
+
+
+def local_time(timestamp, utc_offset=None):
+    """Unix 时间戳 -> 城市当地时间；不知道时区时使用本机时区"""
+    if utc_offset is None:
+        return datetime.fromtimestamp(timestamp)
+    return datetime.fromtimestamp(timestamp, timezone(timedelta(seconds=utc_offset))).replace(tzinfo=None)
+
+
+def _format_value(column, value):
+    if value is None or value != value:
+        return ''
+    pattern = DISPLAY_FORMATS.get(column)
+    return pattern.format(value) if pattern else value
+
+
+@dataclass(slots=True)
+class WeatherRecord:
+    """某个城市的当前天气；forecast 为 True 时由预报点近似得到，不是实测数据"""
+    city: str
+    description: str
+    temp: float
+    feels_like: float
+    humidity: float
+    wind_speed: float
+    updated: int
+    utc_offset: Optional[int] = None
+    forecast: bool = False
+
+    @classmethod
+    def from_api(cls, data):
+        """由 /weather 或 /group 接口返回的一项数据创建"""
+        return cls(
+            city=data['name'],
+            description=data['weather'][0]['description'],
+            temp=float(data['main']['temp']),
+            feels_like=float(data['main']['feels_like']),
+            humidity=float(data['main']['humidity']),
+            wind_speed=float(data['wind']['speed']),
+            updated=int(data['dt']),
+            utc_offset=data.get('timezone'),
+        )
+
+    def to_row(self):
+        """数值形式的一行数据，列名与保存的文件一致"""
+        return {
+            '城市': self.city,
+            '天气': self.description,
+            '温度': self.temp,
+            '体感温度': self.feels_like,
+            '湿度': self.humidity,
+            '风速': self.wind_speed,
+            '更新时间': local_time(self.updated, self.utc_offset),
+        }
+
+    def display(self):
+        """带单位的显示形式"""
+        row = self.to_row()
+        row['更新时间'] = row['更新时间'].strftime('%Y-%m-%d %H:%M:%S') + ('（预报）' if self.forecast else '')
+        return {column: _format_value(column, value) for column, value in row.items()}
+
+
+@dataclass(slots=True)
+class HourlyForecast:
+    """一个 3 小时预报点"""
+    time: int
+    description: str
+    temp: float
+    temp_min: float
+    temp_max: float
+    feels_like: float
+    humidity: float
+    wind_speed: float
+    utc_offset: Optional[int] = None
+
+    @classmethod
+    def from_api(cls, item, utc_offset=None):
+        main = item['main']
+        return cls(
+            time=int(item['dt']),
+            description=item['weather'][0]['description'],
+            temp=float(main['temp']),
+            temp_min=float(main.get('temp_min', main['temp'])),
+            temp_max=float(main.get('temp_max', main['temp'])),
+            feels_like=float(main.get('feels_like', main['temp'])),
+            humidity=float(main['humidity']),
+            wind_speed=float(item['wind']['speed']),
+            utc_offset=utc_offset,
+        )
+
+    @property
+    def local_time(self):
+        return local_time(self.time, self.utc_offset)
+
+    def to_row(self):
+        return {
+            '时间': self.local_time,
+            '天气': self.description,
+            '温度': self.temp,
+            '体感温度': self.feels_like,
+            '湿度': self.humidity,
+            '风速': self.wind_speed,
+        }
+
+    def display(self):
+        row = self.to_row()
+        row['时间'] = row['时间'].strftime('%Y-%m-%d %H:%M')
+        return {column: _format_value(column, value) for column, value in row.items()}
+
+
+@dataclass(slots=True)
+class DailyForecast:
+    """按天汇总的预报"""
+    date: str
+    description: str
+    temp: float
+    temp_min: float
+    temp_max: float
+    humidity: float
+    wind_speed: float
+
+    def to_row(self):
+        return {
+            '日期': self.date,
+            '天气': self.description,
+            '温度': self.temp,
+            '最低温度': self.temp_min,
+            '最高温度': self.temp_max,
+            '湿度': self.humidity,
+            '风速': self.wind_speed,
+        }
+
+    def display(self):
+        return {column: _format_value(column, value) for column, value in self.to_row().items()}
+
+
+def to_frame(records):
+    """记录列表 -> 数值 DataFrame"""
+    import pandas as pd
+
+    return pd.DataFrame([record.to_row() for record in records])
+
+
+def format_frame(df):
+    """给 DataFrame 中的数值列加上单位，用于打印"""
+    df = df.copy()
+    for column in df.columns:
+        if column in DISPLAY_FORMATS:
+            df[column] = [_format_value(column, value) for value in df[column]]
+    return df
+
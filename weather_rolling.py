@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+天气时间序列的滑动窗口统计和异常检测
+
+按城市计算每天的：
+- 日均温度，以及 7 日 / 30 日滑动平均（窗口为最近 N 个自然日，缺失的日期不计入）
+- 日变化：与上一个有数据的日期相比的温差
+- z 分数：相对前 30 天（不含当天）均值和标准差的偏离
+- 季节 z 分数：相对该城市历年同月份（当天之前）的均值和标准差的偏离
+- 异常：任一 z 分数的绝对值不小于阈值
+
+RollingWeather 有两种用法，结果一致：
+- fit(df)：对已有的全部历史一次性向量化计算（前缀和 + 二分查找窗口起点），
+  并记下每个城市末尾窗口的状态
+- update(rows)：采集器追加新数据时只更新涉及的城市和日期。每个窗口维护和与平方和，
+  新的一天进入窗口、最早的一天移出窗口都是 O(1)，当天的新数据只调整当天的值，
+  不再对全部历史重新计算
+
+晚于当前日期之前的数据（乱序到达）不会更新状态，计入 late_rows。
+"""
+
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# 计算 z 分数至少需要的历史天数
+MIN_PERIODS = 7
+# z 分数的基线窗口（天）
+BASELINE_DAYS = 30
+
+
+class RunningWindow:
+    """最近若干天的滑动窗口，维护条数、和与平方和
+
+    加入和移出都是 O(1)；为避免长时间加减累积浮点误差，每加入 REBASE 次重新求和一次。
+    """
+
+    __slots__ = ('items', 'total', 'squares', '_pushes')
+    REBASE = 1000
+
+    def __init__(self):
+        self.items = deque()
+        self.total = 0.0
+        self.squares = 0.0
+        self._pushes = 0
+
+    def push(self, day, value):
+        self.items.append((day, value))
+        self.total += value
+        self.squares += value * value
+        self._pushes += 1
+        if self._pushes % self.REBASE == 0:
+            self.total = sum(value for _, value in self.items)
+            self.squares = sum(value * value for _, value in self.items)
+
+    def evict(self, before):
+        """移出日期早于 before 的数据"""
+        items = self.items
+        while items and items[0][0] < before:
+            _, value = items.popleft()
+            self.total -= value
+            self.squares -= value * value
+        if not items:
+            self.total = self.squares = 0.0
+
+    def replace_last(self, value):
+        day, old = self.items[-1]
+        self.items[-1] = (day, value)
+        self.total += value - old
+        self.squares += value * value - old * old
+
+    def mean(self):
+        return self.total / len(self.items) if self.items else np.nan
+
+    def stats(self, min_periods):
+        """(均值, 样本标准差)，数据不足 min_periods 条时为 NaN"""
+        return _mean_std(len(self.items), self.total, self.squares, min_periods)
+
+
+def _mean_std(count, total, squares, min_periods):
+    if count < max(min_periods, 2):
+        return np.nan, np.nan
+    mean = total / count
+    variance = max(squares - total * mean, 0.0) / (count - 1)
+    return mean, variance ** 0.5
+
+
+def _zscore(value, mean, std):
+    if np.isnan(mean) or not std:
+        return np.nan
+    return (value - mean) / std
+
+
+class _CityState:
+    """一个城市的增量计算状态"""
+
+    __slots__ = ('day', 'day_sum', 'day_count', 'previous', 'windows', 'baseline', 'months')
+
+    def __init__(self, windows):
+        self.day = None
+        self.day_sum = 0.0
+        self.day_count = 0
+        # 上一个有数据的日期的日均温度
+        self.previous = np.nan
+        # 各滑动窗口，包含当天
+        self.windows = {window: RunningWindow() for window in windows}
+        # 前 BASELINE_DAYS 天，不含当天
+        self.baseline = RunningWindow()
+        # {月份: [天数, 和, 平方和]}，只包含已经结束的日期
+        self.months = {}
+
+    @property
+    def value(self):
+        return self.day_sum / self.day_count
+
+
+def _month(day):
+    return int(np.datetime64(int(day), 'D').astype(object).month)
+
+
+def _month_sums(months, values):
+    """按月份累计 (天数, 和, 平方和)"""
+    size = 13
+    count = np.bincount(months, minlength=size)
+    total = np.bincount(months, weights=values, minlength=size)
+    squares = np.bincount(months, weights=values * values, minlength=size)
+    present = np.flatnonzero(count)
+    return present, [[int(count[m]), float(total[m]), float(squares[m])] for m in present]
+
+
+def _day_numbers(dates):
+    """日期列 -> 自 1970-01-01 起的天数"""
+    return pd.to_datetime(dates).to_numpy().astype('datetime64[D]').astype(np.int64)
+
+
+def _daily_sums(rows):
+    """原始记录 -> 按 (城市, 天) 汇总的温度和与条数，按城市和日期排序
+
+    城市、日期或温度缺失（日期无法解析）的记录不计入。
+    """
+    df = rows if isinstance(rows, pd.DataFrame) else pd.DataFrame.from_records(list(rows))
+    if df.empty:
+        return pd.DataFrame({'城市': [], 'day': np.empty(0, dtype=np.int64), 'sum': [], 'count': []})
+    dates = pd.to_datetime(df['日期'] if '日期' in df else df['更新时间'], errors='coerce')
+    cities = df['城市'] if '城市' in df else pd.Series('', index=df.index)
+    temps = pd.to_numeric(df['温度'], errors='coerce')
+    valid = (dates.notna() & cities.notna() & temps.notna()).to_numpy()
+    daily = pd.DataFrame({
+        '城市': cities.to_numpy()[valid],
+        'day': _day_numbers(dates[valid]),
+        'temp': temps.to_numpy(dtype=float)[valid],
+    })
+    return daily.groupby(['城市', 'day'], sort=True)['temp'].agg(['sum', 'count']).reset_index()
+
+
+class RollingWeather:
+    """按城市的滑动窗口统计和异常检测
+
+    Args:
+        windows: 滑动平均的窗口（天）
+        threshold: |z 分数| 不小于该值视为异常
+        min_periods: 计算 z 分数至少需要的历史天数
+    """
+
+    def __init__(self, windows=(7, 30), threshold=3.0, min_periods=MIN_PERIODS):
+        self.windows = tuple(windows)
+        self.threshold = threshold
+        self.min_periods = min_periods
+        self._cities = {}
+        self.late_rows = 0
+
+    def _columns(self):
+        return (['城市', '日期', '日均温度'] + [f'{window}日均温' for window in self.windows]
+                + ['日变化', 'z分数', '季节z分数', '异常'])
+
+    def _flag(self, table):
+        table['异常'] = (table['z分数'].abs() >= self.threshold) | (table['季节z分数'].abs() >= self.threshold)
+        return table
+
+    def fit(self, rows):
+        """对全部历史向量化计算，返回每个 (城市, 日期) 一行的表，并记录各城市末尾的状态"""
+        daily = _daily_sums(rows)
+        if daily.empty:
+            self._cities = {}
+            return pd.DataFrame(columns=self._columns())
+        values = (daily['sum'] / daily['count']).to_numpy()
+        days = daily['day'].to_numpy()
+        city_codes = pd.factorize(daily['城市'], sort=True)[0]
+        # (城市, 天) 合成一个递增的键，窗口起点用二分查找，窗口内的和用前缀和相减；
+        # 城市之间留出大于最长窗口的间隔，窗口不会跨到上一个城市
+        stride = days.max() - days.min() + max(self.windows + (BASELINE_DAYS,)) + 1
+        key = city_codes.astype(np.int64) * stride + (days - days.min())
+        position = np.arange(len(key))
+        # 减去整体均值后再累加，前缀和的数值较小，相减时损失的精度也小
+        center = values.mean()
+        centered = values - center
+        prefix = np.concatenate(([0.0], np.cumsum(centered)))
+        prefix_squares = np.concatenate(([0.0], np.cumsum(centered * centered)))
+
+        table = pd.DataFrame({
+            '城市': daily['城市'].to_numpy(),
+            '日期': pd.to_datetime(days.astype('datetime64[D]')),
+            '日均温度': values,
+        })
+        for window in self.windows:
+            start = np.searchsorted(key, key - window + 1)
+            table[f'{window}日均温'] = center + (prefix[position + 1] - prefix[start]) / (position + 1 - start)
+        first = np.r_[True, city_codes[1:] != city_codes[:-1]]
+        table['日变化'] = np.where(first, np.nan, values - np.r_[np.nan, values[:-1]])
+
+        # 前 BASELINE_DAYS 天（不含当天），与增量计算一样用和与平方和
+        start = np.searchsorted(key, key - BASELINE_DAYS)
+        table['z分数'] = self._vector_zscore(
+            centered, position - start, prefix[position] - prefix[start], prefix_squares[position] - prefix_squares[start]
+        )
+
+        # 同一城市同月份、当天之前的全部日期
+        months = table['日期'].dt.month.to_numpy()
+        by_month = pd.DataFrame({'value': values, 'square': values * values}).groupby([city_codes, months], sort=False)
+        cumulative = by_month.cumsum().to_numpy()
+        table['季节z分数'] = self._vector_zscore(
+            values, by_month.cumcount().to_numpy(),
+            cumulative[:, 0] - values, cumulative[:, 1] - values * values
+        )
+        self._flag(table)
+        self._seed(daily, values, months, first)
+        return table
+
+    def _vector_zscore(self, values, counts, totals, squares):
+        counts = np.asarray(counts, dtype=float)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = totals / counts
+            std = np.sqrt(np.maximum(squares - totals * mean, 0.0) / (counts - 1))
+            z = (values - mean) / std
+        z[(counts < max(self.min_periods, 2)) | ~(std > 0)] = np.nan
+        return z
+
+    def _seed(self, daily, values, months, first):
+        """由 fit 的结果建立各城市的增量状态：只需要每个城市末尾的窗口和各月份的累计"""
+        self._cities = {}
+        keep = max(self.windows + (BASELINE_DAYS,)) + 1
+        cities = daily['城市'].to_numpy()
+        days = daily['day'].to_numpy()
+        totals = daily['sum'].to_numpy()
+        counts = daily['count'].to_numpy()
+        starts = np.flatnonzero(first)
+        ends = np.r_[starts[1:], len(days)]
+        for begin, end in zip(starts, ends):
+            state = _CityState(self.windows)
+            last = int(days[end - 1])
+            state.day = last
+            state.day_sum = float(totals[end - 1])
+            state.day_count = int(counts[end - 1])
+            if end - begin > 1:
+                state.previous = float(values[end - 2])
+            tail = range(max(begin, end - keep), end)
+            for window, running in state.windows.items():
+                for i in tail:
+                    if days[i] > last - window:
+                        running.push(int(days[i]), float(values[i]))
+            for i in tail[:-1]:
+                if days[i] >= last - BASELINE_DAYS:
+                    state.baseline.push(int(days[i]), float(values[i]))
+            # 当天之前（已经结束）的日期按月份累计
+            closed = slice(begin, end - 1)
+            for month, row in zip(*_month_sums(months[closed], values[closed])):
+                state.months[int(month)] = row
+            self._cities[cities[begin]] = state
+
+    def update(self, rows):
+        """加入新的原始记录（需要 城市、日期 或 更新时间、温度），只更新涉及的城市和日期
+
+        Returns:
+            涉及的 (城市, 日期) 的最新结果，列与 fit() 相同
+        """
+        results = []
+        daily = _daily_sums(rows)
+        for city, day, total, count in zip(daily['城市'], daily['day'], daily['sum'], daily['count']):
+            state = self._cities.get(city)
+            if state is None:
+                state = self._cities[city] = _CityState(self.windows)
+            if self._step(state, int(day), float(total), int(count)):
+                results.append(self._row(city, state))
+        table = pd.DataFrame(results, columns=self._columns()[:-1])
+        return self._flag(table)
+
+    def _step(self, state, day, total, count):
+        """把某天的温度和与条数并入城市状态，乱序的旧数据返回 False"""
+        if state.day is not None and day < state.day:
+            self.late_rows += count
+            return False
+        if state.day == day:
+            state.day_sum += total
+            state.day_count += count
+            for running in state.windows.values():
+                running.replace_last(state.value)
+            return True
+        if state.day is not None:
+            # 前一天结束：进入基线和月份统计
+            value = state.value
+            state.previous = value
+            state.baseline.push(state.day, value)
+            stats = state.months.setdefault(_month(state.day), [0, 0.0, 0.0])
+            stats[0] += 1
+            stats[1] += value
+            stats[2] += value * value
+        state.day, state.day_sum, state.day_count = day, total, count
+        value = state.value
+        for window, running in state.windows.items():
+            running.evict(day - window + 1)
+            running.push(day, value)
+        state.baseline.evict(day - BASELINE_DAYS)
+        return True
+
+    def _row(self, city, state):
+        value = state.value
+        mean, std = state.baseline.stats(self.min_periods)
+        month = state.months.get(_month(state.day), [0, 0.0, 0.0])
+        seasonal_mean, seasonal_std = _mean_std(*month, self.min_periods)
+        return ([city, pd.Timestamp(np.datetime64(state.day, 'D')), value]
+                + [running.mean() for running in state.windows.values()]
+                + [value - state.previous, _zscore(value, mean, std), _zscore(value, seasonal_mean, seasonal_std)])
+
+    def latest(self):
+        """各城市当前日期的结果"""
+        table = pd.DataFrame([self._row(city, state) for city, state in self._cities.items()],
+                             columns=self._columns()[:-1])
+        return self._flag(table)
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+城市天气快照
+
+/forecast 接口一次返回未来 5 天、每 3 小时一个的 40 个数据点。原来的
+get_forecast 只取每天的第一个点，其余 87% 的数据被丢弃；查看当前天气
+又要另外发一次请求。
+
+CityWeatherSnapshot 保存一次完整的接口返回，所有视图都由它计算，不再发请求：
+- hourly()：全部 3 小时数据点
+- daily()：按城市当地日期分组，统计每天的最低 / 最高 / 平均温度、平均湿度、
+  最大风速和出现最多的天气
+- current()：有实时天气数据时直接使用，否则取离现在最近的预报点
+- extremes()：整个预报期内的最低和最高温度
+"""
+
+from collections import Counter
+from datetime import datetime
+
+from weather_records import DailyForecast, HourlyForecast, WeatherRecord
+
+
+class CityWeatherSnapshot:
+    """一个城市某一时刻的天气数据
+
+    Args:
+        forecast: /forecast 接口返回的 JSON
+        current: /weather 接口返回的 JSON，可选
+        fetched_at: 获取数据的时间戳（秒）
+    """
+
+    def __init__(self, forecast, current=None, fetched_at=None):
+        self.raw_forecast = forecast
+        self.raw_current = current
+        city = forecast.get('city') or {}
+        self.city = city.get('name') or (current or {}).get('name')
+        # 城市所在时区相对 UTC 的秒数，用于按当地日期分组
+        self.utc_offset = city.get('timezone')
+        self.fetched_at = fetched_at
+        self.points = [HourlyForecast.from_api(item, self.utc_offset) for item in forecast['list']]
+
+    def hourly(self, hours=None):
+        """逐 3 小时的预报（HourlyForecast 列表），hours 限制返回的小时数"""
+        points = self.points
+        if hours is not None:
+            points = points[:max(1, -(-hours // 3))]
+        return list(points)
+
+    def _daily_groups(self):
+        groups = {}
+        for point in self.points:
+            groups.setdefault(point.local_time.date(), []).append(point)
+        return groups
+
+    def daily(self, days=5):
+        """按天汇总的预报（DailyForecast 列表）：每天的最低 / 最高 / 平均温度等"""
+        result = []
+        for day, points in list(self._daily_groups().items())[:days]:
+            result.append(DailyForecast(
+                date=day.strftime('%Y-%m-%d'),
+                description=Counter(point.description for point in points).most_common(1)[0][0],
+                temp=sum(point.temp for point in points) / len(points),
+                temp_min=min(point.temp_min for point in points),
+                temp_max=max(point.temp_max for point in points),
+                humidity=sum(point.humidity for point in points) / len(points),
+                wind_speed=max(point.wind_speed for point in points),
+            ))
+        return result
+
+    def current(self):
+        """当前天气（WeatherRecord）；没有实时数据时用离现在最近的预报点近似"""
+        if self.raw_current is not None:
+            return WeatherRecord.from_api(self.raw_current)
+        now = datetime.now().timestamp()
+        point = min(self.points, key=lambda point: abs(point.time - now))
+        return WeatherRecord(
+            city=self.city,
+            description=point.description,
+            temp=point.temp,
+            feels_like=point.feels_like,
+            humidity=point.humidity,
+            wind_speed=point.wind_speed,
+            updated=point.time,
+            utc_offset=self.utc_offset,
+            forecast=True,
+        )
+
+    def extremes(self):
+        """预报期内最低温度和最高温度出现的预报点 (coldest, hottest)"""
+        coldest = min(self.points, key=lambda point: point.temp_min)
+        hottest = max(self.points, key=lambda point: point.temp_max)
+        return coldest, hottest
@@ -9,18 +9,58 @@
 """
 
 import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import matplotlib.pyplot as plt
 from datetime import datetime
+import argparse
+import hashlib
 import json
 import os
+import threading
+from collections import Counter
+from itertools import chain
+from concurrent.futures import Future
+from urllib.parse import urljoin, urlparse
+
+from crawl_frontier import URLFrontier, normalize_url
+from http_cache import HTTPCache
+from html_extract import get_extractor
+from http_session import get_session
+from news_sink import JsonLinesSink, is_jsonl_path, iter_jsonl, iter_news_chunks
+from parse_pool import ParsePipeline
+from rate_limit import RETRY_STATUSES, HostRateLimiter, RetryableError, RetryPolicy, RetryScheduler, parse_retry_after
+
+# pandas、pyarrow（storage）、NumPy（近似去重、词频、全文索引）和 matplotlib（charts）在用到时才导入，
+# 不拖慢爬虫启动（见 bench_startup.py）
+
+# analyze_data 用到的列，读取 Parquet 时只加载这些列
+ANALYSIS_COLUMNS = ['title', 'category', 'author', 'publish_time', 'duplicate_of']
+
+def content_hash(news):
+    """根据标题和正文计算新闻内容的摘要，用于增量爬取时判断内容是否变化"""
+    text = f"{news.get('title', '')}\n{news.get('content', '')}"
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
 
 class NewsCrawler:
-    def __init__(self, base_url, max_pages=5, retry_times=3):
+    def __init__(self, base_url, max_pages=5, retry_times=3, max_workers=1, per_host_limit=4, session=None,
+                 max_depth=2, seen=None, cache=None, incremental=False, data_file='news_data.json',
+                 sink=None, parser='auto', parse_processes=0, rate_limit=None, timeout=(5, 15), dedup=None):
         self.base_url = base_url
+        # 最多爬取的列表页数量
         self.max_pages = max_pages
+        # 列表页的最大翻页深度，首页深度为 0
+        self.max_depth = max_depth
         self.retry_times = retry_times
+        # 重试策略：指数退避 + 随机抖动，遵循 Retry-After
+        self.retry_policy = RetryPolicy(retry_times=retry_times)
+        # 每个主机每秒最多请求数，None 表示不限速
+        self.rate_limiter = HostRateLimiter(rate_limit) if rate_limit else None
+        # 请求超时（连接超时, 读取超时），避免卡死的连接拖住整个爬取
+        self.timeout = timeout
+        # 并发抓取详情页的线程数，1 表示逐条串行抓取
+        self.max_workers = max_workers
+        # 同一主机同时进行的请求数上限
+        self.per_host_limit = per_host_limit
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
@@ -28,188 +68,446 @@ class NewsCrawler:
             'Connection': 'keep-alive'
         }
         self.news_data = []
+        # HTTP会话，默认借用进程内共享的连接池
+        self.session = session or get_session()
+        # 待爬列表页队列；seen 为URL去重集合，默认使用布隆过滤器
+        self.frontier = URLFrontier(max_depth=max_depth, seen=seen)
+        # 磁盘HTTP缓存（http_cache.HTTPCache），为空时不缓存
+        self.cache = cache
+        # 增量模式：跳过 data_file 中已保存且标题未变的新闻，保存时只追加新增或变化的记录
+        self.incremental = incremental
+        self.data_file = data_file
+        self.known_news = None
+        self.skipped_count = 0
+        # 流式输出（news_sink.JsonLinesSink）：设置后每条新闻解析完立即写入文件，不再保存在 news_data 中
+        self.sink = sink
+        # HTML解析后端，见 html_extract.get_extractor
+        self.extractor = get_extractor(parser)
+        self.parser = parser
+        # 详情页解析进程数，0 表示在抓取线程中直接解析
+        self.parse_processes = parse_processes
+        self.parse_pipeline = None
+        # 近似重复检测：'drop' 丢弃正文与已收录新闻近似的转载稿，'cluster' 保留并标注 duplicate_of
+        if isinstance(dedup, str):
+            from near_dup import NearDuplicateFilter
 
-    def fetch_page(self, url, retry_count=0):
-        """获取页面内容，带重试机制"""
+            dedup = NearDuplicateFilter(mode=dedup)
+        self.dedup = dedup
+
+    def _fetch_once(self, url):
+        """发送一次请求（带条件请求缓存）；超时、连接错误和 429/5xx 抛出 RetryableError"""
+        cached = self.cache.lookup(url) if self.cache else None
+        if cached and cached.is_fresh():
+            return cached.text
+
+        headers = self.headers
+        if cached:
+            headers = {**self.headers, **cached.validators()}
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            return response.text
-        except requests.RequestException as e:
-            if retry_count < self.retry_times:
-                print(f"获取页面失败，正在进行第{retry_count + 1}次重试...")
-                return self.fetch_page(url, retry_count + 1)
-            print(f"获取页面失败: {e}")
-            return None
+            response = self.session.get(url, headers=headers, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise RetryableError(str(e)) from e
+        if cached and response.status_code == 304:
+            self.cache.mark_revalidated(cached)
+            return cached.text
+        if response.status_code in RETRY_STATUSES:
+            raise RetryableError(f"HTTP {response.status_code}",
+                                 retry_after=parse_retry_after(response.headers.get('Retry-After')))
+        response.raise_for_status()
+        if self.cache:
+            self.cache.store(url, response)
+        return response.text
+
+    def fetch_page(self, url):
+        """获取页面内容，失败时返回 None
+
+        与详情页一样交给 RetryScheduler：受主机并发上限和限速约束，失败时按退避时间重新排队。
+        """
+        scheduler = RetryScheduler(policy=self.retry_policy, rate_limiter=self.rate_limiter)
+        return scheduler.run(self._fetch_limited, [url])[0]
 
     def fetch_news_detail(self, url):
         """获取新闻详细内容"""
         html = self.fetch_page(url)
         if not html:
             return None
+        return self.parse_news_detail(html)
 
+    def parse_news_detail(self, html):
+        """从详情页HTML中解析正文、发布时间和作者"""
         try:
-            soup = BeautifulSoup(html, 'html.parser')
-            # 适配新浪新闻的文章内容结构
-            content = soup.select_one('#article') or soup.select_one('.article')
-            if content:
-                return {
-                    'content': content.get_text(strip=True),
-                    'publish_time': self._extract_publish_time(soup),
-                    'author': self._extract_author(soup)
-                }
+            return self.extractor.extract_detail(html)
         except Exception as e:
             print(f"解析新闻详情失败: {e}")
         return None
 
-    def _extract_publish_time(self, soup):
-        """提取发布时间"""
-        time_element = soup.select_one('.date') or soup.select_one('.time-source')
-        return time_element.text.strip() if time_element else None
+    def _host_slot(self, url):
+        """获取某个主机的并发信号量（按需创建）"""
+        host = urlparse(url).netloc
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_slots[host] = slot
+            return slot
+
+    def _fetch_limited(self, url):
+        """在主机并发上限内请求一次；失败时抛出 RetryableError，由调度器决定何时重试"""
+        with self._host_slot(url):
+            return self._fetch_once(url)
+
+    def _fetch_detail_limited(self, url):
+        """在主机并发上限内请求一次详情页并解析；启用解析进程池时返回解析结果的 Future"""
+        html = self._fetch_limited(url)
+        if not html:
+            return None
+        if self.parse_pipeline is None:
+            return self.parse_news_detail(html)
+        # 解析队列已满时这里会阻塞，抓取线程随之放慢
+        return self.parse_pipeline.submit_detail(html)
+
+    def fetch_news_details(self, urls):
+        """批量获取新闻详情，结果顺序与 urls 一致
 
-    def _extract_author(self, soup):
-        """提取作者信息"""
-        author_element = soup.select_one('.show_author') or soup.select_one('.source')
-        return author_element.text.strip() if author_element else None
+        由 RetryScheduler 的 max_workers 个线程执行，失败的请求按退避时间重新排队，
+        超过主机速率的请求延后执行，线程不会为等待重试而空转。
+        """
+        scheduler = RetryScheduler(workers=self.max_workers, policy=self.retry_policy,
+                                   rate_limiter=self.rate_limiter)
+        results = scheduler.run(self._fetch_detail_limited, urls)
+        return [result.result() if isinstance(result, Future) else result for result in results]
 
     def crawl_multiple_pages(self):
         """爬取多个页面的新闻"""
-        print("\n正在爬取新浪新闻首页...")
-        html = self.fetch_page(self.base_url)
-        if html:
-            self.parse_news(html)
-        else:
-            print("新闻页面爬取失败")
+        print("\n正在爬取新浪新闻...")
+        if self.incremental and self.known_news is None:
+            print(f"增量模式：已保存 {self.load_index()} 条新闻")
+        if self.parse_processes:
+            self.parse_pipeline = ParsePipeline(self.parser, workers=self.parse_processes)
+        try:
+            self.frontier.push(self.base_url, depth=0)
+            pages = 0
+            while self.frontier and pages < self.max_pages:
+                url, depth = self.frontier.pop()
+                pages += 1
+                print(f"正在爬取第{pages}个列表页: {url}")
+                html = self.fetch_page(url)
+                if not html:
+                    print("新闻页面爬取失败")
+                    continue
+                self.parse_news(html)
+                for link in self.extract_page_links(html, url):
+                    self.frontier.push(link, depth + 1)
+        finally:
+            if self.parse_pipeline is not None:
+                self.parse_pipeline.close()
+                self.parse_pipeline = None
+
+    def extract_page_links(self, html, page_url):
+        """提取列表页中的翻页链接（只保留与首页同一主机的链接）"""
+        host = urlparse(self.base_url).netloc
+        links = []
+        for href in self.extractor.extract_page_links(html):
+            link = urljoin(page_url, href)
+            if urlparse(link).netloc == host:
+                links.append(link)
+        return links
 
     def parse_news(self, html):
         """解析新闻内容"""
-        if not html:
+        news_list = self._pending_news(self.extract_news_list(html))
+        if not news_list:
             return
+
+        # 获取新闻详情（max_workers > 1 时并发抓取）
+        details = self.fetch_news_details([news['url'] for news in news_list])
+        self._collect_news(news_list, details)
+
+    def _pending_news(self, news_list):
+        """筛选需要抓取详情的新闻"""
+        pending = []
+        for news in news_list:
+            # 同一篇新闻可能出现在多个列表页，只抓取没见过的
+            if not self.frontier.is_new(news['url']):
+                continue
+            # 增量模式下，已保存过正文且标题没变的新闻不再抓取。
+            # 只比较标题：标题不变、只修改了正文的新闻检测不到，需要时关闭增量模式重新爬取；
+            # 上次详情页抓取失败、没有保存正文的新闻会重新抓取
+            if self.known_news:
+                known = self.known_news.get(normalize_url(news['url']))
+                if known and known[0] == news['title'] and known[2]:
+                    self.skipped_count += 1
+                    continue
+            pending.append(news)
+        return pending
+
+    def _collect_news(self, news_list, details):
+        """合并列表信息和详情，记录新增或内容有变化的新闻"""
+        for news, detail in zip(news_list, details):
+            if detail:
+                news.update(detail)
+            news['content_hash'] = content_hash(news)
+            if self.known_news:
+                known = self.known_news.get(normalize_url(news['url']))
+                if known and known[1] == news['content_hash']:
+                    self.skipped_count += 1
+                    continue
+            if self.dedup is not None:
+                original = self.dedup.check(news)
+                if original:
+                    if self.dedup.mode == 'drop':
+                        continue
+                    news['duplicate_of'] = original
+            if self.sink is not None:
+                self.sink.write(news)
+            else:
+                self.news_data.append(news)
+
+    def load_index(self, filename=None):
+        """读取已保存的新闻，建立 URL -> (标题, 内容哈希, 是否有正文) 索引，返回已保存的新闻数"""
+        filename = filename or self.data_file
+        self.known_news = {}
+        if not os.path.exists(filename):
+            return 0
+        from storage import is_parquet_path, open_storage
+
+        if is_jsonl_path(filename):
+            records = iter_jsonl(filename)
+        elif is_parquet_path(filename):
+            columns = ['url', 'title', 'content_hash'] + (['content', 'duplicate_of'] if self.dedup is not None else [])
+            records = chain.from_iterable(open_storage(filename, 'news').iter_batches(columns=columns))
+        else:
+            with open(filename, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+        for record in records:
+            title = record.get('title')
+            digest = record.get('content_hash') or content_hash(record)
+            # 没有正文时内容哈希只由标题算出，由此判断，不需要读取正文列
+            self.known_news[normalize_url(record['url'])] = (
+                title, digest, digest != content_hash({**record, 'content': ''})
+            )
+            # 已保存的新闻也收录进去重索引，新抓到的转载稿同样能被识别
+            if self.dedup is not None and not record.get('duplicate_of'):
+                self.dedup.add(record)
+        return len(self.known_news)
+
+    def extract_news_list(self, html):
+        """从列表页HTML中提取新闻条目（不抓取详情）"""
+        if not html:
+            return []
         
-        soup = BeautifulSoup(html, 'html.parser')
-        # 适配新浪新闻的HTML结构
-        news_items = soup.select('.news-item') or soup.select('.main-news h2') or soup.select('.ct_t_01 a') or soup.select('.news-2 a')
+        try:
+            entries = self.extractor.extract_list(html)
+        except Exception as e:
+            print(f"解析新闻列表失败: {e}")
+            return []
         
-        if not news_items:
+        if not entries:
             print("未找到新闻列表，可能是页面结构已变更")
-            return
+            return []
         
-        for item in news_items:
-            try:
-                title_link = item.select_one('a')
-                if not title_link:
-                    continue
-                    
-                news = {
-                    'title': title_link.text.strip(),
-                    'date': datetime.now().strftime('%Y-%m-%d'),
-                    'category': '新浪新闻',
-                    'url': title_link.get('href', '')
-                }
-                
-                if news['title'] and news['url'] and news['url'].startswith('http'):
-                    # 获取新闻详情
-                    detail = self.fetch_news_detail(news['url'])
-                    if detail:
-                        news.update(detail)
-                    self.news_data.append(news)
-            except (AttributeError, KeyError) as e:
-                print(f"解析新闻项失败: {e}")
+        news_list = []
+        today = datetime.now().strftime('%Y-%m-%d')
+        for title, url in entries:
+            news = {
+                'title': title,
+                'date': today,
+                'category': '新浪新闻',
+                'url': url
+            }
+            
+            if news['title'] and news['url'] and news['url'].startswith('http'):
+                news_list.append(news)
+        return news_list
     
-    def save_data(self, filename='news_data.json'):
-        """保存数据到文件"""
+    def save_data(self, filename=None):
+        """保存数据到文件；增量模式下与文件中已有的记录合并，同一URL以本次结果为准
+
+        使用流式输出时数据已经逐条写入，这里只负责落盘并关闭文件。
+        文件名以 .parquet 结尾时写入按日期和类别分区的 Parquet 数据集（追加写入，
+        数据集中同一URL的旧记录被删除，以本次结果为准）。
+        """
+        if self.sink is not None:
+            self.sink.close()
+            return
+        filename = filename or self.data_file
+        if filename.endswith('.parquet'):
+            from storage import open_storage
+
+            open_storage(filename, 'news').write(self.news_data, replace_key='url')
+            return
+        records = self.news_data
+        if self.incremental and os.path.exists(filename):
+            with open(filename, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+            positions = {normalize_url(record['url']): i for i, record in enumerate(records)}
+            for news in self.news_data:
+                i = positions.get(normalize_url(news['url']))
+                if i is None:
+                    records.append(news)
+                else:
+                    records[i] = news
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(self.news_data, f, ensure_ascii=False, indent=2)
+            json.dump(records, f, ensure_ascii=False, indent=2)
     
-    def analyze_data(self):
-        """分析数据"""
-        if not self.news_data:
-            print("没有获取到新闻数据，无法进行分析")
-            return
+    def _iter_news_chunks(self, source=None, chunksize=1000, columns=ANALYSIS_COLUMNS):
+        """按块产出新闻记录：source 为文件路径时从文件读取（news_sink.iter_news_chunks），
+        否则读取输出文件或内存中的数据
+
+        读取 Parquet 时只加载 columns 中的列，None 表示全部列。
+        """
+        if source is None and self.sink is not None:
+            self.sink.flush()
+            source = self.sink.path
+        if source is None:
+            for i in range(0, len(self.news_data), chunksize):
+                yield self.news_data[i:i + chunksize]
+        else:
+            yield from iter_news_chunks(source, chunksize, columns)
 
-        df = pd.DataFrame(self.news_data)
-        if df.empty:
-            print("数据框为空，无法进行分析")
+    def update_index(self, index_dir, source=None):
+        """把本次爬取的新闻（或 source 文件中的新闻）加入全文索引，返回新写入的篇数"""
+        from news_index import NewsIndex
+
+        index = NewsIndex(index_dir)
+        return index.add(chain.from_iterable(self._iter_news_chunks(source, columns=None)))
+
+    def analyze_data(self, source=None, chunksize=1000, segmenter='auto'):
+        """分析数据
+
+        数据按块读取并累加计数，JSON Lines 输出再大也不需要一次性载入内存。
+
+        Args:
+            source: 要分析的数据文件（.json、.jsonl[.gz|.zst] 或 Parquet 数据集），默认分析本次爬取的结果
+            chunksize: 每块读取的记录数
+            segmenter: 标题分词器，见 term_freq.get_segmenter
+        """
+        import pandas as pd
+
+        from charts import Chart, Panel, render_charts
+        from term_freq import TermCounter
+
+        total = 0
+        category_counts = Counter()
+        author_counts = Counter()
+        time_counts = Counter()
+        word_counts = TermCounter(segmenter)
+        time_min = time_max = None
+
+        for chunk in self._iter_news_chunks(source, chunksize):
+            # 标注为转载稿（duplicate_of）的新闻不重复计数
+            chunk = [news for news in chunk if not news.get('duplicate_of')]
+            for news in chunk:
+                if not total:
+                    print("\n新闻标题列表：")
+                total += 1
+                title = news.get('title') or ''
+                print(f"- {title}")
+                if news.get('category'):
+                    category_counts[news['category']] += 1
+                if news.get('author'):
+                    author_counts[news['author']] += 1
+                publish_time = news.get('publish_time')
+                if publish_time:
+                    time_counts[publish_time] += 1
+                    time_min = publish_time if time_min is None else min(time_min, publish_time)
+                    time_max = publish_time if time_max is None else max(time_max, publish_time)
+            # 新闻标题词频分析，每块分词一次
+            word_counts.update(news.get('title') for news in chunk)
+
+        if not total:
+            print("没有获取到新闻数据，无法进行分析")
             return
 
-        print(f"\n共获取到 {len(df)} 条新闻")
+        print(f"\n共获取到 {total} 条新闻")
         
         # 统计基本信息
         print("\n新闻数据统计：")
-        if 'publish_time' in df.columns:
-            print(f"发布时间范围：{df['publish_time'].min()} 至 {df['publish_time'].max()}")
-        if 'author' in df.columns:
+        if time_counts:
+            print(f"发布时间范围：{time_min} 至 {time_max}")
+        if author_counts:
             print("\n作者统计：")
-            print(df['author'].value_counts().head())
+            print(pd.Series(dict(author_counts.most_common(5)), name='author'))
 
-        # 新闻标题词频分析
         print("\n热门词汇统计：")
-        all_titles = ' '.join(df['title'])
-        words = all_titles.split()
-        word_freq = pd.Series(words).value_counts().head(10)
+        word_freq = pd.Series(dict(word_counts.most_common(10)), dtype='int64')
         print(word_freq)
 
-        # 绘制多个图表
-        plt.figure(figsize=(15, 10))
+        # 绘制多个图表：先准备好数据，最后一起渲染（Agg 后端，不依赖显示器）
+        panels = [Panel(title='新闻类别分布'), Panel(title='TOP5作者发文数量'),
+                  Panel(title='热门词汇TOP10'), Panel(title='新闻发布时间分布')]
 
         # 1. 新闻类别分布
-        plt.subplot(2, 2, 1)
-        if 'category' in df.columns:
-            df['category'].value_counts().plot(kind='pie', autopct='%1.1f%%')
-            plt.title('新闻类别分布')
+        if category_counts:
+            labels, values = zip(*category_counts.most_common())
+            panels[0] = Panel('pie', {'labels': list(labels), 'values': list(values)}, title='新闻类别分布')
 
         # 2. 作者发文数量
-        plt.subplot(2, 2, 2)
-        if 'author' in df.columns:
-            df['author'].value_counts().head(5).plot(kind='bar')
-            plt.title('TOP5作者发文数量')
-            plt.xticks(rotation=45)
+        if author_counts:
+            labels, values = zip(*author_counts.most_common(5))
+            panels[1] = Panel('bar', {'labels': list(labels), 'values': list(values)},
+                              title='TOP5作者发文数量', options={'rotation': 45})
 
         # 3. 热门词汇统计
-        plt.subplot(2, 2, 3)
-        word_freq.plot(kind='barh')
-        plt.title('热门词汇TOP10')
+        if not word_freq.empty:
+            panels[2] = Panel('barh', {'labels': list(word_freq.index), 'values': word_freq.tolist()},
+                              title='热门词汇TOP10')
 
         # 4. 发布时间分布
-        plt.subplot(2, 2, 4)
-        if 'publish_time' in df.columns:
-            df['publish_time'].value_counts().sort_index().plot(kind='line')
-            plt.title('新闻发布时间分布')
-            plt.xticks(rotation=45)
-
-        plt.tight_layout()
-        plt.savefig('news_analysis_detailed.png')
-        print("\n详细分析图表已保存为 'news_analysis_detailed.png'")
+        if time_counts:
+            times = sorted(time_counts)
+            panels[3] = Panel('line', {'x': times, 'y': [time_counts[t] for t in times]},
+                              title='新闻发布时间分布', options={'rotation': 45})
 
-        print("\n新闻标题列表：")
-        for title in df['title']:
-            print(f"- {title}")
+        charts = [Chart('news_analysis_detailed.png', panels, layout=(2, 2), figsize=(15, 10), tight=True)]
 
         # 按类别统计新闻数量
-        if 'category' in df.columns:
-            category_counts = df['category'].value_counts()
+        if category_counts:
+            category_counts = pd.Series(dict(category_counts.most_common()), name='category')
             print("\n新闻类别统计：")
             print(category_counts)
 
-            # 绘制柱状图
-            plt.figure(figsize=(10, 6))
-            category_counts.plot(kind='bar')
-            plt.title('新闻类别分布')
-            plt.xlabel('类别')
-            plt.ylabel('数量')
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-            plt.savefig('news_analysis.png')
+            # 柱状图
+            charts.append(Chart('news_analysis.png', [Panel(
+                'bar', {'labels': list(category_counts.index), 'values': category_counts.tolist()},
+                title='新闻类别分布', xlabel='类别', ylabel='数量', options={'rotation': 45}
+            )], tight=True))
+
+        render_charts(charts)
+        print("\n详细分析图表已保存为 'news_analysis_detailed.png'")
+        if len(charts) > 1:
             print("\n分析图表已保存为 'news_analysis.png'")
         else:
             print("\n未找到类别数据，跳过类别分析")
 
 def main():
+    parser = argparse.ArgumentParser(description='新浪新闻爬虫')
+    parser.add_argument('--incremental', action='store_true', help='增量模式：只抓取已保存数据中没有的新闻')
+    parser.add_argument('--jsonl', help='逐条追加写入的 JSON Lines 文件（.jsonl / .jsonl.gz / .jsonl.zst），代替 news_data.json')
+    parser.add_argument('--output', default='news_data.json',
+                        help='保存结果的文件，以 .parquet 结尾时写入分区 Parquet 数据集')
+    parser.add_argument('--index', help='爬取后把新闻加入该目录下的全文索引（见 news_index.py）')
+    parser.add_argument('--dedup', choices=['drop', 'cluster'],
+                        help='近似重复检测：drop 丢弃转载稿，cluster 保留并标注原文URL')
+    args = parser.parse_args()
+
+    data_file = args.jsonl or args.output
     # 使用新浪新闻首页
-    crawler = NewsCrawler('https://news.sina.com.cn/', max_pages=1)
+    crawler = NewsCrawler('https://news.sina.com.cn/', max_pages=1, max_workers=8, cache=HTTPCache(),
+                          incremental=args.incremental, data_file=data_file,
+                          sink=JsonLinesSink(args.jsonl) if args.jsonl else None, dedup=args.dedup)
     crawler.crawl_multiple_pages()
+    if crawler.dedup is not None:
+        print(f"近似重复检测：发现 {crawler.dedup.duplicate_count} 篇转载稿")
+    if crawler.incremental:
+        saved = crawler.sink.count if crawler.sink else len(crawler.news_data)
+        print(f"增量模式：新增或更新 {saved} 条，跳过 {crawler.skipped_count} 条")
     crawler.save_data()
+    if args.index:
+        print(f"全文索引：新增或更新 {crawler.update_index(args.index)} 篇")
     crawler.analyze_data()
+    print(f"\n连接池统计：{crawler.session.connection_stats}")
+    print(f"缓存统计：{crawler.cache.stats()}")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file